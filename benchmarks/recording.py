@@ -0,0 +1,72 @@
+"""
+Defines a fake canvas that records drawing commands instead of sending them to a front end.
+"""
+
+import numpy as np
+
+from collections import Counter
+
+
+def _size(value) -> int:
+    """
+    Estimates the bytes a canvas command argument costs over the widget comm.
+    Arrays are sent as binary buffers and everything else as JSON.
+    """
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(_size(item) for item in value)
+    return len(repr(value))
+
+
+class RecordingCanvas:
+
+    """
+    Stands in for an ipycanvas Canvas layer.
+    Every method call and property assignment is recorded as one command,
+    as each costs one command in an ipycanvas hold_canvas batch.
+    """
+
+    def __init__(self):
+
+        object.__setattr__(self, "commands", [])
+
+    def __getattr__(self, name: str):
+
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def record(*args, **kwargs):
+            self.commands.append((name, _size(args) + _size(list(kwargs.values()))))
+
+        return record
+
+    def __setattr__(self, name: str, value):
+
+        self.commands.append((name, _size(value)))
+
+    def reset(self):
+        """
+        Forgets the recorded commands.
+        """
+        self.commands.clear()
+
+    @property
+    def count(self) -> int:
+        """
+        Number of commands recorded.
+        """
+        return len(self.commands)
+
+    @property
+    def bytes(self) -> int:
+        """
+        Estimated bytes of command arguments recorded.
+        """
+        return sum(size for _, size in self.commands)
+
+    def histogram(self) -> Counter:
+        """
+        Counts the recorded commands by name.
+        """
+        return Counter(name for name, _ in self.commands)
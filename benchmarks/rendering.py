@@ -0,0 +1,188 @@
+"""
+Benchmarks the drawing done by the editor.
+
+    python -m benchmarks.rendering --json rendering.json
+
+Each benchmark is run against sheets of increasing size with the editor's layers replaced by
+recording canvases, measuring wall time and the canvas commands that would be sent to the front end.
+"""
+
+import sys
+import json
+import math
+import time
+import platform
+import argparse
+import statistics
+
+from typing import Callable
+
+from lgui.editor import Editor
+from lgui.sheet import Sheet
+from lgui.history import History
+from lgui.components import *
+
+from .recording import RecordingCanvas
+
+
+SIZES = [10, 100, 1000, 10000, 50000]
+
+TYPES = [Resistor, Capacitor, Inductor, VoltageSource, CurrentSource, Wire]
+"""
+Component types placed on benchmark sheets, in rotation.
+"""
+
+
+def make_sheet(size: int) -> Sheet:
+    """
+    Builds a sheet of components laid out in a square grid of alternating horizontal and vertical components.
+    """
+    sheet = Sheet("Benchmark", None)
+    columns = max(1, math.ceil(math.sqrt(size)))
+    spacing = 4 * Editor.STEP
+    for i in range(size):
+        component_type = TYPES[i % len(TYPES)]
+        component = component_type() if component_type is Wire else component_type(i)
+        x, y = (i % columns) * spacing, (i // columns) * spacing
+        component.ports[0].position = (x, y)
+        if (i // columns) % 2 == 0:
+            component.ports[1].position = (x + spacing, y)
+        else:
+            component.ports[1].position = (x, y + spacing)
+        sheet.add_component(component)
+    return sheet
+
+
+def make_editor(sheet: Sheet) -> tuple[Editor, list[RecordingCanvas]]:
+    """
+    Builds an editor for a sheet whose layers record commands.
+    The render scheduler is stopped so that frames only happen when a benchmark asks for them.
+    """
+    editor = Editor()
+    editor.scheduler.close()
+    editor.sheet = sheet
+    editor.history = History(sheet, Editor.HISTORY_DEPTH)
+    layers = [RecordingCanvas() for _ in range(Editor.LAYERS)]
+    editor.cursor_layer, editor.active_layer, editor.component_layer, editor.grid_layer = layers
+    return editor, layers
+
+
+def measure(editor: Editor, layers: list[RecordingCanvas], action: Callable, repeat: int, setup: Callable = None) -> dict:
+    """
+    Times an action, counting the canvas commands of its last run.
+
+    Returns
+    -------
+
+    dict
+        The median seconds, commands and bytes of the action.
+    """
+    times = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        for layer in layers:
+            layer.reset()
+        start = time.perf_counter()
+        action()
+        times.append(time.perf_counter() - start)
+    return {
+        "seconds": statistics.median(times),
+        "commands": sum(layer.count for layer in layers),
+        "bytes": sum(layer.bytes for layer in layers)
+    }
+
+
+def bench_grid(editor: Editor, layers: list[RecordingCanvas], repeat: int) -> dict:
+
+    return measure(editor, layers, editor._draw_grid, repeat)
+
+
+def bench_redraw_view(editor: Editor, layers: list[RecordingCanvas], repeat: int) -> dict:
+    """
+    Redraws what is visible at the default zoom, as when panning.
+    """
+    return measure(editor, layers, editor.redraw, repeat)
+
+
+def bench_redraw_all(editor: Editor, layers: list[RecordingCanvas], repeat: int) -> dict:
+    """
+    Draws every component on the sheet, as when zoomed out to see all of it.
+    """
+    return measure(editor, layers, lambda: editor.draw_components(editor.component_layer, editor.sheet.components), repeat)
+
+
+def bench_place(editor: Editor, layers: list[RecordingCanvas], repeat: int) -> dict:
+    """
+    Places a resistor with two clicks and the cursor refreshes between them, undoing it between runs.
+    """
+    def place():
+        editor.component_selector.value = Resistor
+        editor._handle_mouse_down(Editor.STEP, Editor.STEP)
+        editor._handle_mouse_move(5 * Editor.STEP, Editor.STEP)
+        editor._refresh()
+        editor._handle_mouse_down(5 * Editor.STEP, Editor.STEP)
+        editor._refresh()
+
+    def undo():
+        if editor.history.can_undo:
+            editor.history.undo()
+
+    result = measure(editor, layers, place, repeat, undo)
+    undo()
+    return result
+
+
+BENCHMARKS: dict[str, Callable] = {
+    "grid": bench_grid,
+    "redraw_view": bench_redraw_view,
+    "redraw_all": bench_redraw_all,
+    "place": bench_place
+}
+
+
+def run(sizes: list[int], repeat: int, names: list[str]) -> list[dict]:
+    """
+    Runs benchmarks against sheets of each size.
+    """
+    results = []
+    for size in sizes:
+        editor, layers = make_editor(make_sheet(size))
+        try:
+            for name in names:
+                result = BENCHMARKS[name](editor, layers, repeat)
+                result.update(benchmark = name, components = size)
+                results.append(result)
+                print(
+                    f"{name:<12} {size:>6} components {1000 * result['seconds']:>10.3f} ms "
+                    f"{result['commands']:>6} commands {result['bytes']:>10} bytes",
+                    file = sys.stderr
+                )
+        finally:
+            editor.close()
+    return results
+
+
+def main(arguments: list[str] = None):
+
+    parser = argparse.ArgumentParser(prog = "python -m benchmarks.rendering", description = __doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type = int, nargs = "+", default = SIZES, help = "sheet sizes in components")
+    parser.add_argument("--repeat", type = int, default = 5, help = "runs of each benchmark, the median is reported")
+    parser.add_argument("--only", nargs = "+", choices = sorted(BENCHMARKS), default = list(BENCHMARKS))
+    parser.add_argument("--json", help = "file to write results to")
+    options = parser.parse_args(arguments)
+
+    results = run(options.sizes, options.repeat, options.only)
+
+    if options.json is not None:
+        with open(options.json, "w", encoding = "utf-8") as file:
+            json.dump({
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "repeat": options.repeat,
+                "results": results
+            }, file, indent = 2)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,6 +1,53 @@
 """
 Root-level lgui objects.
 These can be imported directly from lgui.
+
+Objects are imported on first use, so that code only using sheets and netlists
+does not pay for importing the widget libraries.
+"""
+
+import importlib
+
+from typing import TYPE_CHECKING
+
+
+_LAZY: dict[str, str] = {
+    "Editor": ".editor",
+    "Sheet": ".sheet",
+    "ComponentTable": ".table",
+    "save_sheet": ".storage",
+    "load_sheet": ".storage",
+    "read_lcapy": ".importer",
+    "load_lcapy": ".importer",
+    "Definition": ".hierarchy",
+    "Instance": ".hierarchy",
+    "flatten": ".hierarchy"
+}
+"""
+Modules defining each root-level object.
 """
 
-from .editor import Editor
\ No newline at end of file
+__all__ = list(_LAZY)
+
+if TYPE_CHECKING:
+    from .editor import Editor
+    from .sheet import Sheet
+    from .table import ComponentTable
+    from .storage import save_sheet, load_sheet
+    from .importer import read_lcapy, load_lcapy
+    from .hierarchy import Definition, Instance, flatten
+
+
+def __getattr__(name: str):
+
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    # cache so later lookups skip this function
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+
+    return sorted(set(globals()) | set(__all__))
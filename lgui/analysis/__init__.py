@@ -0,0 +1,11 @@
+"""
+Analysis submodule of lgui (lcapy-gui)
+
+Handles solving sheets away from the widget's event thread.
+"""
+
+from .worker import AnalysisWorker, solve
+from .mna import NumericCircuit, SymbolicValueError, solve_numeric
+from .sweep import sweep, frequency_sweep, tolerance_values
+from .transient import TransientSolver, simulate, simulate_into
+from .cache import ResultCache, canonical_netlist, circuit_hash
@@ -0,0 +1,319 @@
+"""
+Defines the cache of solved circuits, keyed by a hash of their canonical netlist.
+"""
+
+import os
+import json
+import hashlib
+import tempfile
+import threading
+
+from collections import OrderedDict, Counter, deque
+from typing import Iterable
+
+from ..importer import parse_lcapy, GROUND
+
+
+SYMMETRIC = ("R", "C", "L")
+"""
+Types of component whose terminals can be swapped without changing the node voltages.
+"""
+
+CACHE_VERSION = 3
+"""
+Hashed along with every netlist, bumped when the canonical form or the stored results change.
+"""
+
+
+def _refine(cells: dict[int, set], cell_of: dict[str, int], adjacency: dict[str, list[tuple]], queue: list[int]):
+    """
+    Refines an ordered partition of the nodes in place until no cell splits,
+    splitting cells by the multiset of edges their nodes have into a splitter cell.
+    Cells are numbered by their position in the order, and every choice depends only on
+    cell numbers and edge attributes, so isomorphic circuits are refined alike.
+    As in Hopcroft's algorithm, the largest part of a split cell is only used as a splitter
+    if the whole cell was waiting to be, so each node is visited O(log n) times.
+    """
+    waiting = set(queue)
+    queue = deque(queue)
+    while queue:
+        splitter = queue.popleft()
+        waiting.discard(splitter)
+
+        # count the edges of each node into the splitter, taken before it can split itself
+        counts: dict[str, Counter] = {}
+        for node in list(cells[splitter]):
+            for neighbour, label in adjacency[node]:
+                counts.setdefault(neighbour, Counter())[label] += 1
+
+        touched: dict[int, list[str]] = {}
+        for node in counts:
+            touched.setdefault(cell_of[node], []).append(node)
+
+        for cell in sorted(touched):
+            members = cells[cell]
+            groups: dict[tuple, list[str]] = {}
+            for node in touched[cell]:
+                groups.setdefault(tuple(sorted(counts[node].items())), []).append(node)
+            if len(groups) == 1 and len(touched[cell]) == len(members):
+                continue
+
+            # nodes without edges into the splitter have the empty signature, so stay first at the cell's number
+            for node in touched[cell]:
+                members.discard(node)
+            parts = [members] if members else []
+            parts.extend(set(groups[signature]) for signature in sorted(groups))
+
+            position, numbers = cell, []
+            for part in parts:
+                cells[position] = part
+                if position != cell:
+                    for node in part:
+                        cell_of[node] = position
+                numbers.append(position)
+                position += len(part)
+
+            if cell in waiting:
+                added = numbers[1:]
+            else:
+                largest = max(range(len(parts)), key = lambda i: (len(parts[i]), -i))
+                added = [number for i, number in enumerate(numbers) if i != largest]
+            for number in added:
+                if number not in waiting:
+                    waiting.add(number)
+                    queue.append(number)
+
+
+def canonical_netlist(lines: Iterable[str]) -> tuple[str, dict[str, str]]:
+    """
+    Rewrites a netlist in a canonical form, so that circuits differing only in the names
+    of their nodes, the numbering of their components or the order of their lines are written the same.
+    Nodes are numbered by colour refinement with ground fixed as 0, and nodes the refinement
+    cannot tell apart are then numbered in line order, all in one pass.
+    Nodes that are truly symmetric give the same netlist whichever order they are numbered in,
+    otherwise the worst case is a circuit with several canonical forms, which costs a cache miss
+    but never a wrong result.
+
+    Components without a value keep their name, since lcapy uses it as their symbol.
+
+    Parameters
+    ----------
+
+    lines: Iterable[str]
+        Lines of an lcapy netlist.
+
+    Returns
+    -------
+
+    tuple[str, dict[str, str]]
+        The canonical netlist and the canonical name of each node, keyed by its name in the given netlist.
+    """
+    records = list(parse_lcapy(lines))
+
+    # nodes in line order, with ground first
+    nodes: dict[str, list[tuple]] = {GROUND: []}
+    edges, named = [], set()
+    for record in records:
+        for node in (record.positive, record.negative):
+            nodes.setdefault(node, [])
+        name = None
+        if record.value is None:
+            name = record.name
+            named.add(name)
+        attributes = (record.component_type.TYPE, record.kind or "", str(record.value), name or "")
+        directed = record.component_type.TYPE not in SYMMETRIC
+        edges.append((attributes, record.positive, record.negative, directed))
+        nodes[record.negative].append((record.positive, (attributes, 1 if directed else 0)))
+        nodes[record.positive].append((record.negative, (attributes, -1 if directed else 0)))
+
+    # ground is a cell of its own, so it can never be renamed
+    others = set(nodes) - {GROUND}
+    cells = {0: {GROUND}}
+    cell_of = {GROUND: 0}
+    if others:
+        cells[1] = others
+        cell_of.update(dict.fromkeys(others, 1))
+    _refine(cells, cell_of, nodes, sorted(cells))
+
+    order = {node: i for i, node in enumerate(nodes)}
+    names = {}
+    for cell, members in cells.items():
+        for i, node in enumerate(sorted(members, key = order.get)):
+            names[node] = str(cell + i)
+    names[GROUND] = GROUND
+
+    fields = []
+    for attributes, a, b, directed in edges:
+        a, b = names[a], names[b]
+        if not directed and int(b) < int(a):
+            a, b = b, a
+        fields.append((attributes, int(a), int(b)))
+    fields.sort()
+
+    counts = {}
+    netlist = []
+    for (component_type, kind, value, name), a, b in fields:
+        if not name:
+            # number components in canonical order, skipping names kept by valueless components
+            while True:
+                counts[component_type] = counts.get(component_type, 0) + 1
+                name = f"{component_type}{counts[component_type]}"
+                if name not in named:
+                    break
+        line = [name, str(a), str(b)]
+        if kind:
+            line.append(kind)
+        if value != "None":
+            line.append(f"{{{value}}}" if any(c.isspace() for c in value) else value)
+        netlist.append(" ".join(line))
+
+    return "\n".join(netlist) + "\n", names
+
+
+def circuit_hash(netlist: str) -> str:
+    """
+    Hashes a canonical netlist.
+    """
+    return hashlib.sha256(f"{CACHE_VERSION}\n{netlist}".encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+
+    """
+    Results of solved circuits, keyed by circuit hash.
+    Recent results are kept in memory, and if a directory is given every result is also
+    written there as a JSON file, so results survive restarts and can be shared between processes.
+    Both tiers evict the least recently used results first.
+
+    Parameters
+    ----------
+
+    directory: str = None
+        Directory for the on-disk tier, created if missing. If none specified results are only kept in memory.
+    memory_items: int = 256
+        The number of results kept in memory.
+    disk_bytes: int = 64 * 2 ** 20
+        The total size the files of the on-disk tier are kept under.
+    """
+
+    def __init__(self, directory: str = None, memory_items: int = 256, disk_bytes: int = 64 * 2 ** 20):
+
+        self.directory: str = directory
+        self.memory_items: int = memory_items
+        self.disk_bytes: int = disk_bytes
+        self.hits: int = 0
+        self.misses: int = 0
+
+        self._memory: OrderedDict[str, dict] = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_used: int = None
+        if directory is not None:
+            os.makedirs(directory, exist_ok = True)
+
+    def _path(self, key: str) -> str:
+
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> dict:
+        """
+        Looks up the result for a circuit hash, or None if there is none.
+        Results found on disk are promoted to memory.
+        """
+        with self._lock:
+            result = self._memory.get(key)
+            if result is not None:
+                self._memory.move_to_end(key)
+                self.hits += 1
+                return result
+
+        result = None
+        if self.directory is not None:
+            path = self._path(key)
+            try:
+                with open(path, "r", encoding = "utf-8") as file:
+                    result = json.load(file)
+                # reading marks the file as recently used for eviction
+                os.utime(path)
+            except (OSError, ValueError):
+                result = None
+
+        with self._lock:
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._remember(key, result)
+        return result
+
+    def put(self, key: str, result: dict):
+        """
+        Stores the result for a circuit hash.
+        """
+        with self._lock:
+            self._remember(key, result)
+        if self.directory is None:
+            return
+
+        # write then rename, so other processes never read half a file
+        data = json.dumps(result).encode("utf-8")
+        descriptor, temporary = tempfile.mkstemp(dir = self.directory, suffix = ".tmp")
+        try:
+            with os.fdopen(descriptor, "wb") as file:
+                file.write(data)
+            os.replace(temporary, self._path(key))
+        except OSError:
+            if os.path.exists(temporary):
+                os.remove(temporary)
+            return
+
+        with self._lock:
+            if self._disk_used is not None:
+                self._disk_used += len(data)
+            if self._disk_used is None or self._disk_used > self.disk_bytes:
+                self._evict()
+
+    def _remember(self, key: str, result: dict):
+        """
+        Puts a result in memory, dropping the least recently used beyond the limit.
+        """
+        self._memory[key] = result
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_items:
+            self._memory.popitem(last = False)
+
+    def _evict(self):
+        """
+        Deletes the least recently used files until the on-disk tier fits its size.
+        The directory is rescanned, since other processes may share it.
+        """
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith(".json"):
+                try:
+                    stat = entry.stat()
+                except OSError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        files.sort()
+        used = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if used <= self.disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            used -= size
+        self._disk_used = used
+
+    def clear(self):
+        """
+        Forgets every result, in memory and on disk.
+        """
+        with self._lock:
+            self._memory.clear()
+            if self.directory is not None:
+                for entry in os.scandir(self.directory):
+                    if entry.name.endswith(".json"):
+                        os.remove(entry.path)
+                self._disk_used = 0
@@ -0,0 +1,342 @@
+"""
+Defines the numeric solver that uses sparse modified nodal analysis.
+"""
+
+import warnings
+import numpy as np
+import scipy.sparse as sparse
+import scipy.sparse.linalg as linalg
+
+from typing import Iterable, Union
+
+from ..importer import parse_lcapy, GROUND
+
+
+class SymbolicValueError(ValueError):
+
+    """
+    Raised when a circuit cannot be solved numerically, e.g. because a value is symbolic.
+    Such circuits should be solved with lcapy instead.
+    """
+
+    pass
+
+
+def _numeric(name: str, value: Union[str, int, float]) -> float:
+    """
+    Converts a component value to a number.
+    """
+    if value is None:
+        raise SymbolicValueError(f"{name} has no value")
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        raise SymbolicValueError(f"{name} has the symbolic value '{value}'") from None
+
+
+class NumericCircuit:
+
+    """
+    Modified nodal analysis of a circuit with numeric component values.
+    The circuit equations are (G + sC) x = b, where x holds the node voltages followed by
+    the currents through voltage sources and inductors, and s is the complex frequency.
+    G and C are assembled once as sparse matrices and reused for every solve.
+
+    Parameters
+    ----------
+
+    types: list[str]
+        The TYPE letter of each component, e.g. R.
+    names: list[str]
+        The name of each component, e.g. R1.
+    terminals: list[tuple[str, str]]
+        The positive and negative node of each component.
+    kinds: list[str]
+        The source kind of each component, e.g. dc, or None.
+    values: list[Union[str, int, float]]
+        The value of each component.
+    initial_values: list[Union[str, int, float]] = None
+        The initial value of each component, or None. Only used by capacitors and inductors,
+        as their voltage or current at t = 0 in transient simulations.
+
+    Raises
+    ------
+
+    SymbolicValueError
+        If a value is not a number.
+    """
+
+    BRANCHES = ("V", "L")
+    """
+    Types of component that add a branch current to the unknowns.
+    """
+
+    def __init__(
+        self,
+        types: list[str],
+        names: list[str],
+        terminals: list[tuple[str, str]],
+        kinds: list[str],
+        values: list[Union[str, int, float]],
+        initial_values: list[Union[str, int, float]] = None
+    ):
+
+        self.types: np.ndarray = np.array(types, dtype = "<U1").reshape(-1)
+        self.names: list[str] = list(names)
+        self.kinds: list[str] = list(kinds)
+        self.values: np.ndarray = np.array(
+            [_numeric(name, value) for name, value in zip(names, values)], dtype = float
+        )
+        if np.any((self.types == "R") & (self.values == 0)):
+            raise SymbolicValueError("zero resistances cannot be solved numerically")
+        self.initial_values: dict[str, float] = {
+            name: _numeric(name, initial)
+            for name, initial in zip(names, initial_values or ())
+            if initial is not None
+        }
+
+        # ground is the reference, numbered -1 so it drops out of the matrices
+        self.nodes: list[str] = []
+        index: dict[str, int] = {GROUND: -1}
+        for pair in terminals:
+            for node in pair:
+                if str(node) not in index:
+                    index[str(node)] = len(self.nodes)
+                    self.nodes.append(str(node))
+        terminals = np.array(
+            [(index[str(a)], index[str(b)]) for a, b in terminals], dtype = np.int64
+        ).reshape(-1, 2)
+        self.positive: np.ndarray = terminals[:, 0]
+        self.negative: np.ndarray = terminals[:, 1]
+
+        branch = np.isin(self.types, NumericCircuit.BRANCHES)
+        self.branch: np.ndarray = np.full(len(self.types), -1, dtype = np.int64)
+        self.branch[branch] = len(self.nodes) + np.arange(np.count_nonzero(branch))
+        self.size: int = len(self.nodes) + np.count_nonzero(branch)
+
+        self.rows, self.cols, self.component, self.sign, self.order = self._pattern()
+        self.G, self.C = self.matrices()
+
+    @classmethod
+    def from_netlist(cls, lines: Iterable[str]) -> 'NumericCircuit':
+        """
+        Builds the circuit from lcapy netlist lines.
+        """
+        records = list(parse_lcapy(lines))
+        return cls(
+            [record.component_type.TYPE for record in records],
+            [record.name for record in records],
+            [(record.positive, record.negative) for record in records],
+            [record.kind for record in records],
+            [record.value for record in records]
+        )
+
+    @classmethod
+    def from_sheet(cls, sheet) -> 'NumericCircuit':
+        """
+        Builds the circuit straight from the components of a sheet, without formatting a netlist.
+        Instances of sub-sheets are expanded into their components.
+        """
+        from ..hierarchy import netlist_rows
+
+        rows = netlist_rows(sheet)
+        return cls(
+            [row[0] for row in rows],
+            [row[1] for row in rows],
+            [(row[2], row[3]) for row in rows],
+            [row[4] for row in rows],
+            [row[5] for row in rows],
+            [row[6] for row in rows]
+        )
+
+    def _pattern(self) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Lists the entries that the components stamp into G and C.
+        Each entry is sign * f(value) * s**order, where f is the reciprocal for resistors,
+        the value itself for capacitors and inductors, and 1 for the incidence of branch currents.
+
+        Returns
+        -------
+
+        tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray, np.ndarray]
+            The row, column, component (-1 for none), sign and order of each entry.
+        """
+        parts = []
+        admittances = np.flatnonzero(np.isin(self.types, ("R", "C")))
+        a, b = self.positive[admittances], self.negative[admittances]
+        order = (self.types[admittances] == "C").astype(np.int64)
+        for rows, cols, sign in ((a, a, 1), (b, b, 1), (a, b, -1), (b, a, -1)):
+            parts.append((rows, cols, admittances, np.full(len(rows), sign), order))
+
+        branches = np.flatnonzero(self.branch >= 0)
+        k, a, b = self.branch[branches], self.positive[branches], self.negative[branches]
+        none = np.full(len(k), -1)
+        zeros = np.zeros(len(k), dtype = np.int64)
+        for rows, cols, sign in ((a, k, 1), (b, k, -1), (k, a, 1), (k, b, -1)):
+            parts.append((rows, cols, none, np.full(len(k), sign), zeros))
+
+        # inductors as V = sLI on their branch rows
+        inductors = np.flatnonzero(self.types == "L")
+        k = self.branch[inductors]
+        parts.append((k, k, inductors, -np.ones(len(k), dtype = np.int64), np.ones(len(k), dtype = np.int64)))
+
+        rows, cols, component, sign, order = (np.concatenate(column) for column in zip(*parts))
+        keep = (rows >= 0) & (cols >= 0)
+        return rows[keep], cols[keep], component[keep], sign[keep], order[keep]
+
+    def coefficients(self, values: np.ndarray = None) -> np.ndarray:
+        """
+        Evaluates the entries of the pattern for some component values, before multiplying by s**order.
+
+        Parameters
+        ----------
+
+        values: np.ndarray = None
+            Component values as an array whose last axis is the components, e.g. (points, components)
+            for a sweep. If none specified the values the circuit was built with are used.
+
+        Returns
+        -------
+
+        np.ndarray
+            The coefficients, with the last axis being the entries of the pattern.
+        """
+        if values is None:
+            values = self.values
+        values = np.asarray(values, dtype = float)
+        coefficients = np.ones(values.shape[:-1] + (len(self.rows),))
+        valued = self.component >= 0
+        selected = values[..., self.component[valued]]
+        reciprocal = self.types[self.component[valued]] == "R"
+        coefficients[..., valued] = np.where(reciprocal, 1 / np.where(reciprocal, selected, 1), selected)
+        return coefficients * self.sign
+
+    def matrices(self, values: np.ndarray = None) -> tuple[sparse.csc_matrix, sparse.csc_matrix]:
+        """
+        Assembles the sparse G and C matrices.
+
+        Parameters
+        ----------
+
+        values: np.ndarray = None
+            Component values to use in place of those the circuit was built with.
+        """
+        coefficients = self.coefficients(values)
+        shape = (self.size, self.size)
+        return tuple(
+            sparse.coo_matrix(
+                (coefficients[self.order == order], (self.rows[self.order == order], self.cols[self.order == order])),
+                shape = shape
+            ).tocsc()
+            for order in (0, 1)
+        )
+
+    def sources(self, kinds: tuple[str] = (None, "dc"), values: np.ndarray = None) -> np.ndarray:
+        """
+        Builds the right hand side for the sources of some kinds, with other sources set to zero.
+
+        Parameters
+        ----------
+
+        kinds: tuple[str] = (None, "dc")
+            The source kinds to include, None being a source without a kind.
+        values: np.ndarray = None
+            Component values as an array whose last axis is the components, e.g. (points, components),
+            if none specified the values the circuit was built with are used.
+
+        Returns
+        -------
+
+        np.ndarray
+            The right hand side, with the last axis being the unknowns.
+        """
+        if values is None:
+            values = self.values
+        values = np.asarray(values, dtype = float)
+        b = np.zeros(values.shape[:-1] + (self.size,))
+        active = np.array([kind in kinds for kind in self.kinds], dtype = bool).reshape(-1)
+
+        voltage = np.flatnonzero(active & (self.types == "V"))
+        b[..., self.branch[voltage]] = values[..., voltage]
+
+        # current flows into the positive node, as for lcapy
+        current = active & (self.types == "I")
+        for nodes, sign in ((self.positive, 1), (self.negative, -1)):
+            into = np.flatnonzero(current & (nodes >= 0))
+            for component, node in zip(into.tolist(), nodes[into].tolist()):
+                b[..., node] += sign * values[..., component]
+        return b
+
+    def _solve(self, A: sparse.spmatrix, b: np.ndarray) -> np.ndarray:
+        """
+        Solves a sparse system, raising if it has no unique solution.
+        """
+        with warnings.catch_warnings():
+            warnings.simplefilter("error", linalg.MatrixRankWarning)
+            try:
+                x = linalg.spsolve(A.tocsc(), b)
+            except (linalg.MatrixRankWarning, RuntimeError) as exception:
+                raise SymbolicValueError(f"the circuit equations are singular: {exception}") from None
+        x = np.atleast_1d(x)
+        if not np.all(np.isfinite(x)):
+            raise SymbolicValueError("the circuit equations are singular")
+        return x
+
+    def dc(self) -> dict[str, float]:
+        """
+        Solves the DC operating point, with capacitors open and inductors shorted.
+        Only sources without a kind or of the dc kind are included.
+
+        Returns
+        -------
+
+        dict[str, float]
+            The voltage of each node, keyed by node name.
+        """
+        if self.size == 0:
+            return {}
+        x = self._solve(self.G, self.sources())
+        return dict(zip(self.nodes, x[:len(self.nodes)].tolist()))
+
+    def ac(self, frequencies: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Solves the response to the ac sources at a range of frequencies.
+        The values of ac sources are taken as phasor amplitudes, and other sources are set to zero.
+
+        Parameters
+        ----------
+
+        frequencies: Union[float, np.ndarray]
+            The frequencies in hertz.
+
+        Returns
+        -------
+
+        np.ndarray
+            The complex node voltages as a (frequencies, nodes) array, in the order of the nodes attribute.
+        """
+        frequencies = np.atleast_1d(np.asarray(frequencies, dtype = float))
+        b = self.sources(("ac",)).astype(complex)
+        voltages = np.empty((len(frequencies), len(self.nodes)), dtype = complex)
+        for i, frequency in enumerate(frequencies.tolist()):
+            s = 2j * np.pi * frequency
+            voltages[i] = self._solve(self.G + s * self.C, b)[:len(self.nodes)]
+        return voltages
+
+
+def solve_numeric(netlist: str) -> dict[str, str]:
+    """
+    Solves a netlist numerically, in the same form as lgui.analysis.solve.
+    Only circuits whose sources are all DC have time-domain voltages that are plain numbers.
+
+    Raises
+    ------
+
+    SymbolicValueError
+        If the circuit needs lcapy, because of symbolic values or non-DC sources.
+    """
+    circuit = NumericCircuit.from_netlist(netlist.splitlines())
+    sources = np.isin(circuit.types, ("V", "I"))
+    if any(kind not in (None, "dc") for kind, source in zip(circuit.kinds, sources) if source):
+        raise SymbolicValueError("only circuits with DC sources have numeric time-domain voltages")
+    return {node: f"{voltage:.10g}" for node, voltage in circuit.dc().items()}
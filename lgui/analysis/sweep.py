@@ -0,0 +1,186 @@
+"""
+Defines batched frequency and parameter sweeps of numeric circuits.
+"""
+
+import numpy as np
+import multiprocessing
+
+from typing import Union
+
+from .mna import NumericCircuit, SymbolicValueError
+
+
+DENSE_LIMIT = 400
+"""
+Largest number of unknowns solved as stacked dense matrices, larger circuits are solved point by point with sparse matrices.
+"""
+
+BATCH_BYTES = 64 * 2 ** 20
+"""
+Memory allowed for a batch of stacked matrices.
+"""
+
+
+def _solve_points(circuit: NumericCircuit, s: np.ndarray, values: np.ndarray, kinds: tuple[str]) -> np.ndarray:
+    """
+    Solves the circuit at many points, each with its own complex frequency and component values.
+    Small circuits are solved in batches of stacked dense matrices, one LAPACK call per batch.
+
+    Parameters
+    ----------
+
+    circuit: NumericCircuit
+        The circuit to solve.
+    s: np.ndarray
+        The complex frequency at each point as a (points,) array.
+    values: np.ndarray
+        The component values at each point as a (points, components) array.
+    kinds: tuple[str]
+        The kinds of source to drive the circuit with.
+
+    Returns
+    -------
+
+    np.ndarray
+        The complex node voltages as a (points, nodes) array.
+    """
+    points, size, nodes = len(s), circuit.size, len(circuit.nodes)
+    voltages = np.empty((points, nodes), dtype = complex)
+    if size == 0:
+        return voltages
+
+    b = circuit.sources(kinds, values).astype(complex)
+
+    if size > DENSE_LIMIT:
+        # stacking would need too much memory, so reuse the sparse solver point by point
+        for point in range(points):
+            G, C = circuit.matrices(values[point])
+            voltages[point] = circuit._solve(G + s[point] * C, b[point])[:nodes]
+        return voltages
+
+    batch = max(1, min(points, BATCH_BYTES // (16 * size * size)))
+    for start in range(0, points, batch):
+        stop = min(points, start + batch)
+        coefficients = circuit.coefficients(values[start:stop]).astype(complex)
+        coefficients[:, circuit.order == 1] *= s[start:stop, None]
+
+        A = np.zeros((stop - start, size, size), dtype = complex)
+        index = np.arange(stop - start)[:, None]
+        # duplicate entries sum, as they do for sparse matrices
+        np.add.at(A, (index, circuit.rows[None, :], circuit.cols[None, :]), coefficients)
+        try:
+            x = np.linalg.solve(A, b[start:stop, :, None])[..., 0]
+        except np.linalg.LinAlgError as exception:
+            raise SymbolicValueError(f"the circuit equations are singular: {exception}") from None
+        voltages[start:stop] = x[:, :nodes]
+    return voltages
+
+
+def sweep(
+    circuit: NumericCircuit,
+    frequencies: Union[float, np.ndarray] = None,
+    values: dict[str, Union[float, np.ndarray]] = None,
+    chunk: int = 4096,
+    processes: int = None
+) -> np.ndarray:
+    """
+    Evaluates a circuit over arrays of frequencies and component values.
+    The circuit structure is analysed once, then every point is evaluated in batches.
+    Frequencies and value arrays are broadcast against each other, so a frequency sweep
+    at fixed values or a Monte Carlo run at a fixed frequency are both one call.
+
+    Parameters
+    ----------
+
+    circuit: NumericCircuit
+        The circuit to evaluate.
+    frequencies: Union[float, np.ndarray] = None
+        Frequencies in hertz to evaluate the response to the ac sources at,
+        if none specified the DC operating point is evaluated instead.
+    values: dict[str, Union[float, np.ndarray]] = None
+        Values replacing those of some components, keyed by component name, e.g. {"R1": np.linspace(1, 10, 100)}.
+    chunk: int = 4096
+        Number of points given to each worker process.
+    processes: int = None
+        Number of worker processes, if none specified the sweep runs in this process.
+
+    Returns
+    -------
+
+    np.ndarray
+        The node voltages as a (points, nodes) array, in the order of the circuit's nodes attribute.
+        Complex for frequency sweeps and real for DC.
+
+    Raises
+    ------
+
+    KeyError
+        If a value is given for a component the circuit does not have.
+    """
+    if values is None:
+        values = {}
+    indices = [circuit.names.index(name) if name in circuit.names else None for name in values]
+    for name, index in zip(values, indices):
+        if index is None:
+            raise KeyError(f"the circuit has no component '{name}'")
+
+    if frequencies is None:
+        s = np.zeros(1)
+        kinds = (None, "dc")
+    else:
+        s = 2j * np.pi * np.atleast_1d(np.asarray(frequencies, dtype = float))
+        kinds = ("ac",)
+
+    arrays = np.broadcast_arrays(s, *(np.atleast_1d(np.asarray(value, dtype = float)) for value in values.values()))
+    s = arrays[0].astype(complex)
+    points = np.repeat(circuit.values[None, :], len(s), axis = 0)
+    for index, array in zip(indices, arrays[1:]):
+        points[:, index] = array
+
+    if processes is None or len(s) <= chunk:
+        voltages = _solve_points(circuit, s, points, kinds)
+    else:
+        jobs = [
+            (circuit, s[start:start + chunk], points[start:start + chunk], kinds)
+            for start in range(0, len(s), chunk)
+        ]
+        with multiprocessing.Pool(processes) as pool:
+            voltages = np.concatenate(pool.starmap(_solve_points, jobs))
+
+    return voltages.real if frequencies is None else voltages
+
+
+def frequency_sweep(circuit: NumericCircuit, frequencies: np.ndarray, **kwargs) -> np.ndarray:
+    """
+    Evaluates the response of a circuit to its ac sources over an array of frequencies, e.g. for a Bode plot.
+    Takes the same keyword arguments as sweep.
+    """
+    return sweep(circuit, frequencies = frequencies, **kwargs)
+
+
+def tolerance_values(
+    circuit: NumericCircuit,
+    tolerances: dict[str, float],
+    samples: int,
+    seed: int = None
+) -> dict[str, np.ndarray]:
+    """
+    Draws component values uniformly within their tolerances, for a Monte Carlo sweep.
+
+    Parameters
+    ----------
+
+    circuit: NumericCircuit
+        The circuit whose values are varied.
+    tolerances: dict[str, float]
+        Relative tolerance of some components, keyed by component name, e.g. {"R1": 0.05}.
+    samples: int
+        The number of values to draw for each component.
+    seed: int = None
+        Seed for the random number generator, for repeatable runs.
+    """
+    generator = np.random.default_rng(seed)
+    return {
+        name: circuit.values[circuit.names.index(name)] * (1 + generator.uniform(-tolerance, tolerance, samples))
+        for name, tolerance in tolerances.items()
+    }
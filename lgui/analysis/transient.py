@@ -0,0 +1,304 @@
+"""
+Defines the time-domain simulation of numeric circuits.
+"""
+
+import numpy as np
+import scipy.sparse as sparse
+import scipy.sparse.linalg as linalg
+
+from typing import Iterator
+
+from .mna import NumericCircuit, SymbolicValueError
+
+
+class TransientSolver:
+
+    """
+    Steps a circuit through time with companion models.
+    Each capacitor and inductor is replaced at every step by a conductance and a current source
+    set by its state at the previous step, which in matrix form is (G + kC/h) x = rhs.
+    The matrix only depends on the step size, so it is factorised once per step size and reused.
+
+    Sources without a kind or of the dc kind are on for all time, while step sources and ac sources,
+    which are cosines of the given frequency, turn on after t = 0.
+
+    Parameters
+    ----------
+
+    circuit: NumericCircuit
+        The circuit to simulate.
+    frequency: float = None
+        Frequency of the ac sources in hertz, needed only if the circuit has any.
+    method: str = "trapezoidal"
+        The integration method, "trapezoidal" or "backward_euler".
+        Backward Euler damps the ringing trapezoidal integration can show after sudden changes.
+    initial_values: dict[str, float] = None
+        Initial capacitor voltages and inductor currents keyed by component name,
+        overriding the initial values the circuit was built with.
+    """
+
+    METHODS = ("trapezoidal", "backward_euler")
+
+    def __init__(
+        self,
+        circuit: NumericCircuit,
+        frequency: float = None,
+        method: str = "trapezoidal",
+        initial_values: dict[str, float] = None
+    ):
+
+        if method not in TransientSolver.METHODS:
+            raise ValueError(f"unknown integration method '{method}'")
+
+        self.circuit: NumericCircuit = circuit
+        self.method: str = method
+        self.G: sparse.csc_matrix = circuit.G
+        self.C: sparse.csc_matrix = circuit.C
+
+        self._constant = circuit.sources((None, "dc"))
+        self._step = circuit.sources(("step",))
+        self._ac = circuit.sources(("ac",))
+        if np.any(self._ac != 0) and frequency is None:
+            raise ValueError("a frequency is needed to simulate ac sources")
+        self.omega: float = 0 if frequency is None else 2 * np.pi * frequency
+
+        self._factors: dict[tuple[float, str], linalg.SuperLU] = {}
+        self.initial_values: dict[str, float] = {**circuit.initial_values, **(initial_values or {})}
+        self.x0: np.ndarray = self.initial_state()
+
+    def sources(self, t: float) -> np.ndarray:
+        """
+        Builds the right hand side at a time.
+        """
+        if t <= 0:
+            return self._constant
+        return self._constant + self._step + self._ac * np.cos(self.omega * t)
+
+    def initial_state(self) -> np.ndarray:
+        """
+        Finds the state just before t = 0.
+        This is the DC operating point of the sources on before t = 0, with each capacitor or inductor
+        that has an initial value held at it as a voltage or current source.
+        Circuits with no unique operating point, such as capacitors in series, start from the smallest solution.
+        """
+        circuit = self.circuit
+        types, kinds, values = list(circuit.types), list(circuit.kinds), circuit.values.copy()
+        terminals = list(zip(circuit.positive.tolist(), circuit.negative.tolist()))
+        held = {}
+        for i, name in enumerate(circuit.names):
+            initial = self.initial_values.get(name)
+            if initial is None or types[i] not in ("C", "L"):
+                continue
+            held[i] = float(initial)
+            values[i] = float(initial)
+            kinds[i] = "dc"
+            if types[i] == "C":
+                types[i] = "V"
+            else:
+                # a current source drives current into its positive node, so reverse it to match the inductor
+                types[i] = "I"
+                terminals[i] = terminals[i][::-1]
+
+        names = ["0"] + circuit.nodes
+        held_circuit = NumericCircuit(
+            types, circuit.names, [(names[a + 1], names[b + 1]) for a, b in terminals], kinds, values
+        )
+        b = held_circuit.sources((None, "dc"))
+        try:
+            y = held_circuit._solve(held_circuit.G, b)
+        except SymbolicValueError:
+            y = linalg.lsqr(held_circuit.G, b)[0]
+
+        # reversing inductors can change the order nodes are first seen in, so match nodes by name
+        x = np.zeros(circuit.size)
+        index = {node: i for i, node in enumerate(held_circuit.nodes)}
+        for i, node in enumerate(circuit.nodes):
+            x[i] = y[index[node]]
+        for i in np.flatnonzero(circuit.branch >= 0).tolist():
+            if i in held:
+                x[circuit.branch[i]] = held[i]
+            else:
+                x[circuit.branch[i]] = y[held_circuit.branch[i]]
+        return x
+
+    def _factor(self, h: float, method: str) -> linalg.SuperLU:
+        """
+        Factorises the step matrix for a step size and method, reusing earlier factorisations.
+        """
+        factor = self._factors.get((h, method))
+        if factor is None:
+            k = 2 if method == "trapezoidal" else 1
+            try:
+                factor = linalg.splu((self.G + (k / h) * self.C).tocsc())
+            except RuntimeError as exception:
+                raise SymbolicValueError(f"the circuit equations are singular: {exception}") from None
+            self._factors[h, method] = factor
+        return factor
+
+    def step(self, x: np.ndarray, t: float, h: float) -> np.ndarray:
+        """
+        Advances the state x at time t by a step h.
+        The first step is always taken with backward Euler, as trapezoidal integration would
+        smear the step and ac sources switching on at t = 0 over it.
+        """
+        method = "backward_euler" if t <= 0 else self.method
+        if method == "trapezoidal":
+            rhs = self.sources(t + h) + self.sources(t) - self.G @ x + (2 / h) * (self.C @ x)
+        else:
+            rhs = self.sources(t + h) + (1 / h) * (self.C @ x)
+        return self._factor(h, method).solve(rhs)
+
+    def run(
+        self,
+        stop: float,
+        step: float,
+        adaptive: bool = False,
+        tolerance: float = 1e-6,
+        max_step: float = None
+    ) -> Iterator[tuple[float, np.ndarray]]:
+        """
+        Generates the time and state at every step, starting with t = 0.
+
+        Parameters
+        ----------
+
+        stop: float
+            The time to simulate until.
+        step: float
+            The step size, or the initial step size if adaptive.
+        adaptive: bool = False
+            Halve and double the step to keep the estimated error of each step within the tolerance.
+            Steps stay a power of two times the initial step so their factorisations can be reused.
+        tolerance: float = 1e-6
+            The error allowed per step, relative to the size of the state with the same amount absolute.
+        max_step: float = None
+            The largest adaptive step, 64 times the initial step if none specified.
+        """
+        x, t, h = self.x0, 0.0, float(step)
+        yield t, x
+
+        if not adaptive:
+            # count the steps rather than accumulating t, so rounding cannot add a sliver of a step
+            for n in range(1, int(np.ceil(stop / h - 1e-9)) + 1):
+                x = self.step(x, t, h)
+                t = n * h
+                yield t, x
+            return
+
+        smallest = h / 2 ** 20
+        largest = h * 64 if max_step is None else max_step
+        while t < stop - smallest:
+            # halving keeps the step a power of two times the first, so the last steps land on the stop time
+            while h > stop - t + smallest / 2 and h / 2 >= smallest:
+                h /= 2
+            # step doubling, the difference between one and two half steps estimates the error
+            whole = self.step(x, t, h)
+            half = self.step(self.step(x, t, h / 2), t + h / 2, h / 2)
+            error = np.max(np.abs(whole - half) / (tolerance * (1 + np.abs(half)))) if len(x) else 0
+            if error > 1 and h / 2 >= smallest:
+                h /= 2
+                continue
+            x, t = half, t + h
+            yield t, x
+            if error < 0.1 and 2 * h <= largest:
+                h *= 2
+
+
+def simulate(
+    circuit: NumericCircuit,
+    stop: float,
+    step: float,
+    chunk: int = 4096,
+    **kwargs
+) -> Iterator[tuple[np.ndarray, np.ndarray]]:
+    """
+    Simulates a circuit, generating the node voltages in chunks so long runs never hold every sample.
+
+    Parameters
+    ----------
+
+    circuit: NumericCircuit
+        The circuit to simulate.
+    stop: float
+        The time to simulate until.
+    step: float
+        The step size, or the initial step size if adaptive.
+    chunk: int = 4096
+        The greatest number of samples in each chunk.
+    **kwargs
+        Passed on to TransientSolver (frequency, method, initial_values) and TransientSolver.run
+        (adaptive, tolerance, max_step).
+
+    Returns
+    -------
+
+    Iterator[tuple[np.ndarray, np.ndarray]]
+        Chunks of sample times as a (samples,) array and node voltages as a (samples, nodes) array,
+        in the order of the circuit's nodes attribute.
+    """
+    solver_options = {key: kwargs.pop(key) for key in ("frequency", "method", "initial_values") if key in kwargs}
+    solver = TransientSolver(circuit, **solver_options)
+    nodes = len(circuit.nodes)
+
+    times = np.empty(chunk)
+    voltages = np.empty((chunk, nodes))
+    filled = 0
+    for t, x in solver.run(stop, step, **kwargs):
+        times[filled] = t
+        voltages[filled] = x[:nodes]
+        filled += 1
+        if filled == chunk:
+            yield times, voltages
+            times = np.empty(chunk)
+            voltages = np.empty((chunk, nodes))
+            filled = 0
+    if filled:
+        yield times[:filled], voltages[:filled]
+
+
+def simulate_into(
+    circuit: NumericCircuit,
+    times: np.ndarray,
+    voltages: np.ndarray,
+    step: float,
+    **kwargs
+) -> int:
+    """
+    Simulates a circuit into preallocated buffers, stopping when they are full.
+
+    Parameters
+    ----------
+
+    circuit: NumericCircuit
+        The circuit to simulate.
+    times: np.ndarray
+        Buffer for the sample times, of shape (samples,).
+    voltages: np.ndarray
+        Buffer for the node voltages, of shape (samples, nodes).
+    step: float
+        The step size, or the initial step size if adaptive.
+    **kwargs
+        Passed on as for simulate, with stop defaulting to the end of the buffer at a fixed step.
+
+    Returns
+    -------
+
+    int
+        The number of samples written.
+    """
+    nodes = len(circuit.nodes)
+    if voltages.shape != (len(times), nodes):
+        raise ValueError(f"voltages must have shape {(len(times), nodes)}")
+    stop = kwargs.pop("stop", step * (len(times) - 1))
+
+    solver_options = {key: kwargs.pop(key) for key in ("frequency", "method", "initial_values") if key in kwargs}
+    solver = TransientSolver(circuit, **solver_options)
+
+    written = 0
+    for t, x in solver.run(stop, step, **kwargs):
+        if written == len(times):
+            break
+        times[written] = t
+        voltages[written] = x[:nodes]
+        written += 1
+    return written
@@ -0,0 +1,213 @@
+"""
+Defines the background worker that solves sheets with lcapy.
+"""
+
+import threading
+import multiprocessing
+
+from typing import Callable
+
+from .mna import solve_numeric, SymbolicValueError
+from .cache import ResultCache, canonical_netlist, circuit_hash
+
+
+def _warm_up():
+    """
+    Imports lcapy when a worker process starts so the first solve does not pay for it.
+    """
+    try:
+        import lcapy
+    except ImportError:
+        # reported by the solve itself
+        pass
+
+
+def solve(netlist: str) -> dict[str, str]:
+    """
+    Solves a netlist, numerically if every value is a number and every source is DC,
+    otherwise with lcapy.
+    Runs in a worker process, so takes and returns only plain data.
+
+    Parameters
+    ----------
+
+    netlist: str
+        The lcapy netlist to solve.
+
+    Returns
+    -------
+
+    dict[str, str]
+        The voltage of each node in the time domain, keyed by node name.
+    """
+    try:
+        return solve_numeric(netlist)
+    except SymbolicValueError:
+        pass
+
+    import lcapy
+
+    circuit = lcapy.Circuit(netlist)
+    return {str(node): str(circuit[node].V(lcapy.t)) for node in circuit.node_list if str(node) != "0"}
+
+
+def canonicalise(netlist: str) -> tuple[str, dict[str, str], str]:
+    """
+    Rewrites a netlist in canonical form and hashes it.
+    Runs in a worker process, since the canonical form of a large sheet takes a while.
+
+    Returns
+    -------
+
+    tuple[str, dict[str, str], str]
+        The canonical netlist, the canonical name of each node keyed by its name in the sheet, and the circuit hash.
+    """
+    canonical, names = canonical_netlist(netlist.splitlines())
+    return canonical, names, circuit_hash(canonical)
+
+
+class AnalysisWorker:
+
+    """
+    Solves sheets in a worker process so the editor stays interactive.
+    Only the latest request is kept, submitting another request or cancelling
+    stops the previous one, even part way through a solve.
+
+    Parameters
+    ----------
+
+    solver: Callable = solve
+        Function run in the worker process, taking a netlist and returning picklable results.
+    cache: ResultCache = None
+        Cache of results to look sheets up in before solving them.
+        The solver is then given canonical netlists, and its results must be keyed by node name.
+    """
+
+    def __init__(self, solver: Callable = solve, cache: ResultCache = None):
+
+        self.solver: Callable = solver
+        self.cache: ResultCache = cache
+        self._pool: multiprocessing.pool.Pool = None
+        self._job: multiprocessing.pool.AsyncResult = None
+        self._token: object = None
+        self._lock = threading.Lock()
+
+    @property
+    def busy(self) -> bool:
+        """
+        Whether a solve is in progress.
+        """
+        job = self._job
+        return job is not None and not job.ready()
+
+    def submit(self, sheet, callback: Callable, error: Callable = None):
+        """
+        Starts solving a sheet, superseding any solve already in progress.
+        The callback runs on a background thread once the solve finishes,
+        and is skipped if the sheet changed in the meantime.
+        With a cache, the sheet is first put in canonical form in the worker process,
+        and the solve is skipped if its result is cached.
+
+        Parameters
+        ----------
+
+        sheet: Sheet
+            The sheet to solve.
+        callback: Callable
+            Called with the results of the solver.
+        error: Callable = None
+            Called with the exception if the solve fails.
+        """
+        netlist = sheet.to_lcapy()
+        revision = sheet.revision
+
+        # identifies this request, set before the job starts so it can never finish first
+        token = object()
+
+        def current() -> bool:
+            return self._token is token and sheet.revision == revision
+
+        def failed(exception):
+            if error is not None and current():
+                error(exception)
+
+        if self.cache is None:
+            def finished(result):
+                if current():
+                    callback(result)
+
+            with self._lock:
+                self._start(token, self.solver, netlist, finished, failed)
+            return
+
+        def canonicalised(job):
+            canonical, names, key = job
+            # results are solved and cached under canonical node names, and shown under the sheet's
+            nodes = {name: node for node, name in names.items()}
+
+            def finished(result):
+                self.cache.put(key, result)
+                if current():
+                    callback({nodes.get(name, name): value for name, value in result.items()})
+
+            cached = self.cache.get(key)
+            if cached is not None:
+                if current():
+                    callback({nodes.get(name, name): value for name, value in cached.items()})
+                return
+
+            # this runs on the pool's result thread, which stopping the pool waits for,
+            # so rather than wait for the lock give up once the request is superseded
+            while not self._lock.acquire(timeout = 0.05):
+                if self._token is not token:
+                    return
+            try:
+                if self._token is token:
+                    self._job = self._pool.apply_async(
+                        self.solver, (canonical,),
+                        callback = finished, error_callback = failed
+                    )
+            finally:
+                self._lock.release()
+
+        with self._lock:
+            self._start(token, canonicalise, netlist, canonicalised, failed)
+
+    def _start(self, token: object, function: Callable, netlist: str, callback: Callable, error: Callable):
+        """
+        Supersedes the solve in progress with a job for a request.
+        """
+        self._cancel()
+        if self._pool is None:
+            # forking would copy the threads of the editor and its Jupyter kernel into the worker
+            self._pool = multiprocessing.get_context("spawn").Pool(1, initializer = _warm_up)
+        self._token = token
+        self._job = self._pool.apply_async(function, (netlist,), callback = callback, error_callback = error)
+
+    def cancel(self):
+        """
+        Stops the solve in progress, if any.
+        """
+        with self._lock:
+            self._cancel()
+
+    def _cancel(self):
+
+        self._token = None
+        if self._job is None:
+            return
+        if not self._job.ready():
+            # the only way to interrupt a running solve is to stop its process
+            self._pool.terminate()
+            self._pool = None
+        self._job = None
+
+    def close(self):
+        """
+        Stops the solve in progress and shuts down the worker process.
+        """
+        with self._lock:
+            self._cancel()
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
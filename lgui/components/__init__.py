@@ -2,17 +2,54 @@
 Components submodule of lgui (lcapy-gui)
 
 Handles the component class and its various subclasses.
+Each component module is imported the first time its class is used.
 """
 
-# for typing purposes
-from .component import Component
+import importlib
 
-from .resistor import Resistor
-from .inductor import Inductor
-from .capacitor import Capacitor
+from typing import TYPE_CHECKING
 
-from .voltage_source import VoltageSource
-from .current_source import CurrentSource
-from .ground import Ground
 
-from .wire import Wire
\ No newline at end of file
+_LAZY: dict[str, str] = {
+    # for typing purposes
+    "Component": ".component",
+
+    "Resistor": ".resistor",
+    "Inductor": ".inductor",
+    "Capacitor": ".capacitor",
+
+    "VoltageSource": ".voltage_source",
+    "CurrentSource": ".current_source",
+    "Ground": ".ground",
+
+    "Wire": ".wire"
+}
+"""
+Modules defining each component class.
+"""
+
+__all__ = list(_LAZY)
+
+if TYPE_CHECKING:
+    from .component import Component
+    from .resistor import Resistor
+    from .inductor import Inductor
+    from .capacitor import Capacitor
+    from .voltage_source import VoltageSource
+    from .current_source import CurrentSource
+    from .ground import Ground
+    from .wire import Wire
+
+
+def __getattr__(name: str):
+
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(_LAZY[name], __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__() -> list[str]:
+
+    return sorted(set(globals()) | set(__all__))
@@ -1,8 +1,14 @@
 
+import numpy as np
+
 from typing import Union
 
 from .component import Component
 
+
+PLATE_WIDTH = 2.4
+PLATE_SEP = 0.4
+
 class Capacitor(Component):
     """
     Capacitor
@@ -16,46 +22,17 @@ class Capacitor(Component):
 
     TYPE = "C"
     NAME = "Capacitor"
-
-    def __init__(self, value: Union[str, int, float]):
-
-        super().__init__(value)
-
-    def __draw_on__(self, editor, layer):
-
-        length = self.length()
-
-        start = self.ports[0].position
-        end = self.ports[1].position
-
-        mid = 0.5 * length * self.along() + start
-        
-        PLATE_WIDTH = 2.4 * editor.STEP * editor.SCALE
-        PLATE_SEP = 0.4 * editor.STEP * editor.SCALE
-
+    SEGMENTS = np.array([
         # lead 1
-        shift = 0.5 * self.along() * PLATE_SEP
-        layer.stroke_line(
-            start[0], start[1], 
-            mid[0] - shift[0], mid[1] - shift[1]
-        )
-
+        ((0, 0, 0), (0.5, -PLATE_SEP/2, 0)),
         # plate 1
-        plate = 0.5 * self.orthog() * PLATE_WIDTH
-        layer.stroke_line(
-            mid[0] + plate[0] + shift[0], mid[1] + plate[1] + shift[1],
-            mid[0] - plate[0] + shift[0], mid[1] - plate[1] + shift[1]
-        )
-
+        ((0.5, PLATE_SEP/2, PLATE_WIDTH/2), (0.5, PLATE_SEP/2, -PLATE_WIDTH/2)),
         # lead 2
-        layer.stroke_line(
-            mid[0] + shift[0], mid[1] + shift[1],
-            end[0], end[1]
-        )
-
+        ((0.5, PLATE_SEP/2, 0), (1, 0, 0)),
         # plate 2
-        plate = 0.5 * self.orthog() * PLATE_WIDTH
-        layer.stroke_line(
-            mid[0] + plate[0] - shift[0], mid[1] + plate[1] - shift[1],
-            mid[0] - plate[0] - shift[0], mid[1] - plate[1] - shift[1]
-        )
+        ((0.5, -PLATE_SEP/2, PLATE_WIDTH/2), (0.5, -PLATE_SEP/2, -PLATE_WIDTH/2))
+    ], dtype = float)
+
+    def __init__(self, value: Union[str, int, float]):
+
+        super().__init__(value)
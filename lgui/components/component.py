@@ -2,12 +2,16 @@
 Defines the components that lgui can simulate
 """
 
+import itertools
 import numpy as np
-import ipycanvas as canvas
 
-from typing import Union
+from typing import Union, TYPE_CHECKING
 from abc import ABC, abstractmethod
 
+if TYPE_CHECKING:
+    # only needed for annotations, so headless use does not import the widget libraries
+    import ipycanvas as canvas
+
 
 class Node:
 
@@ -15,10 +19,25 @@ class Node:
     Describes the node that joins components.
     """
 
+    _revisions = itertools.count()
+
     def __init__(self):
 
         self.position: tuple(int, int) = (0, 0)
 
+    @property
+    def position(self) -> tuple[int, int]:
+        """
+        Position of the node.
+        """
+        return self._position
+
+    @position.setter
+    def position(self, position: tuple[int, int]):
+        self._position = position
+        # unique across all nodes so that components notice replaced ports too
+        self.revision: int = next(Node._revisions)
+
     def __eq__(self, other: 'Node') -> bool:
 
         return self.position == other.position
@@ -40,6 +59,25 @@ class Component(ABC):
     next_id: int = 0
     kinds = {}
 
+    SEGMENTS: np.ndarray = np.empty((0, 2, 3))
+    """
+    Line segments making up the component symbol.
+    Each end point is given as (t, u, v), placed a fraction t of the way from the first port to the second
+    and then offset u steps along the component and v steps anti-clockwise of it.
+    """
+
+    EXTENT: float = 1.5
+    """
+    Distance in steps that the drawing of any component may reach beyond its ports.
+    """
+
+    ARCS: np.ndarray = np.empty((0, 6))
+    """
+    Arcs making up the component symbol as (t, u, v, radius, start angle, end angle).
+    Centres are placed as for SEGMENTS, the radius is measured in steps,
+    and the angles are measured from the direction of the component.
+    """
+
     def __init__(self, value: Union[str, int, float]):
 
         self.value: str = value
@@ -49,6 +87,14 @@ class Component(ABC):
         self.kind = None
         self.initial_value = None
 
+        # geometry caches, keyed on the revisions of the ports
+        self._geometry_key: tuple[int, int] = None
+        self._length: float = 0
+        self._along: np.ndarray = None
+        self._orthog: np.ndarray = None
+        self._symbol_key: tuple[float, int, int] = None
+        self._symbol: tuple[np.ndarray, np.ndarray] = None
+
     @property
     @classmethod
     @abstractmethod
@@ -71,46 +117,107 @@ class Component(ABC):
 
     def __str__(self) -> str:
 
-        return self.TYPE + ' ' + '(%s, %s) (%s, %s)' % \
-            (self.ports[0].position[0], self.ports[0].position[1],
-             self.ports[1].position[0], self.ports[1].position[1])
+        return self.TYPE + ' ' + ' '.join('(%s, %s)' % tuple(port.position) for port in self.ports)
 
-    @abstractmethod
-    def __draw_on__(self, editor, layer: canvas.Canvas):
+    def __draw_on__(self, editor, layer: 'canvas.Canvas'):
         """
         Handles drawing specific features of components.
-        Component end nodes are handled by the draw_on method, which calls this abstract method.
+        Component end nodes are handled by the draw_on method, which calls this method.
+        By default the symbol is drawn from SEGMENTS and ARCS.
         """
-        ...
+        segments, arcs = self.symbol(editor)
+        type(self).stroke_symbols(layer, segments, arcs)
+
+    def _update_geometry(self):
+        """
+        Recomputes the cached length and unit vectors if a port has moved since they were computed.
+        """
+        key = (self.ports[0].revision, self.ports[1].revision)
+        if key == self._geometry_key:
+            return
+
+        delta = np.array(self.ports[1].position, dtype = float) - np.array(self.ports[0].position, dtype = float)
+        self._length = float(np.hypot(delta[0], delta[1]))
+        if self._length == 0:
+            along = np.zeros(2)
+        else:
+            along = delta / self._length
+        orthog = np.array((-along[1], along[0]))
+
+        # shared between callers so must not be modified
+        along.flags.writeable = False
+        orthog.flags.writeable = False
+
+        self._along = along
+        self._orthog = orthog
+        self._geometry_key = key
 
     def length(self) -> float:
         """
         Computes the length of the component.
         """
-        return np.linalg.norm(np.abs(np.array(self.ports[1].position) - np.array(self.ports[0].position)))
+        self._update_geometry()
+        return self._length
 
     def along(self) -> np.array:
         """
         Computes a unit vector pointing along the line of the component.
         If the length of the component is zero, this will return the zero vector.
         """
-        length = self.length()
-        if length == 0:
-            return np.array((0, 0))
-        else:
-            return (np.array(self.ports[1].position) - np.array(self.ports[0].position))/length
+        self._update_geometry()
+        return self._along
 
     def orthog(self) -> np.array:
         """
         Computes a unit vector pointing anti-clockwise to the line of the component.
         """
-        delta = self.along()
-        theta = np.pi/2
-        rot = np.array([[np.cos(theta), -np.sin(theta)],
-                       [np.sin(theta), np.cos(theta)]])
-        return np.dot(rot, delta)
+        self._update_geometry()
+        return self._orthog
 
-    def draw_on(self, editor, layer: canvas.Canvas):
+    def symbol(self, editor) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Gets the symbol geometry of the component, computed only if a port has moved since it was last drawn.
+
+        Parameters
+        ----------
+
+        editor: Editor
+            The editor that the component is drawn by, used for the step and scale
+
+        Returns
+        -------
+
+        tuple[np.ndarray, np.ndarray]
+            Line segments and arcs as returned by symbol_geometry.
+        """
+        type(self).update_symbols(editor, [self])
+        return self._symbol
+
+    def bounds(self, editor) -> tuple[float, float, float, float]:
+        """
+        Computes the bounding box that the component is drawn within.
+
+        Parameters
+        ----------
+
+        editor: Editor
+            The editor that the component is drawn by, used for the step and scale
+
+        Returns
+        -------
+
+        tuple[float, float, float, float]
+            The box as (left, top, right, bottom).
+        """
+        pad = Component.EXTENT * editor.STEP * editor.SCALE
+        start = self.ports[0].position
+        end = self.ports[1].position
+        return (
+            min(start[0], end[0]) - pad, min(start[1], end[1]) - pad,
+            max(start[0], end[0]) + pad, max(start[1], end[1]) + pad
+        )
+
+    def draw_on(self, editor, layer: 'canvas.Canvas'):
         """
         Draws a single component on a canvas.
 
@@ -131,3 +238,158 @@ class Component(ABC):
         end = self.ports[1].position
         layer.fill_arc(start[0], start[1], editor.STEP // 5, 0, 2 * np.pi)
         layer.fill_arc(end[0], end[1], editor.STEP // 5, 0, 2 * np.pi)
+
+    @classmethod
+    def symbol_geometry(cls, editor, starts: np.ndarray, ends: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Computes the symbol geometry of many components of this type in one pass.
+
+        Parameters
+        ----------
+
+        editor: Editor
+            The editor that the components are drawn by, used for the step and scale
+        starts: np.ndarray
+            Positions of the first ports as an (n, 2) array
+        ends: np.ndarray
+            Positions of the second ports as an (n, 2) array
+
+        Returns
+        -------
+
+        tuple[np.ndarray, np.ndarray]
+            Line segments as an (n * len(SEGMENTS), 2, 2) array
+            and arcs as an (n * len(ARCS), 5) array of (x, y, radius, start angle, end angle).
+        """
+        unit = editor.STEP * editor.SCALE
+
+        delta = ends - starts
+        length = np.hypot(delta[:, 0], delta[:, 1])[:, None]
+        along = np.divide(delta, length, out = np.zeros_like(delta), where = length != 0)
+        orthog = np.stack((-along[:, 1], along[:, 0]), axis = 1)
+
+        def place(t, u, v):
+            # broadcasts template coordinates against every component
+            return (
+                starts[:, None, :] 
+                + t[None, :, None] * delta[:, None, :]
+                + unit * (u[None, :, None] * along[:, None, :] + v[None, :, None] * orthog[:, None, :])
+            )
+
+        points = cls.SEGMENTS.reshape(-1, 3)
+        segments = place(points[:, 0], points[:, 1], points[:, 2]).reshape(-1, 2, 2)
+
+        theta = np.arctan2(along[:, 1], along[:, 0])[:, None]
+        centres = place(cls.ARCS[:, 0], cls.ARCS[:, 1], cls.ARCS[:, 2])
+        arcs = np.empty((len(starts), len(cls.ARCS), 5))
+        arcs[..., 0:2] = centres
+        arcs[..., 2] = unit * cls.ARCS[:, 3]
+        arcs[..., 3] = theta + cls.ARCS[:, 4]
+        arcs[..., 4] = theta + cls.ARCS[:, 5]
+
+        return segments, arcs.reshape(-1, 5)
+
+    @classmethod
+    def update_symbols(cls, editor, components: list['Component']):
+        """
+        Brings the cached symbol geometry of many components of this type up to date.
+        Only components with moved ports are recomputed, and they are recomputed together in one pass.
+
+        Parameters
+        ----------
+
+        editor: Editor
+            The editor that the components are drawn by, used for the step and scale
+        components: list[Component]
+            Components to update, all of this type
+        """
+        unit = editor.STEP * editor.SCALE
+
+        stale = []
+        for component in components:
+            key = (unit, component.ports[0].revision, component.ports[1].revision)
+            if component._symbol_key != key:
+                component._symbol_key = key
+                stale.append(component)
+
+        if len(stale) == 0:
+            return
+
+        ports = np.array([
+            (component.ports[0].position, component.ports[1].position) for component in stale
+        ], dtype = float)
+        segments, arcs = cls.symbol_geometry(editor, ports[:, 0], ports[:, 1])
+        segments = segments.reshape(len(stale), -1, 2, 2)
+        arcs = arcs.reshape(len(stale), -1, 5)
+        for i, component in enumerate(stale):
+            component._symbol = (segments[i], arcs[i])
+
+    @classmethod
+    def stroke_symbols(cls, layer: 'canvas.Canvas', segments: np.ndarray, arcs: np.ndarray):
+        """
+        Strokes symbol geometry with bulk canvas calls.
+
+        Parameters
+        ----------
+
+        layer: Canvas
+            Layer to draw the symbols on
+        segments: np.ndarray
+            Line segments as an (n, 2, 2) array
+        arcs: np.ndarray
+            Arcs as an (n, 5) array of (x, y, radius, start angle, end angle)
+        """
+        if len(segments) > 0:
+            layer.stroke_line_segments(segments)
+        if len(arcs) > 0:
+            layer.stroke_arcs(arcs[:, 0], arcs[:, 1], arcs[:, 2], arcs[:, 3], arcs[:, 4])
+
+    @classmethod
+    def draw_symbols(cls, editor, layer: 'canvas.Canvas', starts: np.ndarray, ends: np.ndarray):
+        """
+        Draws the symbols of many components of this type with bulk canvas calls.
+
+        Parameters
+        ----------
+
+        editor: Editor
+            The editor object to draw on
+        layer: Canvas
+            Layer to draw the symbols on
+        starts: np.ndarray
+            Positions of the first ports as an (n, 2) array
+        ends: np.ndarray
+            Positions of the second ports as an (n, 2) array
+        """
+        cls.stroke_symbols(layer, *cls.symbol_geometry(editor, starts, ends))
+
+    @classmethod
+    def draw_many(cls, editor, layer: 'canvas.Canvas', components: list['Component']):
+        """
+        Draws many components of this type, including their end nodes, with bulk canvas calls.
+
+        Parameters
+        ----------
+
+        editor: Editor
+            The editor object to draw on
+        layer: Canvas
+            Layer to draw the components on
+        components: list[Component]
+            Components to draw, all of this type
+        """
+        if len(components) == 0:
+            return
+
+        cls.update_symbols(editor, components)
+        cls.stroke_symbols(
+            layer,
+            np.concatenate([component._symbol[0] for component in components]),
+            np.concatenate([component._symbol[1] for component in components])
+        )
+
+        # node dots
+        nodes = np.array([
+            (component.ports[0].position, component.ports[1].position) for component in components
+        ], dtype = float).reshape(-1, 2)
+        layer.fill_circles(nodes[:, 0], nodes[:, 1], editor.STEP // 5)
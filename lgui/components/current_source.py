@@ -6,6 +6,9 @@ from typing import Union
 from .component import Component
 
 
+RADIUS = 1.2
+OFFSET = 0.25
+
 class CurrentSource(Component):
     """
     CurrentSource
@@ -20,61 +23,22 @@ class CurrentSource(Component):
     TYPE = "I"
     NAME = "Current Source"
     kinds = {'DC': 'dc', 'AC': 'ac', 'Step': 'step'}
-
-    def __init__(self, value: Union[str, int, float]):
-
-        super().__init__(value)
-
-    def __draw_on__(self, editor, layer):
-
-        length = self.length()
-
-        start = self.ports[0].position
-        end = self.ports[1].position
-        mid = 0.5 * self.along() * length + start
-
-        RADIUS = 1.2 * editor.STEP * editor.SCALE
-        OFFSET = 0.25 * editor.STEP * editor.SCALE
-
+    SEGMENTS = np.array([
         # lead 1
-        shift = self.along() * RADIUS
-        layer.stroke_line(
-            start[0], start[1],
-            mid[0] - shift[0], mid[1] - shift[1]
-        )
-
+        ((0, 0, 0), (0.5, -RADIUS, 0)),
         # lead 2
-        layer.stroke_line(
-            mid[0] + shift[0], mid[1] + shift[1],
-            end[0], end[1]
-        )
-
+        ((0.5, RADIUS, 0), (1, 0, 0)),
+        # arrow line
+        ((0.5, -(RADIUS - OFFSET), 0), (0.5, RADIUS - OFFSET, 0)),
+        # arrow head
+        ((0.5, -(RADIUS - OFFSET), 0), (0.5, -(RADIUS - OFFSET) + OFFSET, -OFFSET)),
+        ((0.5, -(RADIUS - OFFSET), 0), (0.5, -(RADIUS - OFFSET) + OFFSET, OFFSET))
+    ], dtype = float)
+    ARCS = np.array([
         # circle
-        layer.stroke_arc(
-            mid[0], mid[1],
-            RADIUS,
-            0, 2 * np.pi
-        )
+        (0.5, 0, 0, RADIUS, 0, 2 * np.pi)
+    ], dtype = float)
 
-        # arrow
-        offset = (RADIUS - OFFSET) * self.along()
-        h_shift = OFFSET * self.orthog()
-        v_shift = OFFSET * self.along()
-
-        # line
-        layer.stroke_line(
-            mid[0] - offset[0], mid[1] - offset[1],
-            mid[0] + offset[0], mid[1] + offset[1]
-        )
+    def __init__(self, value: Union[str, int, float]):
 
-        # arrow head
-        layer.stroke_line(
-            mid[0] - offset[0], mid[1] - offset[1],
-            mid[0] - offset[0] - h_shift[0] + v_shift[0], mid[1] -
-            offset[1] - h_shift[1] + v_shift[1]
-        )
-        layer.stroke_line(
-            mid[0] - offset[0], mid[1] - offset[1],
-            mid[0] - offset[0] + h_shift[0] + v_shift[0], mid[1] -
-            offset[1] + h_shift[1] + v_shift[1]
-        )
+        super().__init__(value)
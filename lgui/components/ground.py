@@ -14,6 +14,8 @@ class Ground(Component):
     def __init__(self):
 
         super().__init__(None)
+        # ground flags attach at a single point
+        self.ports[1] = self.ports[0]
 
     def __draw_on__(self, editor, layer):
         pass
@@ -22,4 +24,9 @@ class Ground(Component):
         # no graphical representation
         pass
 
+    @classmethod
+    def draw_many(cls, editor, layer, components):
+        # no graphical representation
+        pass
+
     
\ No newline at end of file
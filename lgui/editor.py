@@ -2,16 +2,21 @@
 Defines the component editor class.
 """
 
-import threading
+import html
 import ipywidgets as widgets
 import ipycanvas as canvas
 import numpy as np
 
-from typing import Callable
+from typing import Callable, Iterator
 from functools import wraps
+from contextlib import contextmanager, nullcontext
 from IPython.display import display
 
 from .sheet import Sheet
+from .history import History, AddComponents
+from .instrument import Instrumentation
+from .scheduler import RenderScheduler
+from .analysis import AnalysisWorker, ResultCache
 from .components import *
 
 class Editor(canvas.MultiCanvas):
@@ -27,6 +32,10 @@ class Editor(canvas.MultiCanvas):
 
     HEIGHT = 1000
     WIDTH = 2000
+    """
+    Size of the canvas in pixels.
+    The sheet itself is unbounded and is seen through a viewport that can be panned and zoomed.
+    """
     LAYERS = 4
 
     STEP = 24
@@ -36,7 +45,32 @@ class Editor(canvas.MultiCanvas):
 
     MOVE_DELAY = 0.05
     """
-    Delay in seconds between refreshing the cursor.
+    Delay in seconds used to coalesce mouse movements into a single cursor refresh.
+    """
+
+    ZOOM_STEP = 1.25
+    """
+    Factor the zoom changes by for each key press or wheel movement.
+    """
+
+    MIN_ZOOM = 0.05
+    MAX_ZOOM = 8
+
+    PAN_STEP = 0.25
+    """
+    Fraction of the canvas the view moves by for each arrow key press.
+    """
+
+    GRID_SPACING = 8
+    """
+    Minimum pixel spacing of grid dots, coarser grids are drawn when zoomed out.
+    """
+
+    PAN_KEYS = {"ArrowLeft": (-1, 0), "ArrowRight": (1, 0), "ArrowUp": (0, -1), "ArrowDown": (0, 1)}
+
+    HISTORY_DEPTH = 100
+    """
+    Number of edits that can be undone.
     """
 
     HV_ONLY = True
@@ -64,6 +98,7 @@ class Editor(canvas.MultiCanvas):
         super().on_mouse_move(self._handle_mouse_move)
         super().on_mouse_down(self._handle_mouse_down)
         super().on_key_down(self._handle_key)
+        super().on_mouse_wheel(self._handle_mouse_wheel)
 
         self.component_selector = widgets.ToggleButtons(
             options = {
@@ -77,16 +112,47 @@ class Editor(canvas.MultiCanvas):
             },
             value = Wire
         )
+        self.component_selector.observe(lambda change: self.scheduler.request(), names = "value")
 
-        self.discard_buffer: list[Component] = []
+        self.history: History = History(self.sheet, Editor.HISTORY_DEPTH)
         """
-        When a component is removed from the board with CTRL+Z it is added to the discard buffer.
-        It can then be returned with CTRL+Y.
+        Edits of the sheet, undone with CTRL+Z and redone with CTRL+Y.
         """
 
-        self.on_client_ready(self._draw_grid)
+        self.analyser: AnalysisWorker = AnalysisWorker(cache = ResultCache())
+        """
+        Solves the sheet in a background process.
+        Replace its cache with one that has a directory to share results between editors.
+        """
+        self.analyse_button = widgets.Button(description = "Analyse")
+        self.analyse_button.on_click(lambda button: self.analyse())
+        self.results = widgets.HTML()
+
+        self.offset: tuple[float, float] = (0, 0)
+        """
+        Sheet position shown at the top left of the canvas.
+        """
+        self.zoom: float = 1
+        """
+        Canvas pixels per sheet unit.
+        """
+        self._view_changed = False
+
         self.mouse_position = (0, 0)
-        self.on_client_ready(self._refresh)
+        """
+        Position of the mouse on the sheet.
+        """
+        self.instrumentation: Instrumentation = None
+        """
+        Records the cost of each event while instrumentation is enabled.
+        """
+        self.scheduler = RenderScheduler(self._refresh, Editor.MOVE_DELAY)
+        """
+        Redraws the cursor and active layers only when they are marked dirty.
+        """
+
+        self.on_client_ready(self.redraw)
+        self.on_client_ready(self.scheduler.request)
 
     def _draws(f: Callable) -> Callable:
         """
@@ -94,19 +160,140 @@ class Editor(canvas.MultiCanvas):
         """
         @wraps(f)
         def inner(self, *args, **kwargs):
-            with canvas.hold_canvas():
+            with self._measured(f.__name__), canvas.hold_canvas():
                 f(self, *args, **kwargs)
         return inner
 
+    def _measured(self, name: str):
+        """
+        Measures an event if instrumentation is enabled.
+        """
+        if self.instrumentation is None:
+            return nullcontext()
+        return self.instrumentation.event(name)
+
+    def enable_instrumentation(self, trace_limit: int = 100000) -> Instrumentation:
+        """
+        Starts recording the latency, canvas commands, messages and bytes of each event.
+        Instrumentation adds a little overhead to every canvas command, so it is off by default.
+
+        Parameters
+        ----------
+
+        trace_limit: int = 100000
+            The number of events kept for the trace.
+
+        Returns
+        -------
+
+        Instrumentation
+            The recorder, also available as the instrumentation attribute.
+        """
+        if self.instrumentation is None:
+            self.instrumentation = Instrumentation(trace_limit)
+            self.instrumentation.install()
+        return self.instrumentation
+
+    def disable_instrumentation(self):
+        """
+        Stops recording events and discards what was recorded.
+        """
+        if self.instrumentation is not None:
+            self.instrumentation.uninstall()
+            self.instrumentation = None
+
+    @contextmanager
+    def _viewed(self, layer: canvas.Canvas) -> Iterator[canvas.Canvas]:
+        """
+        Draws on a layer in sheet coordinates, transformed by the viewport.
+        """
+        layer.save()
+        layer.set_transform(
+            self.zoom, 0, 0, self.zoom,
+            -self.offset[0] * self.zoom, -self.offset[1] * self.zoom
+        )
+        try:
+            yield layer
+        finally:
+            layer.restore()
+
+    def to_sheet(self, x: float, y: float) -> tuple[float, float]:
+        """
+        Converts a canvas pixel position to a sheet position.
+        """
+        return (x / self.zoom + self.offset[0], y / self.zoom + self.offset[1])
+
+    def view_bounds(self) -> tuple[float, float, float, float]:
+        """
+        Computes the region of the sheet that is visible as (left, top, right, bottom).
+        """
+        left, top = self.offset
+        return (left, top, left + Editor.WIDTH / self.zoom, top + Editor.HEIGHT / self.zoom)
+
+    def set_view(self, offset: tuple[float, float] = None, zoom: float = None):
+        """
+        Moves the viewport.
+        The canvas is redrawn on the next refresh, so bursts of movements only redraw once.
+
+        Parameters
+        ----------
+
+        offset: tuple[float, float] = None
+            Sheet position to show at the top left of the canvas,
+            if none specified the offset is unchanged.
+        zoom: float = None
+            Canvas pixels per sheet unit, limited to between MIN_ZOOM and MAX_ZOOM,
+            if none specified the zoom is unchanged.
+        """
+        if offset is not None:
+            self.offset = (float(offset[0]), float(offset[1]))
+        if zoom is not None:
+            self.zoom = min(Editor.MAX_ZOOM, max(Editor.MIN_ZOOM, zoom))
+        self._view_changed = True
+        self.scheduler.request()
+
+    def zoom_by(self, factor: float, anchor: tuple[float, float] = None):
+        """
+        Zooms the viewport, keeping a sheet position at the same place on the canvas.
+
+        Parameters
+        ----------
+
+        factor: float
+            Factor to multiply the zoom by, above 1 zooms in.
+        anchor: tuple[float, float] = None
+            Sheet position to zoom about,
+            if none specified it will zoom about the centre of the view.
+        """
+        if anchor is None:
+            left, top, right, bottom = self.view_bounds()
+            anchor = ((left + right) / 2, (top + bottom) / 2)
+        zoom = min(Editor.MAX_ZOOM, max(Editor.MIN_ZOOM, self.zoom * factor))
+        ratio = self.zoom / zoom
+        self.set_view((
+            anchor[0] - (anchor[0] - self.offset[0]) * ratio,
+            anchor[1] - (anchor[1] - self.offset[1]) * ratio
+        ), zoom)
+
+    def pan_by(self, dx: float, dy: float):
+        """
+        Pans the viewport by a distance in canvas pixels.
+        """
+        self.set_view((self.offset[0] + dx / self.zoom, self.offset[1] + dy / self.zoom))
+
     def _refresh(self):
         """
-        Refreshes the canvas
+        Refreshes the cursor and active layers, and everything else if the view has moved.
+        Called by the render scheduler once per frame.
         """
 
-        super().on_mouse_move(self._handle_mouse_move, True)
         x, y = self.mouse_position
 
-        with canvas.hold_canvas():
+        with self._measured("_refresh"), canvas.hold_canvas():
+            if self._view_changed:
+                self._view_changed = False
+                self.redraw()
+
             # deal with active component rendering
             if self.active_component is not None:
                 if self.active_component.TYPE != Ground.TYPE:
@@ -135,28 +322,38 @@ class Editor(canvas.MultiCanvas):
                         )
 
                 self.active_layer.clear()
-                self.active_component.draw_on(self, self.active_layer)
+                with self._viewed(self.active_layer):
+                    self.active_component.draw_on(self, self.active_layer)
 
             elif self.component_selector.value.TYPE == Ground.TYPE:
                 self.active_component = Ground()
 
             # draw a cursor for the user
             self.cursor_layer.clear()
-            self.cursor_layer.stroke_rect(
-                (x - (round(x) % Editor.STEP)) - Editor.STEP // 2, 
-                (y - (round(y) % Editor.STEP)) - Editor.STEP // 2,
-                Editor.STEP
-            )
-
-        super().on_mouse_move(self._handle_mouse_move, False)  
-        threading.Timer(Editor.MOVE_DELAY, self._refresh).start()
+            with self._viewed(self.cursor_layer):
+                self.cursor_layer.stroke_rect(
+                    (x - (round(x) % Editor.STEP)) - Editor.STEP // 2, 
+                    (y - (round(y) % Editor.STEP)) - Editor.STEP // 2,
+                    Editor.STEP
+                )
 
     def _handle_mouse_move(self, x: int, y: int):
         """
         Handles mouse movements.
         Registered with canvas in __init__
         """
-        self.mouse_position = (x, y)
+        self.mouse_position = self.to_sheet(x, y)
+        self.scheduler.request()
+
+    def _handle_mouse_wheel(self, dx: float, dy: float):
+        """
+        Handles mouse wheel movements by zooming about the mouse.
+        Registered with canvas in __init__
+        """
+        if dy < 0:
+            self.zoom_by(Editor.ZOOM_STEP, self.mouse_position)
+        elif dy > 0:
+            self.zoom_by(1 / Editor.ZOOM_STEP, self.mouse_position)
 
     @_draws
     def _handle_mouse_down(self, x: int, y: int):
@@ -165,18 +362,21 @@ class Editor(canvas.MultiCanvas):
         Registered with canvas in __init__
         """
 
+        x, y = self.to_sheet(x, y)
         x, y = round(x), round(y)
 
         if self.active_component is not None:
 
-            if self.active_component.TYPE != Ground.TYPE:
-                self.sheet.add_component(self.active_component)
-            else:
+            if self.active_component.TYPE == Ground.TYPE:
                 port = self.active_component.ports[0]
                 port.position = (x - (round(x) % Editor.STEP), y - (round(y) % Editor.STEP))
-                x, y = round(port.position[0]), round(port.position[1])
-                self.sheet.nodes[(x, y)] = 0
+            self.history.do(AddComponents([self.active_component]))
+            self._sheet_changed()
             
+            # only the new component needs drawing
+            with self._viewed(self.component_layer):
+                self.active_component.draw_on(self, self.component_layer)
+
             if self.active_component.TYPE == Wire.TYPE:
                 last_component = self.active_component
                 self.active_component = Wire()
@@ -185,8 +385,6 @@ class Editor(canvas.MultiCanvas):
                 self.active_component = None
 
             self.active_layer.clear()
-            self.component_layer.clear()
-            self.draw_components()
         else:
             # no active component
             # set component from selector
@@ -196,6 +394,8 @@ class Editor(canvas.MultiCanvas):
                 self.active_component = self.component_selector.value(None)
             self.active_component.ports[0].position = (x - (round(x) % Editor.STEP), y - (round(y) % Editor.STEP))
 
+        self.scheduler.request()
+
     @_draws
     def _handle_key(self, key: str, shift_key: bool, ctrl_key: bool, meta_key: bool):
         """
@@ -214,23 +414,66 @@ class Editor(canvas.MultiCanvas):
                 # CTRL + Z
                 self.active_component = None
                 self.active_layer.clear()
-                self.discard_buffer.append(self.sheet.components.pop())
-                self.component_layer.clear()
-                self.draw_components()
+                command = self.history.undo()
+                if command is not None:
+                    self._sheet_changed()
+                    self.repaint(command.bounds(self))
             elif str(key) == "y":
                 # CTRL + Y
-                if len(self.discard_buffer) > 0:
-                    self.sheet.add_component(self.discard_buffer.pop())
-                    self.component_layer.clear()
-                    self.draw_components()
+                command = self.history.redo()
+                if command is not None:
+                    self._sheet_changed()
+                    self.repaint(command.bounds(self))
+
+        elif str(key) in Editor.PAN_KEYS:
+            dx, dy = Editor.PAN_KEYS[str(key)]
+            self.pan_by(dx * Editor.PAN_STEP * Editor.WIDTH, dy * Editor.PAN_STEP * Editor.HEIGHT)
+
+        elif str(key) in ("+", "="):
+            self.zoom_by(Editor.ZOOM_STEP)
+
+        elif str(key) == "-":
+            self.zoom_by(1 / Editor.ZOOM_STEP)
+
+        self.scheduler.request()
+
+    @_draws
+    def redraw(self):
+        """
+        Redraws the grid and the visible sheet components for the current view.
+        """
+        self._draw_grid()
+        self.component_layer.clear()
+        self.draw_components()
 
     @_draws
     def _draw_grid(self):
-        """Draws a grid based upon the step size."""
-        for i in range(Editor.WIDTH // Editor.STEP):
-            for j in range(Editor.HEIGHT // Editor.STEP):
-                self.grid_layer.fill_style = "#252525"
-                self.grid_layer.fill_rect(i * Editor.STEP, j * Editor.STEP, 1)
+        """
+        Draws a grid based upon the step size over the visible region.
+        When zoomed out the grid only shows every other step, as often as needed to keep dots apart.
+        All grid dots are sent to the canvas as a single batched command.
+        """
+        spacing = Editor.STEP
+        while spacing * self.zoom < Editor.GRID_SPACING:
+            spacing *= 2
+
+        left, top, right, bottom = self.view_bounds()
+        x, y = np.meshgrid(
+            (np.arange(np.ceil(left / spacing) * spacing, right, spacing) - left) * self.zoom,
+            (np.arange(np.ceil(top / spacing) * spacing, bottom, spacing) - top) * self.zoom
+        )
+        self.grid_layer.clear()
+        self.grid_layer.fill_style = "#252525"
+        self.grid_layer.fill_rects(x.ravel(), y.ravel(), 1)
+
+    def close(self):
+        """
+        Stops refreshing the canvas and closes the widget.
+        """
+        self.scheduler.close()
+        self.analyser.close()
+        self.disable_instrumentation()
+        super().close()
 
     def display(self):
         """
@@ -240,10 +483,54 @@ class Editor(canvas.MultiCanvas):
         display(self)
         # show buttons
         display(self.component_selector)
+        # show analysis
+        display(self.analyse_button)
+        display(self.results)
 
-    def draw_components(self, layer: canvas.Canvas = None):
+    def analyse(self):
         """
-        Draws sheet components on canvas.
+        Solves the sheet in the background and shows the node voltages once done.
+        The editor stays interactive while solving, and editing the sheet abandons the solve.
+        """
+        self.results.value = "Solving..."
+        self.analyser.submit(self.sheet, self._show_results, self._show_error)
+
+    def _show_results(self, voltages: dict[str, str]):
+        """
+        Shows node voltages from the analyser.
+        """
+        rows = "".join(
+            f"<tr><td>V<sub>{node}</sub></td><td>{html.escape(voltage)}</td></tr>" 
+            for node, voltage in voltages.items()
+        )
+        self.results.value = f"<table>{rows}</table>"
+
+    def _show_error(self, exception: Exception):
+        """
+        Shows a failure from the analyser.
+        """
+        self.results.value = f"Analysis failed: {html.escape(str(exception))}"
+
+    def _sheet_changed(self):
+        """
+        Abandons any analysis of the sheet before it was edited.
+        """
+        if self.analyser.busy:
+            self.analyser.cancel()
+        self.results.value = ""
+
+    def visible_components(self) -> list[Component]:
+        """
+        Finds the sheet components that can be seen in the current view.
+        """
+        left, top, right, bottom = self.view_bounds()
+        pad = Component.EXTENT * Editor.STEP * Editor.SCALE
+        return self.sheet.components_in((left - pad, top - pad, right + pad, bottom + pad))
+
+    def draw_components(self, layer: canvas.Canvas = None, components: list[Component] = None):
+        """
+        Draws sheet components on canvas, in sheet coordinates transformed by the viewport.
+        Components are batched by type so each type is drawn with a handful of bulk canvas calls.
         
         Parameters
         ----------
@@ -251,10 +538,50 @@ class Editor(canvas.MultiCanvas):
         layer: Canvas = None
             Layer to draw sheet components on,
             if none specified it will draw on the component layer.
+        components: list[Component] = None
+            Components to draw,
+            if none specified it will draw the visible sheet components.
         """
 
         if layer is None:
             layer = self.component_layer
+        if components is None:
+            components = self.visible_components()
+
+        batches: dict[type, list[Component]] = {}
+        for component in components:
+            batches.setdefault(type(component), []).append(component)
+
+        with self._viewed(layer):
+            for component_type, batch in batches.items():
+                component_type.draw_many(self, layer, batch)
+
+    def repaint(self, bounds: tuple[float, float, float, float], layer: canvas.Canvas = None):
+        """
+        Clears a region of a layer and redraws only the sheet components that overlap it.
+
+        Parameters
+        ----------
+
+        bounds: tuple[float, float, float, float]
+            Region of the sheet to repaint as (left, top, right, bottom).
+        layer: Canvas = None
+            Layer to repaint,
+            if none specified it will repaint the component layer.
+        """
+
+        if layer is None:
+            layer = self.component_layer
+
+        left, top, right, bottom = bounds
+
+        with self._viewed(layer):
+            layer.clear_rect(left, top, right - left, bottom - top)
 
-        for component in self.sheet.components:
-            component.draw_on(self, layer)
\ No newline at end of file
+            # clip so neighbouring components are not drawn over themselves outside the region
+            layer.begin_path()
+            layer.rect(left, top, right - left, bottom - top)
+            layer.clip()
+            pad = Component.EXTENT * Editor.STEP * Editor.SCALE
+            overlapping = self.sheet.components_in((left - pad, top - pad, right + pad, bottom + pad))
+            self.draw_components(layer, overlapping)
@@ -0,0 +1,373 @@
+"""
+Defines sub-sheets that are placed on other sheets as instances of one shared definition.
+"""
+
+import numpy as np
+
+from typing import Iterable
+
+from .components import Component, Wire, Ground
+from .components.component import Node
+from .sheet import Sheet
+from .table import ComponentTable, ComponentView
+from .importer import GROUND
+
+
+class Definition:
+
+    """
+    A sub-sheet, such as a filter stage, that is placed on other sheets as instances.
+    Every instance shares the definition, so a block placed many times is stored once.
+    Its netlist is worked out once into a template that instances fill in with their own node names,
+    and its drawing is computed once and translated to each instance.
+    Both are worked out again only after the sub-sheet is edited.
+
+    Instances already on a sheet pick up edits to the definition the next time its netlist is formatted.
+
+    Parameters
+    ----------
+
+    name: str
+        The name of the definition.
+    sheet: Sheet
+        The sub-sheet.
+    ports: dict[str, tuple[int, int]]
+        The positions on the sub-sheet that instances connect to, keyed by port name, in port order.
+    """
+
+    def __init__(self, name: str, sheet: Sheet, ports: dict[str, tuple[int, int]]):
+
+        self.name: str = name
+        self.sheet: Sheet = sheet
+        self.ports: dict[str, tuple[int, int]] = dict(ports)
+
+        self._template_key: tuple = None
+        self._template: list[tuple] = None
+        self._box_key: tuple = None
+        self._box: tuple[float, float, float, float] = None
+        self._geometry_key: tuple = None
+        self._geometry: tuple[np.ndarray, np.ndarray, np.ndarray] = None
+
+    @property
+    def revision(self) -> tuple:
+        """
+        Changes whenever the sub-sheet, or the definition of an instance on it, is edited.
+        """
+        return (self.sheet.revision,) + tuple(
+            component.definition.revision for component in self.sheet.components if isinstance(component, Instance)
+        )
+
+    def template(self) -> list[tuple]:
+        """
+        Gets the netlist of the sub-sheet with its nodes marked as ports, ground or internal,
+        for instances to fill in.
+
+        Returns
+        -------
+
+        list[tuple]
+            Rows of (type, name, positive, negative, kind, value, initial value),
+            where each node is a tuple of (True, port name) or (False, node name).
+
+        Raises
+        ------
+
+        ValueError
+            If a port is not on any component of the sub-sheet, is on its ground net
+            or is on the same net as another port.
+        """
+        key = self.revision
+        if self._template_key == key:
+            return self._template
+
+        sheet = self.sheet
+        ports = {}
+        for name, position in self.ports.items():
+            try:
+                net = str(sheet.net(position))
+            except KeyError:
+                raise ValueError(f"port '{name}' of '{self.name}' is not connected to anything") from None
+            # either would quietly join the outer nets of an instance to ground or to each other
+            if net == GROUND:
+                raise ValueError(f"port '{name}' of '{self.name}' is connected to ground")
+            if net in ports:
+                raise ValueError(f"ports '{ports[net]}' and '{name}' of '{self.name}' are connected to each other")
+            ports[net] = name
+
+        def node(name: str) -> tuple[bool, str]:
+            if name == GROUND:
+                return (False, GROUND)
+            if name in ports:
+                return (True, ports[name])
+            return (False, name)
+
+        template = []
+        for component_type, name, positive, negative, kind, value, initial in _rows(sheet, sheet.components):
+            template.append((component_type, name, node(positive), node(negative), kind, value, initial))
+
+        self._template = template
+        self._template_key = key
+        return template
+
+    def box(self) -> tuple[float, float, float, float]:
+        """
+        Gets the box spanned by the ports of every component of the sub-sheet, as (left, top, right, bottom).
+        """
+        key = self.revision
+        if self._box_key != key:
+            boxes = [Sheet._box(component) for component in self.sheet.components]
+            boxes.extend((x, y, x, y) for x, y in self.ports.values())
+            boxes = np.array(boxes, dtype = float).reshape(-1, 4)
+            self._box = (*boxes[:, :2].min(axis = 0).tolist(), *boxes[:, 2:].max(axis = 0).tolist())
+            self._box_key = key
+        return self._box
+
+    def geometry(self, editor) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Gets the drawing of the sub-sheet with its origin at (0, 0),
+        computed once for each scale and only again after the sub-sheet is edited.
+
+        Parameters
+        ----------
+
+        editor: Editor
+            The editor that instances are drawn by, used for the step and scale
+
+        Returns
+        -------
+
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            Line segments as an (n, 2, 2) array, arcs as an (n, 5) array of
+            (x, y, radius, start angle, end angle) and node dots as an (n, 2) array.
+        """
+        unit = editor.STEP * editor.SCALE
+        key = (unit, self.revision)
+        if self._geometry_key == key:
+            return self._geometry
+
+        batches: dict[type, list[Component]] = {}
+        for component in self.sheet.components:
+            component_type = component.component_type if isinstance(component, ComponentView) else type(component)
+            batches.setdefault(component_type, []).append(component)
+
+        segments, arcs, dots = [np.empty((0, 2, 2))], [np.empty((0, 5))], [np.empty((0, 2))]
+        for component_type, batch in batches.items():
+            if component_type is Ground:
+                # no graphical representation
+                continue
+            if component_type is Instance:
+                parts = Instance.geometry(editor, batch)
+            else:
+                ports = np.array([(component.ports[0].position, component.ports[1].position) for component in batch], dtype = float)
+                parts = (*component_type.symbol_geometry(editor, ports[:, 0], ports[:, 1]), ports.reshape(-1, 2))
+            for part, array in zip((segments, arcs, dots), parts):
+                part.append(array)
+
+        # outline the block so it reads as one part
+        pad = Component.EXTENT * unit
+        left, top, right, bottom = self.box()
+        left, top, right, bottom = left - pad, top - pad, right + pad, bottom + pad
+        segments.append(np.array([
+            ((left, top), (right, top)), ((right, top), (right, bottom)),
+            ((right, bottom), (left, bottom)), ((left, bottom), (left, top))
+        ], dtype = float))
+
+        self._geometry = tuple(np.concatenate(part) for part in (segments, arcs, dots))
+        self._geometry_key = key
+        return self._geometry
+
+
+class Instance(Component):
+
+    """
+    A placement of a definition on a sheet.
+    The instance has a port for each port of the definition and is expanded into the components
+    of the definition only when the netlist is formatted.
+    Internal nodes are named after the instance, e.g. X1_3, and component names gain its name, e.g. R2X1.
+
+    Sheets holding instances must be flattened with flatten before being compacted or saved.
+
+    Parameters
+    ----------
+
+    definition: Definition
+        The definition to place.
+    position: tuple[int, int] = (0, 0)
+        The sheet position of the origin of the sub-sheet.
+    """
+
+    TYPE = "X"
+    NAME = "Block"
+
+    def __init__(self, definition: Definition, position: tuple[int, int] = (0, 0)):
+
+        super().__init__(None)
+        self.definition: Definition = definition
+        self.position: tuple[int, int] = tuple(position)
+        self.ports: list[Node] = []
+        for x, y in definition.ports.values():
+            port = Node()
+            port.position = (x + self.position[0], y + self.position[1])
+            self.ports.append(port)
+
+    @property
+    def prefix(self) -> str:
+        """
+        The name the instance adds to its internal nodes and components.
+        """
+        return f"{Instance.TYPE}{self.id}"
+
+    def span(self) -> tuple[float, float, float, float]:
+        """
+        Gets the box spanned by the components of the instance, as (left, top, right, bottom).
+        """
+        left, top, right, bottom = self.definition.box()
+        x, y = self.position
+        return (left + x, top + y, right + x, bottom + y)
+
+    def bounds(self, editor) -> tuple[float, float, float, float]:
+
+        pad = Component.EXTENT * editor.STEP * editor.SCALE
+        left, top, right, bottom = self.span()
+        return (left - pad, top - pad, right + pad, bottom + pad)
+
+    def expand(self, sheet: Sheet) -> list[tuple]:
+        """
+        Fills in the template of the definition with the nodes of the instance.
+
+        Parameters
+        ----------
+
+        sheet: Sheet
+            The sheet the instance is placed on, whose nets the ports join.
+
+        Returns
+        -------
+
+        list[tuple]
+            Rows of (type, name, positive, negative, kind, value, initial value).
+        """
+        prefix = self.prefix
+        nets = {name: str(sheet.net(port.position)) for name, port in zip(self.definition.ports, self.ports)}
+
+        def node(marked: tuple[bool, str]) -> str:
+            port, name = marked
+            if port:
+                return nets[name]
+            return name if name == GROUND else f"{prefix}_{name}"
+
+        return [
+            (component_type, f"{name}{prefix}", node(positive), node(negative), kind, value, initial)
+            for component_type, name, positive, negative, kind, value, initial in self.definition.template()
+        ]
+
+    def netlist_line(self, sheet: Sheet) -> str:
+        """
+        Produces the netlist lines of the expanded instance, joined by newlines.
+        """
+        return "\n".join(
+            Sheet.format_line(name, positive, negative, kind, value)
+            for _, name, positive, negative, kind, value, _ in self.expand(sheet)
+        )
+
+    @classmethod
+    def geometry(cls, editor, instances: list['Instance']) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Translates the cached drawings of many instances into place.
+
+        Returns
+        -------
+
+        tuple[np.ndarray, np.ndarray, np.ndarray]
+            Line segments, arcs and node dots as returned by Definition.geometry.
+        """
+        segments, arcs, dots = [np.empty((0, 2, 2))], [np.empty((0, 5))], [np.empty((0, 2))]
+        for instance in instances:
+            definition_segments, definition_arcs, definition_dots = instance.definition.geometry(editor)
+            offset = np.array(instance.position, dtype = float)
+            segments.append(definition_segments + offset)
+            moved = definition_arcs.copy()
+            moved[:, 0:2] += offset
+            arcs.append(moved)
+            dots.append(definition_dots + offset)
+        return tuple(np.concatenate(part) for part in (segments, arcs, dots))
+
+    def draw_on(self, editor, layer):
+
+        Instance.draw_many(editor, layer, [self])
+
+    @classmethod
+    def draw_many(cls, editor, layer, components: list['Instance']):
+        """
+        Draws many instances with one call for each of their lines, arcs and node dots.
+        """
+        if len(components) == 0:
+            return
+        segments, arcs, dots = cls.geometry(editor, components)
+        cls.stroke_symbols(layer, segments, arcs)
+        if len(dots) > 0:
+            layer.fill_circles(dots[:, 0], dots[:, 1], editor.STEP // 5)
+
+
+def _rows(sheet: Sheet, components: Iterable[Component]) -> list[tuple]:
+    """
+    Lists the netlist rows of components on a sheet, expanding instances.
+    """
+    rows = []
+    for component in components:
+        if component.TYPE in (Wire.TYPE, Ground.TYPE):
+            continue
+        if isinstance(component, Instance):
+            rows.extend(component.expand(sheet))
+            continue
+        rows.append((
+            component.TYPE, f"{component.TYPE}{component.id}",
+            str(sheet.net(component.ports[0].position)), str(sheet.net(component.ports[1].position)),
+            component.kind, component.value, component.initial_value
+        ))
+    return rows
+
+
+def netlist_rows(sheet: Sheet) -> list[tuple]:
+    """
+    Lists the components of a sheet as netlist rows, with instances expanded.
+
+    Returns
+    -------
+
+    list[tuple]
+        Rows of (type, name, positive, negative, kind, value, initial value).
+    """
+    return _rows(sheet, sheet.components)
+
+
+def _copy(table: ComponentTable, components: Iterable[Component], offset: tuple[float, float], top: bool):
+    """
+    Copies components into a table, expanding instances in place.
+    """
+    for component in components:
+        if isinstance(component, Instance):
+            x, y = component.position
+            _copy(table, component.definition.sheet.components, (offset[0] + x, offset[1] + y), False)
+            continue
+        component_type = component.component_type if isinstance(component, ComponentView) else type(component)
+        (x0, y0), (x1, y1) = component.ports[0].position, component.ports[1].position
+        table.append(
+            component_type,
+            (x0 + offset[0], y0 + offset[1]), (x1 + offset[0], y1 + offset[1]),
+            component.value, component.kind, component.initial_value,
+            # copies within instances are given new ids, so repeated blocks do not clash
+            component.id if top else None
+        )
+
+
+def flatten(sheet: Sheet) -> Sheet:
+    """
+    Copies a sheet into a new flat sheet, with every instance replaced by the components of its definition.
+    The components are stored in a ComponentTable, so the flat sheet can be saved.
+    """
+    table = ComponentTable()
+    _copy(table, sheet.components, (0, 0), True)
+    flat = Sheet(sheet.name, sheet.author)
+    flat.add_rows(table)
+    return flat
@@ -0,0 +1,335 @@
+"""
+Defines the undo and redo history of sheet edits.
+"""
+
+import time
+
+from abc import ABC, abstractmethod
+from collections import deque
+from typing import Union
+
+from .sheet import Sheet
+from .components import Component, Wire
+from .components.component import Node
+from .hierarchy import Instance
+
+
+def _union(boxes: list[tuple[float, float, float, float]]) -> tuple[float, float, float, float]:
+    """
+    Computes the box covering several boxes.
+    """
+    lefts, tops, rights, bottoms = zip(*boxes)
+    return (min(lefts), min(tops), max(rights), max(bottoms))
+
+
+class Command(ABC):
+
+    """
+    A reversible edit of a sheet.
+    """
+
+    def __init__(self, components: list[Component]):
+
+        self.components: list[Component] = list(components)
+        """
+        The components the command affects.
+        """
+
+    @abstractmethod
+    def apply(self, sheet: Sheet):
+        """
+        Makes the edit.
+        """
+        pass
+
+    @abstractmethod
+    def revert(self, sheet: Sheet):
+        """
+        Undoes the edit.
+        """
+        pass
+
+    def merge(self, command: 'Command') -> bool:
+        """
+        Absorbs a command that was applied straight after this one, so both are undone in one step.
+
+        Returns
+        -------
+
+        bool
+            Whether the command was absorbed.
+        """
+        return False
+
+    def bounds(self, editor) -> tuple[float, float, float, float]:
+        """
+        Computes the region of the sheet that needs repainting once the command is applied or reverted.
+        """
+        return _union([component.bounds(editor) for component in self.components])
+
+
+class AddComponents(Command):
+
+    """
+    Adds components to a sheet.
+    Wires placed one after another as a chain are merged into one command.
+    """
+
+    def apply(self, sheet: Sheet):
+
+        for component in self.components:
+            sheet.add_component(component)
+
+    def revert(self, sheet: Sheet):
+
+        for component in reversed(self.components):
+            sheet.remove_component(component)
+
+    def merge(self, command: Command) -> bool:
+
+        if not isinstance(command, AddComponents):
+            return False
+        if not all(component.TYPE == Wire.TYPE for component in self.components + command.components):
+            return False
+        if self.components[-1].ports[1].position != command.components[0].ports[0].position:
+            return False
+        self.components.extend(command.components)
+        return True
+
+
+class RemoveComponents(Command):
+
+    """
+    Removes components from a sheet.
+    """
+
+    def apply(self, sheet: Sheet):
+
+        for component in self.components:
+            sheet.remove_component(component)
+
+    def revert(self, sheet: Sheet):
+
+        for component in reversed(self.components):
+            sheet.add_component(component)
+
+
+class MoveComponent(Command):
+
+    """
+    Moves the ports of a component.
+    Instances of sub-sheets can only be moved without changing their shape, and their origin moves with their ports.
+
+    Parameters
+    ----------
+
+    component: Component
+        The component to move.
+    *positions: tuple[float, float]
+        The new position of each port, in port order.
+    """
+
+    def __init__(self, component: Component, *positions: tuple[float, float]):
+
+        super().__init__([component])
+        if len(positions) != len(component.ports):
+            raise ValueError(f"{len(component.ports)} port positions are needed to move {component.NAME.lower()}")
+        self.before = tuple(port.position for port in component.ports)
+        self.after = tuple(tuple(position) for position in positions)
+
+        self.origins: tuple[tuple[float, float], tuple[float, float]] = None
+        if isinstance(component, Instance):
+            offsets = {(x1 - x0, y1 - y0) for (x0, y0), (x1, y1) in zip(self.before, self.after)}
+            if len(offsets) > 1:
+                raise ValueError("the ports of an instance must all be moved by the same amount")
+            dx, dy = offsets.pop() if offsets else (0, 0)
+            x, y = component.position
+            self.origins = ((x, y), (x + dx, y + dy))
+
+    def _move(self, sheet: Sheet, positions: tuple[tuple[float, float], ...], origin: tuple[float, float]):
+        """
+        Moves the component by taking it off the sheet and putting it back, so its nets are redone.
+        The component is given ports of its own, so components it shared them with do not move too.
+        """
+        component = self.components[0]
+        sheet.remove_component(component)
+        if isinstance(component, Component):
+            # ports may be shared with chained wires, which must stay where they are,
+            # while a ground flag's one node stays shared between its ports
+            fresh = {}
+            component.ports = [fresh.setdefault(id(port), Node()) for port in component.ports]
+        for port, position in zip(component.ports, positions):
+            port.position = position
+        if origin is not None:
+            component.position = origin
+        sheet.add_component(component)
+
+    def apply(self, sheet: Sheet):
+
+        self._move(sheet, self.after, None if self.origins is None else self.origins[1])
+
+    def revert(self, sheet: Sheet):
+
+        self._move(sheet, self.before, None if self.origins is None else self.origins[0])
+
+    def bounds(self, editor) -> tuple[float, float, float, float]:
+
+        pad = Component.EXTENT * editor.STEP * editor.SCALE
+        if self.origins is not None:
+            left, top, right, bottom = self.components[0].definition.box()
+            boxes = [(left + x, top + y, right + x, bottom + y) for x, y in self.origins]
+        else:
+            boxes = [(x, y, x, y) for x, y in self.before + self.after]
+        left, top, right, bottom = _union(boxes)
+        return (left - pad, top - pad, right + pad, bottom + pad)
+
+
+class EditComponent(Command):
+
+    """
+    Changes the value, kind or initial value of a component.
+
+    Parameters
+    ----------
+
+    component: Component
+        The component to edit.
+    **changes: Union[str, int, float]
+        New values of the attributes to change, e.g. value = 10.
+    """
+
+    ATTRIBUTES = ("value", "kind", "initial_value")
+
+    def __init__(self, component: Component, **changes: Union[str, int, float]):
+
+        super().__init__([component])
+        for name in changes:
+            if name not in EditComponent.ATTRIBUTES:
+                raise ValueError(f"cannot edit component attribute '{name}'")
+        self.before = {name: getattr(component, name) for name in changes}
+        self.after = changes
+
+    def _set(self, sheet: Sheet, values: dict[str, Union[str, int, float]]):
+
+        component = self.components[0]
+        for name, value in values.items():
+            setattr(component, name, value)
+        sheet.update_component(component)
+
+    def apply(self, sheet: Sheet):
+
+        self._set(sheet, self.after)
+
+    def revert(self, sheet: Sheet):
+
+        self._set(sheet, self.before)
+
+
+class History:
+
+    """
+    Undo and redo stacks of commands applied to a sheet.
+    Only the most recent commands are kept, so memory stays bounded however long the session.
+    Making a new edit discards anything that was undone.
+
+    Parameters
+    ----------
+
+    sheet: Sheet
+        The sheet that commands are applied to.
+    depth: int = 100
+        The number of commands that can be undone.
+    coalesce: float = 1.5
+        Seconds within which a command may be merged into the one before, e.g. wires placed as a chain.
+    """
+
+    def __init__(self, sheet: Sheet, depth: int = 100, coalesce: float = 1.5):
+
+        self.sheet: Sheet = sheet
+        self.coalesce: float = coalesce
+        self._undo: deque[Command] = deque(maxlen = depth)
+        self._redo: list[Command] = []
+        self._last_time: float = None
+
+    @property
+    def depth(self) -> int:
+        """
+        The number of commands that can be undone.
+        """
+        return self._undo.maxlen
+
+    @property
+    def can_undo(self) -> bool:
+
+        return len(self._undo) > 0
+
+    @property
+    def can_redo(self) -> bool:
+
+        return len(self._redo) > 0
+
+    def do(self, command: Command) -> Command:
+        """
+        Applies a command and records it.
+
+        Returns
+        -------
+
+        Command
+            The command recorded, which is an earlier command if the new one was merged into it.
+        """
+        command.apply(self.sheet)
+        self._redo.clear()
+
+        now = time.monotonic()
+        recent = self._last_time is not None and now - self._last_time <= self.coalesce
+        self._last_time = now
+
+        if recent and self._undo and self._undo[-1].merge(command):
+            return self._undo[-1]
+        self._undo.append(command)
+        return command
+
+    def undo(self) -> Command:
+        """
+        Reverts the most recent command.
+
+        Returns
+        -------
+
+        Command
+            The command reverted, or None if there is nothing to undo.
+        """
+        if not self._undo:
+            return None
+        command = self._undo.pop()
+        command.revert(self.sheet)
+        self._redo.append(command)
+        self._last_time = None
+        return command
+
+    def redo(self) -> Command:
+        """
+        Applies the most recently undone command again.
+
+        Returns
+        -------
+
+        Command
+            The command applied, or None if there is nothing to redo.
+        """
+        if not self._redo:
+            return None
+        command = self._redo.pop()
+        command.apply(self.sheet)
+        self._undo.append(command)
+        self._last_time = None
+        return command
+
+    def clear(self):
+        """
+        Forgets every command.
+        """
+        self._undo.clear()
+        self._redo.clear()
+        self._last_time = None
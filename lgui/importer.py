@@ -0,0 +1,176 @@
+"""
+Defines the importer that builds sheets from lcapy netlists.
+"""
+
+import re
+import numpy as np
+
+from typing import Union, Iterable, Iterator, NamedTuple
+
+from .sheet import Sheet
+from .table import ComponentTable
+from .components import Ground
+from .layout import place, add_wiring
+
+
+TYPES: dict[str, type] = {
+    component.TYPE: component for component in ComponentTable.TYPES if component.TYPE != Ground.TYPE
+}
+"""
+Component classes that can be imported, keyed by the TYPE letter starting their netlist lines.
+Ground is node 0 in a netlist rather than a component.
+"""
+
+GROUND = "0"
+"""
+Name of the ground node in lcapy netlists.
+"""
+
+_LINE = re.compile(r"""
+    \s*(?P<type>[A-Za-z])(?P<name>\w*)     # component type letter and name
+    \s+(?P<positive>[^\s;{}]+)              # positive node
+    \s+(?P<negative>[^\s;{}]+)              # negative node
+    (?:\s+(?P<kind>dc|ac|step)(?=\s|;|$))?  # source kind
+    (?:\s+(?:\{(?P<braced>[^}]*)\}|(?P<value>[^\s;]+)))?
+    [^;]*(?:;.*)?$                          # anything else and drawing hints
+""", re.VERBOSE)
+
+
+class Record(NamedTuple):
+
+    """
+    A component parsed from a netlist line.
+    """
+
+    component_type: type
+    id: int
+    positive: str
+    negative: str
+    kind: str
+    value: Union[str, int, float]
+    name: str
+    """
+    The full name the line gives the component, e.g. R1 or Rload.
+    """
+
+
+def _number(text: str) -> Union[str, int, float]:
+    """
+    Converts a value to a number if it is numeric, otherwise leaves it as written.
+    """
+    try:
+        return int(text)
+    except ValueError:
+        pass
+    try:
+        return float(text)
+    except ValueError:
+        return text
+
+
+def parse_lcapy(lines: Iterable[str]) -> Iterator[Record]:
+    """
+    Parses lcapy netlist lines one at a time.
+    Blank lines and comments are skipped.
+
+    Parameters
+    ----------
+
+    lines: Iterable[str]
+        Lines of a netlist, e.g. an open file.
+
+    Raises
+    ------
+
+    ValueError
+        If a line is malformed or uses a component type lgui does not have.
+    """
+    match = _LINE.match
+    types = TYPES
+
+    for number, line in enumerate(lines, 1):
+        line = line.strip()
+        if not line or line[0] in "#;":
+            continue
+
+        parsed = match(line)
+        if parsed is None:
+            raise ValueError(f"line {number}: cannot parse '{line}'")
+
+        component_type = types.get(parsed["type"])
+        if component_type is None:
+            raise ValueError(f"line {number}: unsupported component type '{parsed['type']}'")
+
+        name = parsed["name"]
+        value = parsed["braced"] if parsed["braced"] is not None else parsed["value"]
+
+        yield Record(
+            component_type,
+            int(name) if name.isdigit() else None,
+            parsed["positive"],
+            parsed["negative"],
+            parsed["kind"],
+            None if value is None else _number(value.strip()),
+            parsed["type"] + name
+        )
+
+
+def read_lcapy(lines: Iterable[str], name: str = "Untitled", author: str = None, step: int = 24) -> Sheet:
+    """
+    Builds a sheet from an lcapy netlist.
+    Components are parsed, then appended to a ComponentTable in one go,
+    then placed by the layout engine with wires for the nets and a ground flag on node 0.
+
+    Parameters
+    ----------
+
+    lines: Iterable[str]
+        Lines of the netlist, e.g. an open file or netlist.splitlines().
+    name: str = "Untitled"
+        The name of the sheet.
+    author: str = None
+        The author of the sheet.
+    step: int = 24
+        The pixel-step size between nodes of the editor the sheet is for.
+    """
+    table = ComponentTable()
+    nodes: dict[str, int] = {}
+    terminals: list[int] = []
+
+    records = list(parse_lcapy(lines))
+    # reserve every numbered name first, so named components such as Rload,
+    # and components created later, are never given an id the netlist uses further on
+    for record in records:
+        if record.id is not None and record.id >= record.component_type.next_id:
+            record.component_type.next_id = record.id + 1
+
+    for record in records:
+        table.append(record.component_type, (0, 0), (0, 0), record.value, record.kind, id = record.id)
+        terminals.append(nodes.setdefault(record.positive, len(nodes)))
+        terminals.append(nodes.setdefault(record.negative, len(nodes)))
+
+    placement = place(np.array(terminals, dtype = np.int64).reshape(-1, 2), nodes.get(GROUND), step)
+    table.ports[:len(table), 0] = placement.starts
+    table.ports[:len(table), 1] = placement.ends
+    add_wiring(table, placement)
+
+    sheet = Sheet(name, author)
+    sheet.add_rows(table)
+    return sheet
+
+
+def load_lcapy(path: str, step: int = 24) -> Sheet:
+    """
+    Builds a sheet from an lcapy netlist file, reading it line by line.
+    The sheet is named after the file.
+
+    Parameters
+    ----------
+
+    path: str
+        Path of the netlist file.
+    step: int = 24
+        The pixel-step size between nodes of the editor the sheet is for.
+    """
+    with open(path, "r", encoding = "utf-8") as file:
+        return read_lcapy(file, name = path, step = step)
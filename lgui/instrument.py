@@ -0,0 +1,279 @@
+"""
+Defines opt-in instrumentation of the canvas traffic and latency of editor events.
+"""
+
+import json
+import time
+import bisect
+import threading
+import ipycanvas as canvas
+
+from collections import Counter, deque
+from contextlib import contextmanager
+from typing import Iterator
+
+
+_LISTENERS: list['Instrumentation'] = []
+"""
+Installed instrumentations, all counting through one wrapper of the shared canvas manager.
+"""
+
+_INSTALL_LOCK = threading.Lock()
+
+_WRAPPED: tuple = None
+"""
+The wrapped canvas manager and the attributes its instance had before, for unwrapping.
+"""
+
+_MISSING = object()
+
+
+def _wrap(manager):
+    """
+    Shadows the sending methods of the canvas manager with ones that count for every installed instrumentation.
+    """
+    global _WRAPPED
+    send_command = manager.send_command
+    send = manager.send
+
+    def counted_send_command(*args, **kwargs):
+        for listener in list(_LISTENERS):
+            listener._count("commands", 1)
+        return send_command(*args, **kwargs)
+
+    def counted_send(content, buffers = None):
+        size = len(json.dumps(content))
+        for buffer in buffers or ():
+            size += memoryview(buffer).nbytes
+        for listener in list(_LISTENERS):
+            listener._count("messages", 1)
+            listener._count("bytes", size)
+        return send(content, buffers = buffers)
+
+    _WRAPPED = (manager, {name: vars(manager).get(name, _MISSING) for name in ("send_command", "send")})
+    manager.send_command = counted_send_command
+    manager.send = counted_send
+
+
+def _unwrap():
+    """
+    Puts back exactly the attributes the canvas manager instance had before it was wrapped.
+    """
+    global _WRAPPED
+    manager, previous = _WRAPPED
+    for name, value in previous.items():
+        if value is _MISSING:
+            delattr(manager, name)
+        else:
+            setattr(manager, name, value)
+    _WRAPPED = None
+
+
+class Histogram:
+
+    """
+    Latency histogram with fixed buckets, cheap enough to update on every event.
+    """
+
+    BOUNDS: list[float] = [0.0001, 0.0002, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1, 2, 5]
+    """
+    Upper bounds of the buckets in seconds, with a final bucket for anything slower.
+    """
+
+    def __init__(self):
+
+        self.counts: list[int] = [0] * (len(Histogram.BOUNDS) + 1)
+        self.count: int = 0
+        self.total: float = 0
+        self.max: float = 0
+
+    def record(self, seconds: float):
+        """
+        Adds a measurement.
+        """
+        self.counts[bisect.bisect_left(Histogram.BOUNDS, seconds)] += 1
+        self.count += 1
+        self.total += seconds
+        self.max = max(self.max, seconds)
+
+    @property
+    def mean(self) -> float:
+
+        return self.total / self.count if self.count else 0
+
+    def quantile(self, q: float) -> float:
+        """
+        Estimates a quantile as the upper bound of the bucket it falls in.
+        """
+        if self.count == 0:
+            return 0
+        target = q * self.count
+        seen = 0
+        for bound, count in zip(Histogram.BOUNDS, self.counts):
+            seen += count
+            if seen >= target:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self) -> dict:
+
+        return {
+            "count": self.count,
+            "mean": self.mean,
+            "p50": self.quantile(0.5),
+            "p95": self.quantile(0.95),
+            "max": self.max,
+            "buckets": dict(zip([str(bound) for bound in Histogram.BOUNDS] + ["inf"], self.counts))
+        }
+
+
+class Instrumentation:
+
+    """
+    Records the latency, canvas commands, widget messages and bytes of each editor event.
+    While installed, the shared ipycanvas canvas manager is wrapped to count what it sends,
+    and the counts are attributed to every event open on the sending thread.
+    Any number of instrumentations can be installed at once and share one wrapper.
+    Events may nest, in which case the outer event includes the inner one.
+
+    Parameters
+    ----------
+
+    trace_limit: int = 100000
+        The number of events kept for the trace, older events are dropped first.
+    """
+
+    def __init__(self, trace_limit: int = 100000):
+
+        self.counters: Counter = Counter()
+        """
+        Totals of events, commands, messages and bytes, keyed by event name and quantity, e.g. "_refresh.bytes".
+        """
+        self.latency: dict[str, Histogram] = {}
+        """
+        Latency histograms, keyed by event name.
+        """
+        self.trace: deque[dict] = deque(maxlen = trace_limit)
+        """
+        Completed events in Chrome trace event format.
+        """
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self._origin = time.perf_counter()
+
+    @property
+    def installed(self) -> bool:
+
+        return self in _LISTENERS
+
+    def _open(self) -> list[dict]:
+        """
+        Gets the events open on the current thread, innermost last.
+        """
+        if not hasattr(self._local, "events"):
+            self._local.events = []
+        return self._local.events
+
+    def _count(self, quantity: str, amount: int):
+        """
+        Adds to a quantity of every event open on the current thread.
+        """
+        for event in self._open():
+            event[quantity] += amount
+
+    def install(self):
+        """
+        Starts counting what the canvas manager sends.
+        """
+        with _INSTALL_LOCK:
+            if self in _LISTENERS:
+                return
+            if len(_LISTENERS) == 0:
+                _wrap(canvas.canvas._CANVAS_MANAGER)
+            _LISTENERS.append(self)
+
+    def uninstall(self):
+        """
+        Stops counting what the canvas manager sends.
+        The canvas manager is only unwrapped once every instrumentation is uninstalled.
+        """
+        with _INSTALL_LOCK:
+            if self not in _LISTENERS:
+                return
+            _LISTENERS.remove(self)
+            if len(_LISTENERS) == 0:
+                _unwrap()
+
+    @contextmanager
+    def event(self, name: str) -> Iterator[dict]:
+        """
+        Measures an event, such as a call to an editor handler.
+
+        Parameters
+        ----------
+
+        name: str
+            The name the event is recorded under.
+        """
+        event = {"commands": 0, "messages": 0, "bytes": 0}
+        events = self._open()
+        events.append(event)
+        start = time.perf_counter()
+        try:
+            yield event
+        finally:
+            end = time.perf_counter()
+            events.pop()
+            with self._lock:
+                self.counters[f"{name}.events"] += 1
+                for quantity, amount in event.items():
+                    self.counters[f"{name}.{quantity}"] += amount
+                self.latency.setdefault(name, Histogram()).record(end - start)
+                self.trace.append({
+                    "name": name,
+                    "ph": "X",
+                    "ts": (start - self._origin) * 1e6,
+                    "dur": (end - start) * 1e6,
+                    "pid": 0,
+                    "tid": threading.get_ident(),
+                    "args": dict(event)
+                })
+
+    def summary(self) -> dict[str, dict]:
+        """
+        Summarises the recorded events.
+
+        Returns
+        -------
+
+        dict[str, dict]
+            Per event name, the totals of its counters and its latency histogram.
+        """
+        with self._lock:
+            summary = {}
+            for name, histogram in self.latency.items():
+                summary[name] = {
+                    quantity: self.counters[f"{name}.{quantity}"]
+                    for quantity in ("events", "commands", "messages", "bytes")
+                }
+                summary[name]["latency"] = histogram.to_dict()
+            return summary
+
+    def dump_trace(self, path: str):
+        """
+        Writes the recorded events to a trace file,
+        viewable in chrome://tracing or https://ui.perfetto.dev.
+        """
+        with self._lock:
+            events = list(self.trace)
+        with open(path, "w", encoding = "utf-8") as file:
+            json.dump({"traceEvents": events, "displayTimeUnit": "ms"}, file)
+
+    def reset(self):
+        """
+        Forgets everything recorded so far.
+        """
+        with self._lock:
+            self.counters.clear()
+            self.latency.clear()
+            self.trace.clear()
@@ -0,0 +1,215 @@
+"""
+Defines the layout engine that places the components of a sheet automatically.
+"""
+
+import heapq
+import numpy as np
+
+from collections import deque
+from typing import NamedTuple
+
+from .sheet import Sheet
+from .table import ComponentTable
+from .netlist import NetlistCache
+from .components import Wire, Ground
+
+
+COLUMN_PITCH = 8
+"""
+Steps between the buses of neighbouring nets, enough to fit the longest symbol.
+"""
+
+ROW_PITCH = 3
+"""
+Steps between rows of components, enough to fit the widest symbol.
+"""
+
+class Placement(NamedTuple):
+
+    """
+    Positions produced by the layout engine.
+    """
+
+    starts: np.ndarray
+    """
+    Positions of the first port of each component as an (n, 2) array.
+    """
+    ends: np.ndarray
+    """
+    Positions of the second port of each component as an (n, 2) array.
+    """
+    wires: np.ndarray
+    """
+    Wires joining the components into nets as an (m, 2, 2) array of end points.
+    """
+    ground: tuple[int, int]
+    """
+    Position for the ground flag, or None if nothing is grounded.
+    """
+
+
+def _columns(nets: np.ndarray, count: int, root: int) -> np.ndarray:
+    """
+    Orders nets into columns by breadth-first layers out from a root net,
+    so that connected nets sit near each other.
+    Nets not connected to the root are laid out after it, one connected group at a time.
+    """
+    adjacent: list[list[int]] = [[] for _ in range(count)]
+    for a, b in nets.tolist():
+        adjacent[a].append(b)
+        adjacent[b].append(a)
+
+    column = np.full(count, -1, dtype = np.int64)
+    next_column = 0
+    for start in [root] + list(range(count)):
+        if column[start] >= 0:
+            continue
+        column[start] = next_column
+        next_column += 1
+        queue = deque((start,))
+        while queue:
+            net = queue.popleft()
+            for neighbour in adjacent[net]:
+                if column[neighbour] < 0:
+                    column[neighbour] = next_column
+                    next_column += 1
+                    queue.append(neighbour)
+    return column
+
+
+def _rows(left: np.ndarray, right: np.ndarray) -> np.ndarray:
+    """
+    Packs horizontal spans into as few rows as possible.
+    Spans may share a row if they only meet end to end.
+    """
+    rows = np.empty(len(left), dtype = np.int64)
+    ends: list[tuple[int, int]] = []
+    row_count = 0
+    for span in np.lexsort((right, left)).tolist():
+        if ends and ends[0][0] <= left[span]:
+            _, row = heapq.heappop(ends)
+        else:
+            row = row_count
+            row_count += 1
+        rows[span] = row
+        heapq.heappush(ends, (int(right[span]), row))
+    return rows
+
+
+def place(nets: np.ndarray, ground: int = None, step: int = 24) -> Placement:
+    """
+    Places two-terminal components on a grid with horizontal and vertical lines only.
+    Each net becomes a vertical bus in its own column and each component a horizontal span between
+    the buses of its nets, in rows packed so non-overlapping spans share a row.
+    A component with both ends on one net gets a small wire loop back to its bus.
+    Runs in O(n log n) for n components.
+
+    Parameters
+    ----------
+
+    nets: np.ndarray
+        The nets of the first and second port of each component as an (n, 2) array of integers.
+    ground: int = None
+        The ground net, placed in the first column.
+    step: int = 24
+        The pixel-step size between nodes of the editor the layout is for.
+    """
+    nets = np.asarray(nets, dtype = np.int64).reshape(-1, 2)
+    labels, dense = np.unique(nets, return_inverse = True)
+    dense = dense.reshape(-1, 2)
+
+    if len(labels) == 0:
+        empty = np.empty((0, 2))
+        return Placement(empty, empty, np.empty((0, 2, 2)), None)
+
+    if ground is not None and ground in labels:
+        root = int(np.searchsorted(labels, ground))
+    else:
+        root = 0
+        ground = None
+
+    column = _columns(dense, len(labels), root)[dense]
+
+    # spans in half columns, loops reach half way to the next column
+    loops = column[:, 0] == column[:, 1]
+    left = 2 * column.min(axis = 1)
+    right = np.where(loops, left + 1, 2 * column.max(axis = 1))
+    row = _rows(left, right)
+
+    x = (column + 1) * COLUMN_PITCH * step
+    y = (row + 1) * ROW_PITCH * step
+    starts = np.stack((x[:, 0], y), axis = 1)
+    ends = np.stack((x[:, 1], y), axis = 1)
+    ends[loops, 0] += COLUMN_PITCH * step // 2
+
+    # every point where a component meets a bus, including the far end of each loop
+    tap_columns = np.concatenate((column[:, 0], column[:, 1], column[loops, 0]))
+    tap_rows = np.concatenate((y, y, y[loops] + step))
+    wires = [
+        np.stack((ends[loops], ends[loops] + (0, step)), axis = 1),
+        np.stack((ends[loops] + (0, step), np.stack((x[loops, 0], y[loops] + step), axis = 1)), axis = 1)
+    ]
+
+    # buses join the taps of each net from top to bottom
+    taps = np.unique(np.stack((tap_columns, tap_rows), axis = 1), axis = 0)
+    same = taps[1:, 0] == taps[:-1, 0]
+    bus_x = (taps[1:, 0][same] + 1) * COLUMN_PITCH * step
+    wires.append(np.stack((
+        np.stack((bus_x, taps[:-1, 1][same]), axis = 1),
+        np.stack((bus_x, taps[1:, 1][same]), axis = 1)
+    ), axis = 1))
+
+    # the root net is the first column, so its topmost tap comes first
+    ground_point = None
+    if ground is not None:
+        ground_point = (COLUMN_PITCH * step, int(taps[0, 1]))
+
+    return Placement(starts, ends, np.concatenate(wires).reshape(-1, 2, 2), ground_point)
+
+
+def layout(sheet: Sheet, step: int = 24) -> Sheet:
+    """
+    Lays out a sheet automatically, see place.
+    Existing wires and ground flags are replaced by the buses and a single ground flag.
+
+    Parameters
+    ----------
+
+    sheet: Sheet
+        The sheet to lay out, left unchanged.
+    step: int = 24
+        The pixel-step size between nodes of the editor the layout is for.
+
+    Returns
+    -------
+
+    Sheet
+        A new sheet holding copies of the components in their new positions.
+    """
+    components = [component for component in sheet.components if NetlistCache.listed(component)]
+    nets = np.array([
+        (sheet.net(component.ports[0].position), sheet.net(component.ports[1].position))
+        for component in components
+    ], dtype = np.int64).reshape(-1, 2)
+
+    placement = place(nets, 0, step)
+
+    table = ComponentTable(max(2 * len(components), 16))
+    for component, start, end in zip(components, placement.starts.tolist(), placement.ends.tolist()):
+        view = table.append_component(component)
+        view.ports[0].position = start
+        view.ports[1].position = end
+    add_wiring(table, placement)
+
+    placed = Sheet(sheet.name, sheet.author)
+    placed.add_rows(table)
+    return placed
+
+
+def add_wiring(table: ComponentTable, placement: Placement):
+    """
+    Appends the wires and ground flag of a placement to a table.
+    """
+    table.extend(Wire, placement.wires[:, 0], placement.wires[:, 1])
+    if placement.ground is not None:
+        table.append(Ground, placement.ground, placement.ground)
@@ -0,0 +1,172 @@
+"""
+Defines the incrementally maintained netlist of a sheet.
+"""
+
+from typing import Iterator
+
+from .components import Component, Wire, Ground
+
+
+class NetlistCache:
+
+    """
+    Netlist lines, and optionally an lcapy circuit, kept up to date as a sheet is edited.
+    Adding a component only formats its own line and the lines of components on nets it merged.
+    The lcapy circuit is patched with the same changes rather than parsed again.
+
+    Parameters
+    ----------
+
+    sheet: Sheet
+        The sheet to produce the netlist of.
+    """
+
+    def __init__(self, sheet):
+
+        self.sheet = sheet
+        self.valid: bool = False
+        self._lines: dict[Component, str] = {}
+        self._definitions: dict[Component, tuple] = {}
+        self._by_net: dict[int, set[Component]] = {}
+        self._circuit = None
+        self._circuit_revision: int = None
+        self._pending: list[tuple[str, str]] = []
+
+    def invalidate(self):
+        """
+        Discards the cached netlist and circuit so they are rebuilt when next needed.
+        """
+        self.valid = False
+        self._lines.clear()
+        self._definitions.clear()
+        self._by_net.clear()
+        self._circuit = None
+        self._circuit_revision = None
+        self._pending.clear()
+
+    @staticmethod
+    def listed(component: Component) -> bool:
+        """
+        Whether a component gets a line of its own in the netlist.
+        Wires and ground flags are folded into the net numbers instead.
+        """
+        return component.TYPE not in (Wire.TYPE, Ground.TYPE)
+
+    def _nets(self, component: Component) -> list[int]:
+
+        return [self.sheet.net(port.position) for port in component.ports]
+
+    def _put(self, component: Component):
+        """
+        Formats the line of a component, replacing its old line in place if it has one.
+        """
+        old = self._lines.get(component)
+        # the nets are looked up once, for both the line and the index of components by net
+        nets = self._nets(component)
+        line = self.sheet.netlist_line(component, nets)
+        self._lines[component] = line
+        definition = getattr(component, "definition", None)
+        if definition is not None:
+            self._definitions[component] = definition.revision
+        for net in set(nets):
+            self._by_net.setdefault(net, set()).add(component)
+        if self._circuit is not None and line != old:
+            # instances of sub-sheets have a line for each of their components
+            if old is not None:
+                self._pending.extend(("remove", part.split(maxsplit = 1)[0]) for part in old.splitlines())
+            self._pending.extend(("add", part) for part in line.splitlines())
+
+    def _drop(self, component: Component):
+        """
+        Removes the line of a component.
+        """
+        line = self._lines.pop(component)
+        self._definitions.pop(component, None)
+        for net in set(self._nets(component)):
+            self._by_net.get(net, set()).discard(component)
+        if self._circuit is not None:
+            self._pending.extend(("remove", part.split(maxsplit = 1)[0]) for part in line.splitlines())
+
+    def added(self, component: Component, retired: list[int]):
+        """
+        Updates the netlist after a component is added to the sheet.
+
+        Parameters
+        ----------
+
+        component: Component
+            The component that was added.
+        retired: list[int]
+            Numbers of the nets that were merged away by adding the component.
+        """
+        if not self.valid:
+            return
+        for net in retired:
+            for member in self._by_net.pop(net, ()):
+                self._put(member)
+        if NetlistCache.listed(component):
+            self._put(component)
+
+    def removed(self, component: Component):
+        """
+        Updates the netlist after a component is removed from the sheet.
+        """
+        if self.valid and component in self._lines:
+            self._drop(component)
+
+    def build(self):
+        """
+        Formats the whole netlist from scratch.
+        """
+        self.invalidate()
+        for component in self.sheet.components:
+            if NetlistCache.listed(component):
+                self._put(component)
+        self.valid = True
+
+    def _refresh(self):
+        """
+        Formats the lines of instances of sub-sheets again if their definition was edited.
+        """
+        revisions = {}
+        for component, revision in list(self._definitions.items()):
+            definition = component.definition
+            # each definition's revision is worked out once, however many instances share it
+            if id(definition) not in revisions:
+                revisions[id(definition)] = definition.revision
+            if revisions[id(definition)] != revision:
+                self._put(component)
+
+    def lines(self) -> Iterator[str]:
+        """
+        Iterates over the netlist lines, without trailing newlines.
+        """
+        if not self.valid:
+            self.build()
+        self._refresh()
+        return iter(self._lines.values())
+
+    def circuit(self):
+        """
+        Gets the netlist as an lcapy circuit.
+        The circuit is parsed once and then patched with the changes made since it was last requested.
+        """
+        if not self.valid:
+            self.build()
+        self._refresh()
+
+        if self._circuit is None:
+            import lcapy
+            # lcapy reads a string without newlines as a file name, as for Sheet.to_lcapy
+            self._circuit = lcapy.Circuit("\n" + "\n".join(self._lines.values()))
+            self._pending.clear()
+        elif self._pending or self._circuit_revision != self.sheet.revision:
+            for action, argument in self._pending:
+                if action == "add":
+                    self._circuit.add(argument)
+                else:
+                    self._circuit.remove(argument)
+            self._pending.clear()
+
+        self._circuit_revision = self.sheet.revision
+        return self._circuit
@@ -0,0 +1,284 @@
+"""
+Defines the net connectivity of a sheet.
+"""
+
+import numpy as np
+
+from array import array
+from bisect import bisect_left
+
+from .components import Component, Wire, Ground
+
+
+class DisjointSet:
+
+    """
+    Disjoint-set forest over the integers from 0, with union by size and path halving,
+    giving near constant time finds and unions.
+    Parents and sizes are kept in compact arrays, so each item takes 16 bytes.
+    """
+
+    def __init__(self):
+
+        self.parent: array = array("q")
+        self.size: array = array("q")
+
+    def __len__(self) -> int:
+
+        return len(self.parent)
+
+    def add(self) -> int:
+        """
+        Adds a new item as its own set.
+
+        Returns
+        -------
+
+        int
+            The new item.
+        """
+        item = len(self.parent)
+        self.parent.append(item)
+        self.size.append(1)
+        return item
+
+    def add_many(self, count: int) -> range:
+        """
+        Adds many new items, each as its own set.
+
+        Returns
+        -------
+
+        range
+            The new items.
+        """
+        start = len(self.parent)
+        self.parent.frombytes(np.arange(start, start + count, dtype = np.int64).tobytes())
+        self.size.frombytes(np.ones(count, dtype = np.int64).tobytes())
+        return range(start, start + count)
+
+    def find(self, item: int) -> int:
+        """
+        Finds the root item of the set containing an item.
+        """
+        parent = self.parent
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: int, b: int) -> tuple[int, int]:
+        """
+        Merges the sets containing two items.
+
+        Returns
+        -------
+
+        tuple[int, int]
+            The root of the merged set and the root that was absorbed into it,
+            or None if the items were already in the same set.
+        """
+        a, b = self.find(a), self.find(b)
+        if a == b:
+            return None
+        if self.size[a] < self.size[b]:
+            a, b = b, a
+        self.parent[b] = a
+        self.size[a] += self.size[b]
+        return a, b
+
+
+class Nets:
+
+    """
+    Incrementally merges the points of a sheet into nets.
+    Wires short their ports together and ground flags join their port to the ground net.
+    The ground net is numbered 0 and other nets are numbered from 1 in order of appearance.
+
+    Points are numbered as items of a disjoint-set, with ground as item 0.
+    Points added in bulk by add_many, e.g. from the rows of a ComponentTable, are looked up
+    in a sorted array, so like the labels and port counts they take no Python objects each.
+    """
+
+    GROUND = 0
+    """
+    Item of the ground net in the disjoint-set.
+    """
+
+    def __init__(self):
+
+        self.points = DisjointSet()
+        self.points.add()
+        self.labels: array = array("q", [0])
+        """
+        Number of the net of each root item.
+        """
+        self.uses: array = array("q", [0])
+        """
+        Number of ports at each point.
+        """
+        self.next_id = 1
+
+        self._items: dict[tuple[int, int], int] = {}
+        self._codes: array = array("q")
+        self._first: int = 0
+
+    @staticmethod
+    def key(position: tuple[float, float]) -> tuple[int, int]:
+        """
+        Rounds a position to the point that identifies it.
+        """
+        return (round(position[0]), round(position[1]))
+
+    @staticmethod
+    def _code(x: np.ndarray, y: np.ndarray) -> np.ndarray:
+        """
+        Packs points into single integers.
+        """
+        return x * 2 ** 32 + y
+
+    def _item(self, point: tuple[int, int]) -> int:
+        """
+        Finds the item of a point, or None if the point has no ports.
+        """
+        item = self._items.get(point)
+        if item is None and self._codes:
+            # bisecting the array directly avoids the overhead of a NumPy call per lookup
+            code = Nets._code(point[0], point[1])
+            i = bisect_left(self._codes, code)
+            if i < len(self._codes) and self._codes[i] == code:
+                item = self._first + i
+        return item
+
+    def _add_point(self, point: tuple[int, int]) -> int:
+
+        item = self._item(point)
+        if item is None:
+            item = self.points.add()
+            self._items[point] = item
+            self.labels.append(self.next_id)
+            self.uses.append(0)
+            self.next_id += 1
+        return item
+
+    def _connect(self, a: int, b: int) -> int:
+        """
+        Merges the nets of two points.
+        The merged net keeps the lower number, so ground always stays 0.
+
+        Returns
+        -------
+
+        int
+            The number of the net that no longer exists, or None if nothing was merged.
+        """
+        merged = self.points.union(a, b)
+        if merged is None:
+            return None
+        root, absorbed = merged
+        keep, retire = sorted((self.labels[root], self.labels[absorbed]))
+        self.labels[root] = keep
+        return retire
+
+    def _join(self, component_type: str, items: list[int]) -> list[int]:
+        """
+        Counts the ports of a component at its points and connects them as its type does.
+        """
+        for item in items:
+            self.uses[item] += 1
+
+        retired = []
+        if component_type == Wire.TYPE:
+            retired.append(self._connect(items[0], items[1]))
+        elif component_type == Ground.TYPE:
+            retired.append(self._connect(items[0], Nets.GROUND))
+        return [label for label in retired if label is not None]
+
+    def add(self, component: Component, points: list[tuple[int, int]] = None) -> list[int]:
+        """
+        Adds the ports of a component, merging nets as it connects them.
+
+        Parameters
+        ----------
+
+        component: Component
+            The component to add.
+        points: list[tuple[int, int]] = None
+            The rounded port positions, if already known.
+
+        Returns
+        -------
+
+        list[int]
+            The numbers of any nets that were merged away.
+        """
+        if points is None:
+            points = [Nets.key(port.position) for port in component.ports]
+        return self._join(component.TYPE, [self._add_point(point) for point in points])
+
+    def add_many(self, types: list[str], points: np.ndarray):
+        """
+        Adds the ports of many two-port components at once, numbering and merging nets as add would.
+        Into empty nets, the points are numbered with array operations and only wires and ground flags are visited.
+
+        Parameters
+        ----------
+
+        types: list[str]
+            The TYPE of each component.
+        points: np.ndarray
+            The rounded port positions as an (n, 2, 2) integer array.
+        """
+        points = np.asarray(points, dtype = np.int64).reshape(-1, 2, 2)
+        if len(self.points) > 1 or len(points) == 0:
+            for component_type, ports in zip(types, points.tolist()):
+                self._join(component_type, [self._add_point(tuple(point)) for point in ports])
+            return
+
+        codes = Nets._code(points[:, :, 0], points[:, :, 1]).reshape(-1)
+        codes, first, inverse, counts = np.unique(codes, return_index = True, return_inverse = True, return_counts = True)
+        self._codes = array("q", codes.tobytes())
+        self._first = self.points.add_many(len(codes)).start
+
+        # nets are numbered in order of appearance, as if the components were added one at a time
+        order = np.empty(len(codes), dtype = np.int64)
+        order[np.argsort(first, kind = "stable")] = np.arange(len(codes))
+        self.labels.frombytes((self.next_id + order).tobytes())
+        self.uses.frombytes(counts.astype(np.int64).tobytes())
+        self.next_id += len(codes)
+
+        # merged nets keep the lowest number, so the order of merging does not matter
+        items = self._first + inverse.reshape(-1, 2)
+        types = np.asarray(types)
+        for a, b in items[types == Wire.TYPE].tolist():
+            self._connect(a, b)
+        for a in items[types == Ground.TYPE, 0].tolist():
+            self._connect(a, Nets.GROUND)
+
+    def release(self, component: Component) -> bool:
+        """
+        Forgets the ports of a component that has been removed.
+        Nets cannot be split or numbers reclaimed in place, so the caller must rebuild if this returns True.
+
+        Returns
+        -------
+
+        bool
+            Whether a point is no longer used by any port, leaving a net that should not exist.
+        """
+        emptied = False
+        for port in component.ports:
+            item = self._item(Nets.key(port.position))
+            self.uses[item] -= 1
+            if self.uses[item] == 0:
+                emptied = True
+        return emptied
+
+    def net(self, position: tuple[float, float]) -> int:
+        """
+        Gets the number of the net at a position.
+        """
+        item = self._item(Nets.key(position))
+        if item is None:
+            raise KeyError(position)
+        return self.labels[self.points.find(item)]
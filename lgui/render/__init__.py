@@ -0,0 +1,10 @@
+"""
+Rendering submodule of lgui (lcapy-gui)
+
+Draws sheets offscreen, without a Jupyter front end, e.g. to export thumbnails in batches.
+Run python -m lgui.render --help for the batch exporter.
+"""
+
+from .backend import Backend, render_sheet, sheet_bounds
+from .svg import SVGBackend
+from .raster import RasterBackend
@@ -0,0 +1,111 @@
+"""
+Renders a directory of saved sheets to images in parallel.
+
+    python -m lgui.render sheets/ thumbnails/ --format png --width 400 --height 300
+
+Sheets saved with lgui.storage.save_sheet (.lgui) and lcapy netlists (.net) are rendered.
+"""
+
+import os
+import sys
+import argparse
+import multiprocessing
+
+from typing import Optional
+
+from .backend import render_sheet
+from .svg import SVGBackend
+from .raster import RasterBackend
+
+
+BACKENDS: dict[str, type] = {
+    SVGBackend.FORMAT: SVGBackend,
+    RasterBackend.FORMAT: RasterBackend
+}
+"""
+Backend classes, keyed by the file extension they write.
+"""
+
+EXTENSIONS = (".lgui", ".net")
+"""
+Extensions of the files that are rendered.
+"""
+
+
+def render_file(job: tuple[str, str, str, int, int]) -> tuple[str, Optional[str]]:
+    """
+    Renders one sheet file, run in a worker process.
+
+    Parameters
+    ----------
+
+    job: tuple[str, str, str, int, int]
+        The source path, output path, format, width and height.
+
+    Returns
+    -------
+
+    tuple[str, Optional[str]]
+        The source path and an error message, or None if it rendered.
+    """
+    # imported here so that worker processes only load what they need
+    from ..storage import load_sheet
+    from ..importer import load_lcapy
+
+    source, output, format, width, height = job
+    try:
+        if source.endswith(".lgui"):
+            sheet = load_sheet(source)
+        else:
+            sheet = load_lcapy(source)
+        backend = BACKENDS[format](width, height)
+        render_sheet(sheet, backend)
+        backend.save_to(output)
+    except Exception as exception:
+        return source, f"{type(exception).__name__}: {exception}"
+    return source, None
+
+
+def main(arguments: list[str] = None) -> int:
+    """
+    Runs the batch renderer.
+
+    Returns
+    -------
+
+    int
+        The exit status, 1 if any sheet failed to render.
+    """
+    parser = argparse.ArgumentParser(prog = "python -m lgui.render", description = __doc__.strip().splitlines()[0])
+    parser.add_argument("source", help = "directory of sheets to render")
+    parser.add_argument("output", help = "directory to write images to, created if needed")
+    parser.add_argument("--format", choices = sorted(BACKENDS), default = SVGBackend.FORMAT)
+    parser.add_argument("--width", type = int, default = 800)
+    parser.add_argument("--height", type = int, default = 600)
+    parser.add_argument("--processes", type = int, default = None, help = "worker processes, one per CPU by default")
+    options = parser.parse_args(arguments)
+
+    os.makedirs(options.output, exist_ok = True)
+    jobs = [
+        (
+            os.path.join(options.source, name),
+            os.path.join(options.output, os.path.splitext(name)[0] + "." + options.format),
+            options.format, options.width, options.height
+        )
+        for name in sorted(os.listdir(options.source)) if name.endswith(EXTENSIONS)
+    ]
+
+    failed = 0
+    with multiprocessing.Pool(options.processes) as pool:
+        # small chunks keep workers busy when sheet sizes vary
+        for source, error in pool.imap_unordered(render_file, jobs, chunksize = 4):
+            if error is not None:
+                failed += 1
+                print(f"{source}: {error}", file = sys.stderr)
+
+    print(f"rendered {len(jobs) - failed} of {len(jobs)} sheets to {options.output}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
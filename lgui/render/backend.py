@@ -0,0 +1,244 @@
+"""
+Defines the interface that offscreen rendering backends implement.
+"""
+
+import numpy as np
+
+from abc import ABC, abstractmethod
+from typing import BinaryIO, Union
+
+from ..sheet import Sheet
+from ..components import Component
+
+
+class Backend(ABC):
+
+    """
+    Offscreen drawing surface.
+    Implements the part of the ipycanvas Canvas interface that components draw with,
+    so their drawing methods can target a backend in place of a canvas layer.
+    A backend also carries the STEP and SCALE that drawing reads from the editor,
+    so it can stand in for the editor as well.
+    Only scaling and translating transforms are supported.
+
+    Parameters
+    ----------
+
+    width: int
+        Width of the drawing in pixels.
+    height: int
+        Height of the drawing in pixels.
+    step: int = 24
+        The pixel-step size between nodes of the editor the sheet was drawn in.
+    scale: float = 1
+        The scale of components.
+    """
+
+    FORMAT: str = None
+    """
+    File extension of the files the backend writes.
+    """
+
+    def __init__(self, width: int, height: int, step: int = 24, scale: float = 1):
+
+        self.width: int = width
+        self.height: int = height
+        self.STEP: int = step
+        self.SCALE: float = scale
+
+        self.stroke_style: str = "black"
+        self.fill_style: str = "black"
+        self.line_width: float = 1
+        self._zoom: float = 1
+        self._offset: tuple[float, float] = (0, 0)
+
+    def set_transform(self, a: float, b: float, c: float, d: float, e: float, f: float):
+        """
+        Sets the transform from drawing coordinates to pixels, as for a canvas.
+        Only a uniform scale a = d with translation (e, f) is supported.
+        """
+        if b != 0 or c != 0 or a != d:
+            raise ValueError("only uniform scaling and translation are supported")
+        self._zoom = a
+        self._offset = (e, f)
+
+    def reset_transform(self):
+
+        self.set_transform(1, 0, 0, 1, 0, 0)
+
+    def _points(self, x: np.ndarray, y: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Transforms drawing coordinates to pixels.
+        """
+        return (
+            np.asarray(x, dtype = float) * self._zoom + self._offset[0],
+            np.asarray(y, dtype = float) * self._zoom + self._offset[1]
+        )
+
+    def _lengths(self, length: Union[float, np.ndarray]) -> np.ndarray:
+        """
+        Transforms drawing lengths to pixels.
+        """
+        return np.asarray(length, dtype = float) * self._zoom
+
+    @abstractmethod
+    def clear(self):
+        """
+        Clears the drawing.
+        """
+        pass
+
+    @abstractmethod
+    def stroke_line_segments(self, points: np.ndarray):
+        """
+        Strokes line segments given as an (n, 2, 2) array of end points.
+        """
+        pass
+
+    @abstractmethod
+    def stroke_arcs(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        radius: Union[float, np.ndarray],
+        start_angle: np.ndarray,
+        end_angle: np.ndarray,
+        anticlockwise: bool = False
+    ):
+        """
+        Strokes arcs, with angles in radians measured clockwise from the x axis as on a canvas.
+        """
+        pass
+
+    @abstractmethod
+    def fill_circles(self, x: np.ndarray, y: np.ndarray, radius: Union[float, np.ndarray]):
+        """
+        Fills circles.
+        """
+        pass
+
+    @abstractmethod
+    def fill_rects(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        width: Union[float, np.ndarray],
+        height: Union[float, np.ndarray] = None
+    ):
+        """
+        Fills rectangles, which are square if no height is specified.
+        """
+        pass
+
+    @abstractmethod
+    def write(self, file: BinaryIO):
+        """
+        Writes the drawing to a binary file-like object.
+        """
+        pass
+
+    def fill_arc(
+        self,
+        x: float,
+        y: float,
+        radius: float,
+        start_angle: float,
+        end_angle: float,
+        anticlockwise: bool = False
+    ):
+        """
+        Fills an arc, only supported for whole circles.
+        """
+        self.fill_circles([x], [y], radius)
+
+    def stroke_rect(self, x: float, y: float, width: float, height: float = None):
+        """
+        Strokes the outline of a rectangle.
+        """
+        if height is None:
+            height = width
+        self.stroke_line_segments(np.array((
+            ((x, y), (x + width, y)),
+            ((x + width, y), (x + width, y + height)),
+            ((x + width, y + height), (x, y + height)),
+            ((x, y + height), (x, y))
+        ), dtype = float))
+
+    def save_to(self, path: str):
+        """
+        Writes the drawing to a file.
+        """
+        with open(path, "wb") as file:
+            self.write(file)
+
+
+def sheet_bounds(sheet: Sheet, editor) -> tuple[float, float, float, float]:
+    """
+    Computes the box that every component of a sheet is drawn within.
+
+    Parameters
+    ----------
+
+    sheet: Sheet
+        The sheet to measure.
+    editor: Editor
+        The editor or backend that the sheet is drawn by, used for the step and scale.
+
+    Returns
+    -------
+
+    tuple[float, float, float, float]
+        The box as (left, top, right, bottom), or None if the sheet is empty.
+    """
+    if len(sheet.components) == 0:
+        return None
+    # instances of sub-sheets span the box of their definition rather than their ports
+    boxes = np.array([Sheet._box(component) for component in sheet.components], dtype = float)
+    pad = Component.EXTENT * editor.STEP * editor.SCALE
+    left, top = boxes[:, :2].min(axis = 0) - pad
+    right, bottom = boxes[:, 2:].max(axis = 0) + pad
+    return (float(left), float(top), float(right), float(bottom))
+
+
+def render_sheet(sheet: Sheet, backend: Backend, bounds: tuple[float, float, float, float] = None):
+    """
+    Draws a sheet on a backend, scaled and centred to fit the drawing.
+    Components are drawn with the same bulk drawing methods the editor uses.
+
+    Parameters
+    ----------
+
+    sheet: Sheet
+        The sheet to draw.
+    backend: Backend
+        The backend to draw on.
+    bounds: tuple[float, float, float, float] = None
+        Region of the sheet to draw as (left, top, right, bottom),
+        if none specified the whole sheet is drawn.
+    """
+    backend.clear()
+
+    if bounds is None:
+        bounds = sheet_bounds(sheet, backend)
+        if bounds is None:
+            return
+        components = sheet.components
+    else:
+        components = sheet.components_in(bounds)
+
+    left, top, right, bottom = bounds
+    zoom = min(backend.width / max(right - left, 1), backend.height / max(bottom - top, 1))
+    backend.set_transform(
+        zoom, 0, 0, zoom,
+        (backend.width - (right - left) * zoom) / 2 - left * zoom,
+        (backend.height - (bottom - top) * zoom) / 2 - top * zoom
+    )
+
+    batches: dict[type, list[Component]] = {}
+    for component in components:
+        batches.setdefault(type(component), []).append(component)
+
+    for component_type, batch in batches.items():
+        component_type.draw_many(backend, backend, batch)
+
+    backend.reset_transform()
@@ -0,0 +1,117 @@
+"""
+Defines the raster rendering backend, drawing with Pillow.
+"""
+
+import numpy as np
+
+from typing import BinaryIO, Union
+
+from .backend import Backend
+
+
+class RasterBackend(Backend):
+
+    """
+    Renders to a PNG image with Pillow.
+    Pillow is only needed when a raster backend is created.
+
+    Parameters
+    ----------
+
+    width: int
+        Width of the image in pixels.
+    height: int
+        Height of the image in pixels.
+    step: int = 24
+        The pixel-step size between nodes of the editor the sheet was drawn in.
+    scale: float = 1
+        The scale of components.
+    background: str = "white"
+        Colour the image is cleared to.
+    """
+
+    FORMAT = "png"
+
+    def __init__(self, width: int, height: int, step: int = 24, scale: float = 1, background: str = "white"):
+
+        try:
+            from PIL import Image, ImageDraw
+        except ImportError as error:
+            raise ImportError("raster rendering requires Pillow, install it with pip install Pillow") from error
+
+        super().__init__(width, height, step, scale)
+        self.background: str = background
+        self._image_type = Image
+        self._draw_type = ImageDraw
+        self.clear()
+
+    def clear(self):
+
+        self.image = self._image_type.new("RGB", (self.width, self.height), self.background)
+        self._draw = self._draw_type.Draw(self.image)
+
+    def _width(self) -> int:
+        """
+        Line width in pixels, never thinner than a pixel.
+        """
+        return max(1, round(float(self._lengths(self.line_width))))
+
+    def stroke_line_segments(self, points: np.ndarray):
+
+        points = np.asarray(points, dtype = float).reshape(-1, 2, 2)
+        x, y = self._points(points[..., 0], points[..., 1])
+        line = self._draw.line
+        width = self._width()
+        for (x0, x1), (y0, y1) in zip(x.tolist(), y.tolist()):
+            line((x0, y0, x1, y1), fill = self.stroke_style, width = width)
+
+    def stroke_arcs(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        radius: Union[float, np.ndarray],
+        start_angle: np.ndarray,
+        end_angle: np.ndarray,
+        anticlockwise: bool = False
+    ):
+        x, y = self._points(x, y)
+        x, y, radius, start_angle, end_angle = np.broadcast_arrays(
+            x, y, self._lengths(radius), np.asarray(start_angle, dtype = float), np.asarray(end_angle, dtype = float)
+        )
+        if anticlockwise:
+            # Pillow only draws clockwise
+            start_angle, end_angle = end_angle, start_angle
+
+        arc = self._draw.arc
+        width = self._width()
+        for cx, cy, r, start, end in zip(
+            x.tolist(), y.tolist(), radius.tolist(), np.degrees(start_angle).tolist(), np.degrees(end_angle).tolist()
+        ):
+            arc((cx - r, cy - r, cx + r, cy + r), start, end, fill = self.stroke_style, width = width)
+
+    def fill_circles(self, x: np.ndarray, y: np.ndarray, radius: Union[float, np.ndarray]):
+
+        x, y = self._points(x, y)
+        x, y, radius = np.broadcast_arrays(x, y, self._lengths(radius))
+        ellipse = self._draw.ellipse
+        for cx, cy, r in zip(x.tolist(), y.tolist(), radius.tolist()):
+            ellipse((cx - r, cy - r, cx + r, cy + r), fill = self.fill_style)
+
+    def fill_rects(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        width: Union[float, np.ndarray],
+        height: Union[float, np.ndarray] = None
+    ):
+        if height is None:
+            height = width
+        x, y = self._points(x, y)
+        x, y, width, height = np.broadcast_arrays(x, y, self._lengths(width), self._lengths(height))
+        rectangle = self._draw.rectangle
+        for rx, ry, w, h in zip(x.tolist(), y.tolist(), width.tolist(), height.tolist()):
+            rectangle((rx, ry, rx + w, ry + h), fill = self.fill_style)
+
+    def write(self, file: BinaryIO):
+
+        self.image.save(file, format = "PNG")
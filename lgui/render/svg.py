@@ -0,0 +1,139 @@
+"""
+Defines the SVG rendering backend.
+"""
+
+import numpy as np
+
+from html import escape
+from typing import BinaryIO, Union
+
+from .backend import Backend
+
+
+def _number(value: float) -> str:
+
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+class SVGBackend(Backend):
+
+    """
+    Renders to an SVG document.
+    Each bulk drawing call becomes a single path element, so files stay small for large sheets.
+    """
+
+    FORMAT = "svg"
+
+    def __init__(self, width: int, height: int, step: int = 24, scale: float = 1):
+
+        super().__init__(width, height, step, scale)
+        self.elements: list[str] = []
+
+    def clear(self):
+
+        self.elements.clear()
+
+    def _stroke(self, path: str):
+
+        if path:
+            self.elements.append(
+                f'<path d="{path}" fill="none" stroke="{escape(self.stroke_style)}" '
+                f'stroke-width="{_number(float(self._lengths(self.line_width)))}"/>'
+            )
+
+    def _fill(self, path: str):
+
+        if path:
+            self.elements.append(f'<path d="{path}" fill="{escape(self.fill_style)}"/>')
+
+    def stroke_line_segments(self, points: np.ndarray):
+
+        points = np.asarray(points, dtype = float).reshape(-1, 2, 2)
+        x, y = self._points(points[..., 0], points[..., 1])
+        self._stroke(" ".join(
+            f"M{_number(x0)} {_number(y0)}L{_number(x1)} {_number(y1)}"
+            for (x0, x1), (y0, y1) in zip(x.tolist(), y.tolist())
+        ))
+
+    def stroke_arcs(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        radius: Union[float, np.ndarray],
+        start_angle: np.ndarray,
+        end_angle: np.ndarray,
+        anticlockwise: bool = False
+    ):
+        x, y = self._points(x, y)
+        x, y, radius, start_angle, end_angle = np.broadcast_arrays(
+            x, y, self._lengths(radius), np.asarray(start_angle, dtype = float), np.asarray(end_angle, dtype = float)
+        )
+
+        # sweep measured in the direction of drawing, as a canvas does
+        if anticlockwise:
+            sweep = np.mod(start_angle - end_angle, 2 * np.pi)
+        else:
+            sweep = np.mod(end_angle - start_angle, 2 * np.pi)
+        # whole circles are drawn as two halves, since an arc ending where it starts draws nothing
+        full = np.abs(end_angle - start_angle) >= 2 * np.pi
+        end_angle = np.where(full, start_angle + np.pi, end_angle)
+        x0, y0 = x + radius * np.cos(start_angle), y + radius * np.sin(start_angle)
+        x1, y1 = x + radius * np.cos(end_angle), y + radius * np.sin(end_angle)
+        direction = 0 if anticlockwise else 1
+
+        parts = []
+        for arc in zip(x0.tolist(), y0.tolist(), x1.tolist(), y1.tolist(), radius.tolist(), sweep.tolist(), full.tolist()):
+            ax, ay, bx, by, r, swept, whole = arc
+            if whole:
+                parts.append(
+                    f"M{_number(ax)} {_number(ay)}A{_number(r)} {_number(r)} 0 0 {direction} {_number(bx)} {_number(by)}"
+                    f"A{_number(r)} {_number(r)} 0 0 {direction} {_number(ax)} {_number(ay)}"
+                )
+            else:
+                parts.append(
+                    f"M{_number(ax)} {_number(ay)}A{_number(r)} {_number(r)} 0 {int(swept > np.pi)} "
+                    f"{direction} {_number(bx)} {_number(by)}"
+                )
+        self._stroke(" ".join(parts))
+
+    def fill_circles(self, x: np.ndarray, y: np.ndarray, radius: Union[float, np.ndarray]):
+
+        x, y = self._points(x, y)
+        x, y, radius = np.broadcast_arrays(x, y, self._lengths(radius))
+        # each circle as two half arcs
+        self._fill(" ".join(
+            f"M{_number(cx - r)} {_number(cy)}a{_number(r)} {_number(r)} 0 1 0 {_number(2 * r)} 0"
+            f"a{_number(r)} {_number(r)} 0 1 0 {_number(-2 * r)} 0z"
+            for cx, cy, r in zip(x.tolist(), y.tolist(), radius.tolist())
+        ))
+
+    def fill_rects(
+        self,
+        x: np.ndarray,
+        y: np.ndarray,
+        width: Union[float, np.ndarray],
+        height: Union[float, np.ndarray] = None
+    ):
+        if height is None:
+            height = width
+        x, y = self._points(x, y)
+        x, y, width, height = np.broadcast_arrays(x, y, self._lengths(width), self._lengths(height))
+        self._fill(" ".join(
+            f"M{_number(rx)} {_number(ry)}h{_number(w)}v{_number(h)}h{_number(-w)}z"
+            for rx, ry, w, h in zip(x.tolist(), y.tolist(), width.tolist(), height.tolist())
+        ))
+
+    def to_string(self) -> str:
+        """
+        Produces the SVG document.
+        """
+        return (
+            f'<svg xmlns="http://www.w3.org/2000/svg" width="{self.width}" height="{self.height}" '
+            f'viewBox="0 0 {self.width} {self.height}">\n'
+            + "".join(element + "\n" for element in self.elements)
+            + "</svg>\n"
+        )
+
+    def write(self, file: BinaryIO):
+
+        file.write(self.to_string().encode("utf-8"))
@@ -0,0 +1,96 @@
+"""
+Defines the render scheduler used by the editor to redraw on demand.
+"""
+
+import time
+import logging
+import threading
+
+from typing import Callable
+
+
+logger = logging.getLogger(__name__)
+
+
+class RenderScheduler:
+
+    """
+    Coalesces redraw requests into frames.
+
+    A single background thread sleeps until a frame is requested,
+    waits for the frame delay so that bursts of requests collapse into one frame,
+    and then calls the render callback.
+    Errors raised by the render callback are logged and the next request draws a new frame.
+    Nothing runs while the scheduler is idle.
+
+    Parameters
+    ----------
+
+    render: Callable
+        Called once per frame to draw the pending changes.
+    delay: float
+        Delay in seconds between the first request and the frame being drawn.
+    """
+
+    def __init__(self, render: Callable, delay: float):
+
+        self.render: Callable = render
+        self.delay: float = delay
+        self._dirty: bool = False
+        self._closed: bool = False
+        self._wake = threading.Condition()
+        self._thread: threading.Thread = None
+
+    @property
+    def closed(self) -> bool:
+        """
+        Whether the scheduler has been shut down.
+        """
+        return self._closed
+
+    def request(self, *args):
+        """
+        Marks the canvas as dirty so that a frame is drawn soon.
+        Accepts and ignores any arguments so it can be registered directly as a callback.
+        """
+        with self._wake:
+            if self._closed:
+                return
+            self._dirty = True
+            if self._thread is None:
+                self._thread = threading.Thread(target = self._run, daemon = True)
+                self._thread.start()
+            self._wake.notify()
+
+    def close(self):
+        """
+        Shuts the scheduler down, discarding any pending frame.
+        """
+        with self._wake:
+            self._closed = True
+            self._wake.notify()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join()
+
+    def _run(self):
+        """
+        Frame loop, runs on the scheduler thread.
+        """
+        while True:
+            with self._wake:
+                while not self._dirty and not self._closed:
+                    self._wake.wait()
+                if self._closed:
+                    return
+                # let further requests in the burst pile onto this frame
+                deadline = time.monotonic() + self.delay
+                while not self._closed and time.monotonic() < deadline:
+                    self._wake.wait(deadline - time.monotonic())
+                if self._closed:
+                    return
+                self._dirty = False
+            try:
+                self.render()
+            except Exception:
+                # a failed frame must not stop the thread, or nothing would ever be drawn again
+                logger.exception("rendering a frame failed")
@@ -2,7 +2,123 @@
 Defines a grid sheet for laying out lgui components on.
 """
 
-from .components import Component
+import math
+import numpy as np
+
+from typing import Hashable, Iterable, Iterator, Sequence, TextIO, Union
+
+from .components import Component, Wire, Ground
+from .spatial import SpatialIndex, segment_distance
+from .nets import Nets
+from .netlist import NetlistCache
+from .table import ComponentTable, ComponentView
+
+
+class ComponentList(Sequence):
+
+    """
+    The components of a sheet, in the order they were added.
+    Rows of one ComponentTable are kept as an array of row numbers and wrapped in a ComponentView
+    only when accessed, while other components are kept as objects after them.
+    """
+
+    def __init__(self):
+
+        self.table: ComponentTable = None
+        self.rows: np.ndarray = np.empty(0, dtype = np.int64)
+        self.objects: list[Component] = []
+
+    def __len__(self) -> int:
+
+        return len(self.rows) + len(self.objects)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Component, list[Component]]:
+
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("component index out of range")
+        if index < len(self.rows):
+            return ComponentView(self.table, int(self.rows[index]))
+        return self.objects[index - len(self.rows)]
+
+    def __iter__(self) -> Iterator[Component]:
+
+        table = self.table
+        for row in self.rows.tolist():
+            yield ComponentView(table, row)
+        yield from self.objects
+
+    def __contains__(self, component: Component) -> bool:
+
+        return self.row(component) is not None or component in self.objects
+
+    def __eq__(self, other: object) -> bool:
+
+        if isinstance(other, Sequence):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+
+        return repr(list(self))
+
+    def row(self, component: Component) -> int:
+        """
+        Gets the row of a component kept as a row number, or None if it is kept as an object.
+        """
+        if isinstance(component, ComponentView) and component.table is self.table and np.any(self.rows == component.row):
+            return component.row
+        return None
+
+    def resolve(self, key: Hashable) -> Component:
+        """
+        Gets the component filed under a key, as returned by remove.
+        """
+        return ComponentView(self.table, key) if isinstance(key, int) else key
+
+    def packs(self, table: ComponentTable) -> bool:
+        """
+        Whether rows of a table can be kept as row numbers while keeping the order components were added in.
+        """
+        return len(self.objects) == 0 and (self.table is None or self.table is table)
+
+    def extend_rows(self, table: ComponentTable, rows: np.ndarray):
+        """
+        Adds rows of a table, kept as row numbers. Check the table with packs first.
+        """
+        self.table = table
+        self.rows = np.concatenate((self.rows, rows))
+
+    def append(self, component: Component):
+        """
+        Adds a component, kept as an object.
+        """
+        self.objects.append(component)
+
+    def remove(self, component: Component) -> Hashable:
+        """
+        Removes a component.
+
+        Returns
+        -------
+
+        Hashable
+            The key the component is filed under, its row number if kept as one and otherwise itself.
+        """
+        if len(self.objects) > 0 and self.objects[-1] is component:
+            # removing the most recent component is the common case
+            self.objects.pop()
+            return component
+        row = self.row(component)
+        if row is None:
+            self.objects.remove(component)
+            return component
+        self.rows = np.delete(self.rows, np.flatnonzero(self.rows == row)[0])
+        return row
+
 
 class Sheet:
 
@@ -22,36 +138,312 @@ class Sheet:
 
         self.name: str = name
         self.author: str = author
-        self.components: list[Component] = []
-        self.nodes: dict[tuple[int, int], int] = {}
-        self.next_id = 1
+        self.components: ComponentList = ComponentList()
+        self._nets: Nets = Nets()
+        self._nets_stale: bool = False
+        self._netlist: NetlistCache = NetlistCache(self)
+        self.revision: int = 0
+        """
+        Incremented whenever a component is added or removed.
+        """
+        self.index: SpatialIndex = SpatialIndex()
+        """
+        Spatial index of the components, filed by the box spanned by their ports.
+        Components kept as table rows are filed under their row number.
+        """
 
     def to_lcapy(self) -> str:
         """
         Produces the contents of the sheet as an lcapy netlist.
         Currently does not provide sufficient styling to be rendered with lcapy.
         """
-        out = "\n"
+        return "\n" + "".join(self.iter_lcapy())
 
-        for component in self.components:
-            # netlist formatted string       
-            out += f"{component.TYPE}{component.id}"
-            for port in component.ports:
-                x, y = round(port.position[0]), round(port.position[1])
-                out += f" {self.nodes[(x, y)]}"
-            if component.value is not None:
-                out += f" {{component.value}}"
-            out += "\n"
+    def iter_lcapy(self) -> Iterator[str]:
+        """
+        Generates the lines of the lcapy netlist for the sheet one at a time.
+        Each line ends with a newline.
+        Lines are cached and only reformatted when an edit affects them.
+        """
+        for line in self._netlist.lines():
+            yield line + "\n"
+
+    def write_lcapy(self, file: TextIO):
+        """
+        Writes the lcapy netlist for the sheet to a file-like object line by line,
+        without building the whole netlist in memory.
 
-        return out
+        Parameters
+        ----------
+
+        file: TextIO
+            The file-like object to write to.
+        """
+        file.writelines(self.iter_lcapy())
+
+    def to_circuit(self):
+        """
+        Produces the contents of the sheet as an lcapy circuit.
+        The circuit is cached and patched as the sheet is edited, rather than being parsed again.
+        Treat it as read-only, since it is shared between calls.
+        """
+        return self._netlist.circuit()
+
+    def netlist_line(self, component: Component, nets: list[int] = None) -> str:
+        """
+        Produces the netlist line for a single component, without a trailing newline.
+        Instances of sub-sheets produce a line for each of their components, joined by newlines.
+
+        Parameters
+        ----------
+
+        component: Component
+            The component to format.
+        nets: list[int] = None
+            The net numbers of the ports, if already known.
+        """
+        expand = getattr(component, "netlist_line", None)
+        if expand is not None:
+            return expand(self)
+        if nets is None:
+            nets = [self.net(port.position) for port in component.ports]
+        return Sheet.format_line(f"{component.TYPE}{component.id}", str(nets[0]), str(nets[1]), component.kind, component.value)
+
+    @staticmethod
+    def format_line(name: str, positive: str, negative: str, kind: str, value: Union[str, int, float]) -> str:
+        """
+        Formats a netlist line from its fields, leaving out the kind and value if they are None.
+        """
+        # netlist formatted string
+        fields = [name, positive, negative]
+        if kind is not None:
+            fields.append(kind)
+        if value is not None:
+            value = str(value)
+            # expressions with spaces must be braced to stay one field
+            fields.append(f"{{{value}}}" if any(c.isspace() for c in value) else value)
+        return " ".join(fields)
 
     def add_component(self, component: Component):
         """
         Adds a component to the sheet
         """
+        self._add(component, self._box(component))
+
+    def _add(self, component: Component, box: tuple[float, float, float, float], points: list[tuple[int, int]] = None):
+
         self.components.append(component)
-        for port in component.ports:
-            x, y = round(port.position[0]), round(port.position[1])
-            if (x, y) not in self.nodes.keys():
-                self.nodes[(x, y)] = self.next_id
-                self.next_id += 1
\ No newline at end of file
+        self.revision += 1
+        self.index.insert(component, box)
+        if not self._nets_stale:
+            retired = self._nets.add(component, points)
+            self._netlist.added(component, retired)
+
+    def add_components(self, components: Iterable[Component]):
+        """
+        Adds many components to the sheet, such as the views of a ComponentTable.
+        """
+        for component in components:
+            self.add_component(component)
+
+    def add_rows(self, table: ComponentTable, rows: Iterable[int] = None):
+        """
+        Adds rows of a ComponentTable to the sheet in bulk.
+        The rows are kept as row numbers, filed in the spatial index and merged into nets
+        with array operations, so no object is created for each of them until it is accessed.
+        Rows added after other components, or from a second table, are added as views instead.
+
+        Parameters
+        ----------
+
+        table: ComponentTable
+            The table to add components from.
+        rows: Iterable[int] = None
+            The rows to add, if none specified every row is added.
+        """
+        if rows is None:
+            rows = np.arange(len(table))
+        rows = np.asarray(rows, dtype = np.int64)
+
+        ports = table.ports[rows]
+        boxes = np.concatenate((ports.min(axis = 1), ports.max(axis = 1)), axis = 1)
+        points = np.round(ports).astype(np.int64)
+
+        if not self.components.packs(table):
+            for row, box, (start, end) in zip(rows.tolist(), boxes.tolist(), points.tolist()):
+                self._add(ComponentView(table, row), tuple(box), [tuple(start), tuple(end)])
+            return
+
+        self.components.extend_rows(table, rows)
+        self.revision += 1
+        self.index.insert_many(rows, boxes)
+        if not self._nets_stale:
+            self._nets.add_many(table.types(rows), points)
+            self._netlist.invalidate()
+
+    def compact(self) -> 'Sheet':
+        """
+        Copies the sheet into a new sheet whose components are stored in a ComponentTable.
+        The new sheet keeps its components as table rows, with no Component, Node or view objects,
+        and files them in the spatial index and nets in arrays.
+        """
+        sheet = Sheet(self.name, self.author)
+        sheet.add_rows(ComponentTable.from_components(self.components))
+        return sheet
+
+    def remove_component(self, component: Component):
+        """
+        Removes a component from the sheet
+        """
+        key = self.components.remove(component)
+        self.revision += 1
+        self.index.remove(key)
+        if self._nets_stale:
+            return
+        if component.TYPE in (Wire.TYPE, Ground.TYPE) or self._nets.release(component):
+            # the net may have split or emptied, so rebuild when next needed
+            self._nets_stale = True
+            self._netlist.invalidate()
+        else:
+            self._netlist.removed(component)
+
+    def update_component(self, component: Component):
+        """
+        Updates the netlist after the value, kind or initial value of a component is changed in place.
+        Moving a component must be done by removing it and adding it again.
+        """
+        self.revision += 1
+        if not self._nets_stale:
+            self._netlist.added(component, [])
+
+    @property
+    def nets(self) -> Nets:
+        """
+        The nets of the sheet, rebuilt first if a removal has left them out of date.
+        """
+        if self._nets_stale:
+            self._nets = Nets()
+            components = self.components
+            if len(components.rows) > 0:
+                points = np.round(components.table.ports[components.rows]).astype(np.int64)
+                self._nets.add_many(components.table.types(components.rows), points)
+            for component in components.objects:
+                self._nets.add(component)
+            self._nets_stale = False
+        return self._nets
+
+    @property
+    def next_id(self) -> int:
+        """
+        The number that will be given to the next new net.
+        """
+        return self.nets.next_id
+
+    @property
+    def nodes(self) -> dict[tuple[int, int], int]:
+        """
+        Maps each port position on the sheet to the number of its net.
+        """
+        nets = self.nets
+        return {
+            Nets.key(port.position): nets.net(port.position) 
+            for component in self.components for port in component.ports
+        }
+
+    def net(self, position: tuple[float, float]) -> int:
+        """
+        Gets the number of the net at a position.
+        """
+        return self.nets.net(position)
+
+    @staticmethod
+    def _box(component: Component) -> tuple[float, float, float, float]:
+        """
+        Computes the box spanned by the ports of a component.
+        Instances of sub-sheets span the box of their definition instead.
+        """
+        span = getattr(component, "span", None)
+        if span is not None:
+            return span()
+        xs = [port.position[0] for port in component.ports]
+        ys = [port.position[1] for port in component.ports]
+        return (min(xs), min(ys), max(xs), max(ys))
+
+    @staticmethod
+    def _distance(position: tuple[float, float], component: Component) -> float:
+        """
+        Computes the distance from a position to the line between the ports of a component.
+        Instances of sub-sheets are hit anywhere within the box of their definition.
+        """
+        span = getattr(component, "span", None)
+        if span is None:
+            return segment_distance(position, component.ports[0].position, component.ports[1].position)
+        left, top, right, bottom = span()
+        return math.hypot(
+            max(left - position[0], 0, position[0] - right),
+            max(top - position[1], 0, position[1] - bottom)
+        )
+
+    def component_at(self, position: tuple[float, float], tolerance: float = 0) -> list[Component]:
+        """
+        Finds the components that pass within a tolerance of a position, nearest first.
+
+        Parameters
+        ----------
+
+        position: tuple[float, float]
+            The position to hit-test.
+        tolerance: float = 0
+            The greatest distance from the line between a component's ports to count as a hit.
+        """
+        hits = []
+        for key in self.index.query_point(position[0], position[1], tolerance):
+            component = self.components.resolve(key)
+            distance = Sheet._distance(position, component)
+            if distance <= tolerance:
+                hits.append((distance, component))
+        hits.sort(key = lambda hit: hit[0])
+        return [component for _, component in hits]
+
+    def components_in(self, box: tuple[float, float, float, float], contained: bool = False) -> list[Component]:
+        """
+        Finds the components in a rectangle, in no particular order.
+
+        Parameters
+        ----------
+
+        box: tuple[float, float, float, float]
+            The rectangle as (left, top, right, bottom).
+        contained: bool = False
+            Only find components with both ports inside the rectangle,
+            otherwise any component whose ports span a box overlapping the rectangle is found.
+        """
+        return [self.components.resolve(key) for key in self.index.query_rect(box, contained)]
+
+    def wires_through(self, position: tuple[float, float]) -> list[Wire]:
+        """
+        Finds the wires that pass through a position without ending there.
+        A port at such a position forms a T-junction with the wire.
+        """
+        wires = []
+        for component in self.component_at(position):
+            if component.TYPE == Wire.TYPE \
+                and all(tuple(position) != tuple(port.position) for port in component.ports):
+                wires.append(component)
+        return wires
+
+    def t_junctions(self) -> list[tuple[tuple[float, float], Wire]]:
+        """
+        Finds every port that lies part way along a wire.
+
+        Returns
+        -------
+
+        list[tuple[tuple[float, float], Wire]]
+            Pairs of the port position and the wire it lies on.
+        """
+        junctions = []
+        for position in {tuple(port.position) for component in self.components for port in component.ports}:
+            for wire in self.wires_through(position):
+                junctions.append((position, wire))
+        return junctions
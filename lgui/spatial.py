@@ -0,0 +1,274 @@
+"""
+Defines a spatial index for looking up sheet items by position.
+"""
+
+import math
+import numpy as np
+
+from typing import Hashable, Iterator
+
+
+class SpatialIndex:
+
+    """
+    Uniform grid index of axis-aligned boxes.
+    Each item is filed under every grid cell its box overlaps,
+    so queries only visit the cells they cover rather than every item.
+    Items covering more than LARGE cells are kept aside and checked by every query instead.
+
+    Integer items, such as the rows of a ComponentTable, can also be inserted in bulk with insert_many.
+    These are packed into NumPy arrays sorted by cell, so no Python objects are kept for each of them.
+
+    Parameters
+    ----------
+
+    cell: float = 96
+        Side length of the grid cells.
+        Should be a few times the typical item size.
+    """
+
+    LARGE = 64
+
+    def __init__(self, cell: float = 96):
+
+        self.cell: float = cell
+        self._cells: dict[tuple[int, int], set[Hashable]] = {}
+        self._large: set[Hashable] = set()
+        self._boxes: dict[Hashable, tuple[float, float, float, float]] = {}
+
+        self._pack(np.empty(0, dtype = np.int64), np.empty((0, 4)))
+
+    def __len__(self) -> int:
+
+        return len(self._boxes) + self._packed_count
+
+    def __contains__(self, item: Hashable) -> bool:
+
+        return item in self._boxes or self._packed(item) is not None
+
+    @staticmethod
+    def _key_code(i: np.ndarray, j: np.ndarray) -> np.ndarray:
+        """
+        Packs cell keys into single integers that sort by i then j.
+        """
+        return i.astype(np.int64) * 2 ** 32 + j
+
+    def _packed(self, item: Hashable) -> int:
+        """
+        Finds the position of a live packed item, or None if it is not packed.
+        """
+        if self._packed_count == 0 or not isinstance(item, (int, np.integer)):
+            return None
+        position = int(np.searchsorted(self._packed_items, item))
+        if position < len(self._packed_items) and self._packed_items[position] == item and self._packed_alive[position]:
+            return position
+        return None
+
+    def _count(self, box: tuple[float, float, float, float]) -> int:
+        """
+        Counts the cells that a box overlaps.
+        """
+        left, top, right, bottom = box
+        return (math.floor(right / self.cell) - math.floor(left / self.cell) + 1) \
+            * (math.floor(bottom / self.cell) - math.floor(top / self.cell) + 1)
+
+    def _keys(self, box: tuple[float, float, float, float]) -> Iterator[tuple[int, int]]:
+        """
+        Iterates over the keys of the cells that a box overlaps.
+        """
+        left, top, right, bottom = box
+        for i in range(math.floor(left / self.cell), math.floor(right / self.cell) + 1):
+            for j in range(math.floor(top / self.cell), math.floor(bottom / self.cell) + 1):
+                yield (i, j)
+
+    def box(self, item: Hashable) -> tuple[float, float, float, float]:
+        """
+        Gets the box an item was inserted with.
+        """
+        box = self._boxes.get(item)
+        if box is not None:
+            return box
+        position = self._packed(item)
+        if position is None:
+            raise KeyError(item)
+        return tuple(self._packed_boxes[position].tolist())
+
+    def insert(self, item: Hashable, box: tuple[float, float, float, float]):
+        """
+        Adds an item to the index, replacing it if already present.
+
+        Parameters
+        ----------
+
+        item: Hashable
+            The item to index.
+        box: tuple[float, float, float, float]
+            The box covered by the item as (left, top, right, bottom).
+        """
+        if item in self:
+            self.remove(item)
+        self._boxes[item] = box
+        if self._count(box) > SpatialIndex.LARGE:
+            self._large.add(item)
+            return
+        for key in self._keys(box):
+            self._cells.setdefault(key, set()).add(item)
+
+    def insert_many(self, items: np.ndarray, boxes: np.ndarray):
+        """
+        Adds many integer items to the index in one go, packed into arrays.
+
+        Parameters
+        ----------
+
+        items: np.ndarray
+            The items as an (n,) integer array, none of which may be in the index already.
+        boxes: np.ndarray
+            The boxes covered by the items as an (n, 4) array of (left, top, right, bottom).
+        """
+        items = np.asarray(items, dtype = np.int64)
+        boxes = np.asarray(boxes, dtype = float).reshape(-1, 4)
+        if self._packed_count:
+            # repack the live items along with the new ones
+            alive = self._packed_alive
+            items = np.concatenate((self._packed_items[alive], items))
+            boxes = np.concatenate((self._packed_boxes[alive], boxes))
+        self._pack(items, boxes)
+
+    def _pack(self, items: np.ndarray, boxes: np.ndarray):
+        """
+        Replaces the packed items, sorting them by item and their cell entries by cell key.
+        """
+        order = np.argsort(items, kind = "stable")
+        items, boxes = items[order], boxes[order]
+        self._packed_items: np.ndarray = items
+        self._packed_boxes: np.ndarray = boxes
+        self._packed_alive: np.ndarray = np.ones(len(items), dtype = bool)
+        self._packed_count: int = len(items)
+
+        i0, j0 = np.floor(boxes[:, 0] / self.cell).astype(np.int64), np.floor(boxes[:, 1] / self.cell).astype(np.int64)
+        i1, j1 = np.floor(boxes[:, 2] / self.cell).astype(np.int64), np.floor(boxes[:, 3] / self.cell).astype(np.int64)
+        heights = j1 - j0 + 1
+        counts = (i1 - i0 + 1) * heights
+        large = counts > SpatialIndex.LARGE
+        self._packed_large: np.ndarray = np.flatnonzero(large)
+
+        # one entry for every cell each small item overlaps, as for insert
+        small = np.flatnonzero(~large)
+        counts = counts[small]
+        positions = np.repeat(small, counts)
+        offsets = np.arange(len(positions)) - np.repeat(np.cumsum(counts) - counts, counts)
+        heights = heights[positions]
+        keys = SpatialIndex._key_code(i0[positions] + offsets // heights, j0[positions] + offsets % heights)
+        order = np.argsort(keys, kind = "stable")
+        self._packed_keys: np.ndarray = keys[order]
+        self._packed_entries: np.ndarray = positions[order]
+
+    def remove(self, item: Hashable):
+        """
+        Removes an item from the index.
+        """
+        if item not in self._boxes:
+            position = self._packed(item)
+            if position is None:
+                raise KeyError(item)
+            # packed entries stay in place and are skipped by queries
+            self._packed_alive[position] = False
+            self._packed_count -= 1
+            return
+        box = self._boxes.pop(item)
+        if item in self._large:
+            self._large.remove(item)
+            return
+        for key in self._keys(box):
+            cell = self._cells[key]
+            cell.discard(item)
+            if len(cell) == 0:
+                del self._cells[key]
+
+    def clear(self):
+        """
+        Removes all items from the index.
+        """
+        self._cells.clear()
+        self._large.clear()
+        self._boxes.clear()
+        self._pack(np.empty(0, dtype = np.int64), np.empty((0, 4)))
+
+    def query_rect(self, box: tuple[float, float, float, float], contained: bool = False) -> set[Hashable]:
+        """
+        Finds the items whose boxes overlap a rectangle.
+
+        Parameters
+        ----------
+
+        box: tuple[float, float, float, float]
+            The rectangle as (left, top, right, bottom).
+        contained: bool = False
+            Only find items that lie entirely within the rectangle.
+        """
+        left, top, right, bottom = box
+
+        # a huge query is cheaper as a scan of the items
+        if self._count(box) > len(self._cells):
+            candidates = self._boxes.keys()
+        else:
+            candidates = set(self._large)
+            for key in self._keys(box):
+                candidates.update(self._cells.get(key, ()))
+
+        found = set()
+        for item in candidates:
+            i_left, i_top, i_right, i_bottom = self._boxes[item]
+            if contained:
+                if left <= i_left and i_right <= right and top <= i_top and i_bottom <= bottom:
+                    found.add(item)
+            elif i_left <= right and left <= i_right and i_top <= bottom and top <= i_bottom:
+                found.add(item)
+
+        if self._packed_count:
+            found.update(self._query_packed(box, contained))
+        return found
+
+    def _query_packed(self, box: tuple[float, float, float, float], contained: bool) -> list[int]:
+        """
+        Finds the packed items whose boxes overlap, or lie within, a rectangle.
+        """
+        left, top, right, bottom = box
+        if self._count(box) > len(self._packed_keys):
+            positions = np.flatnonzero(self._packed_alive)
+        else:
+            i = np.arange(math.floor(left / self.cell), math.floor(right / self.cell) + 1)
+            j = np.arange(math.floor(top / self.cell), math.floor(bottom / self.cell) + 1)
+            keys = SpatialIndex._key_code(np.repeat(i, len(j)), np.tile(j, len(i)))
+            starts = np.searchsorted(self._packed_keys, keys, side = "left")
+            stops = np.searchsorted(self._packed_keys, keys, side = "right")
+            entries = [self._packed_entries[start:stop] for start, stop in zip(starts.tolist(), stops.tolist()) if stop > start]
+            positions = np.unique(np.concatenate(entries + [self._packed_large]))
+            positions = positions[self._packed_alive[positions]]
+
+        boxes = self._packed_boxes[positions]
+        if contained:
+            hit = (left <= boxes[:, 0]) & (boxes[:, 2] <= right) & (top <= boxes[:, 1]) & (boxes[:, 3] <= bottom)
+        else:
+            hit = (boxes[:, 0] <= right) & (left <= boxes[:, 2]) & (boxes[:, 1] <= bottom) & (top <= boxes[:, 3])
+        return self._packed_items[positions[hit]].tolist()
+
+    def query_point(self, x: float, y: float, tolerance: float = 0) -> set[Hashable]:
+        """
+        Finds the items whose boxes are within a tolerance of a point.
+        """
+        return self.query_rect((x - tolerance, y - tolerance, x + tolerance, y + tolerance))
+
+
+def segment_distance(point: tuple[float, float], start: tuple[float, float], end: tuple[float, float]) -> float:
+    """
+    Computes the distance from a point to a line segment.
+    """
+    dx, dy = end[0] - start[0], end[1] - start[1]
+    px, py = point[0] - start[0], point[1] - start[1]
+    length = dx * dx + dy * dy
+    if length == 0:
+        return math.hypot(px, py)
+    t = min(1, max(0, (px * dx + py * dy) / length))
+    return math.hypot(px - t * dx, py - t * dy)
@@ -0,0 +1,172 @@
+"""
+Defines the binary file format that sheets are saved in.
+
+A file is a fixed header, a JSON block holding the sheet name, author and value pool,
+then each ComponentTable column as a packed little-endian array aligned to 8 bytes.
+Loading memory-maps the columns rather than parsing components one at a time.
+"""
+
+import json
+import mmap
+import struct
+import numpy as np
+
+from .sheet import Sheet
+from .table import ComponentTable
+
+
+MAGIC = b"LGUI"
+VERSION = 1
+
+_HEADER = struct.Struct("<4sHHQI")
+"""
+Magic, version, reserved, number of components, length of the JSON block.
+"""
+
+_COLUMNS: list[tuple[str, str, tuple[int, ...]]] = [
+    ("type_codes", "<u1", ()),
+    ("ports", "<f8", (2, 2)),
+    ("ids", "<i8", ()),
+    ("value_index", "<i4", ()),
+    ("kind_index", "<i4", ()),
+    ("initial_index", "<i4", ())
+]
+"""
+Name, dtype and row shape of each column, in file order.
+"""
+
+def _padding(offset: int) -> int:
+    """
+    Number of bytes needed to align an offset to 8 bytes.
+    """
+    return -offset % 8
+
+
+def save_sheet(sheet: Sheet, path: str):
+    """
+    Saves a sheet to a binary file.
+
+    Parameters
+    ----------
+
+    sheet: Sheet
+        The sheet to save.
+    path: str
+        Path of the file to write.
+    """
+    table = ComponentTable.from_components(sheet.components)
+    # values from arrays, such as a table or a layout, may be NumPy scalars, which JSON cannot write
+    values = [value.item() if isinstance(value, np.generic) else value for value in table.values]
+    metadata = json.dumps({
+        "name": sheet.name,
+        "author": sheet.author,
+        "values": values
+    }).encode("utf-8")
+
+    with open(path, "wb") as file:
+        file.write(_HEADER.pack(MAGIC, VERSION, 0, len(table), len(metadata)))
+        file.write(metadata)
+        offset = _HEADER.size + len(metadata)
+        for name, dtype, _ in _COLUMNS:
+            file.write(b"\0" * _padding(offset))
+            offset += _padding(offset)
+            data = np.ascontiguousarray(getattr(table, name)[:len(table)], dtype = dtype).tobytes()
+            file.write(data)
+            offset += len(data)
+
+
+class SheetFile:
+
+    """
+    A saved sheet, memory-mapped so that components are only read when used.
+    Edits to the loaded components are copy-on-write and never reach the file.
+
+    Parameters
+    ----------
+
+    path: str
+        Path of the file to open.
+    """
+
+    def __init__(self, path: str):
+
+        with open(path, "rb") as file:
+            self._map = mmap.mmap(file.fileno(), 0, access = mmap.ACCESS_COPY)
+
+        magic, version, _, count, length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an lgui sheet")
+        if version != VERSION:
+            raise ValueError(f"{path} uses sheet format version {version}, only version {VERSION} is supported")
+
+        offset = _HEADER.size
+        metadata = json.loads(self._map[offset:offset + length].decode("utf-8"))
+        offset += length
+
+        self.name: str = metadata["name"]
+        self.author: str = metadata["author"]
+        self.count: int = count
+
+        columns = {}
+        for name, dtype, shape in _COLUMNS:
+            offset += _padding(offset)
+            size = count * int(np.prod(shape, dtype = int))
+            columns[name] = np.frombuffer(self._map, dtype = dtype, count = size, offset = offset).reshape((count,) + shape)
+            offset += columns[name].nbytes
+
+        self.table: ComponentTable = ComponentTable.from_arrays(values = metadata["values"], **columns)
+        """
+        The components, backed by the memory-mapped file.
+        """
+
+    def rows_in(self, box: tuple[float, float, float, float]) -> np.ndarray:
+        """
+        Finds the rows of the components whose ports span a box overlapping a rectangle.
+
+        Parameters
+        ----------
+
+        box: tuple[float, float, float, float]
+            The rectangle as (left, top, right, bottom).
+        """
+        left, top, right, bottom = box
+        ports = self.table.ports[:self.count]
+        low = ports.min(axis = 1)
+        high = ports.max(axis = 1)
+        return np.flatnonzero(
+            (low[:, 0] <= right) & (left <= high[:, 0]) & (low[:, 1] <= bottom) & (top <= high[:, 1])
+        )
+
+    def load(self, viewport: tuple[float, float, float, float] = None) -> Sheet:
+        """
+        Builds a sheet from the file.
+
+        Parameters
+        ----------
+
+        viewport: tuple[float, float, float, float] = None
+            Only load the components overlapping this rectangle, given as (left, top, right, bottom).
+            If none specified every component is loaded.
+        """
+        sheet = Sheet(self.name, self.author)
+        if viewport is None:
+            sheet.add_rows(self.table)
+        else:
+            sheet.add_rows(self.table, self.rows_in(viewport))
+        return sheet
+
+
+def load_sheet(path: str, viewport: tuple[float, float, float, float] = None) -> Sheet:
+    """
+    Loads a sheet saved with save_sheet.
+
+    Parameters
+    ----------
+
+    path: str
+        Path of the file to read.
+    viewport: tuple[float, float, float, float] = None
+        Only load the components overlapping this rectangle, given as (left, top, right, bottom).
+        If none specified every component is loaded.
+    """
+    return SheetFile(path).load(viewport)
@@ -0,0 +1,470 @@
+"""
+Defines a compact, array-backed store of components.
+"""
+
+import numpy as np
+
+from typing import Union, Iterable, Iterator
+
+from .components import *
+from .components.component import Node
+
+
+class ComponentTable:
+
+    """
+    Columnar store of components.
+    Each component is a row of NumPy arrays holding its type code, port positions, ids
+    and indices into a shared pool of values, so no Python objects are kept per component.
+    Rows are accessed through lightweight ComponentView objects.
+    Sheets keep the rows they are given as row numbers, and only create views when the rows are accessed.
+
+    Parameters
+    ----------
+
+    capacity: int = 1024
+        Number of rows to allocate up front. The table grows as needed.
+    """
+
+    TYPES: list[type] = [Resistor, Capacitor, Inductor, VoltageSource, CurrentSource, Wire, Ground]
+    """
+    Component classes, indexed by type code.
+    """
+
+    CODES: dict[str, int] = {component.TYPE: code for code, component in enumerate(TYPES)}
+    """
+    Type codes, keyed by component TYPE.
+    """
+
+    def __init__(self, capacity: int = 1024):
+
+        self.size: int = 0
+        self.type_codes: np.ndarray = np.empty(capacity, dtype = np.uint8)
+        self.ports: np.ndarray = np.empty((capacity, 2, 2), dtype = np.float64)
+        self.ids: np.ndarray = np.empty(capacity, dtype = np.int64)
+        self.value_index: np.ndarray = np.empty(capacity, dtype = np.int32)
+        self.kind_index: np.ndarray = np.empty(capacity, dtype = np.int32)
+        self.initial_index: np.ndarray = np.empty(capacity, dtype = np.int32)
+        self.revisions: np.ndarray = np.empty((capacity, 2), dtype = np.int64)
+        self.values: list[Union[str, int, float]] = []
+        """
+        Pool of distinct values, kinds and initial values, referred to by index. -1 stands for None.
+        """
+        self._value_codes: dict[tuple[type, Union[str, int, float]], int] = {}
+
+    def __len__(self) -> int:
+
+        return self.size
+
+    def __getitem__(self, row: int) -> 'ComponentView':
+
+        if not -self.size <= row < self.size:
+            raise IndexError("component table row out of range")
+        return ComponentView(self, row % self.size)
+
+    def __iter__(self) -> Iterator['ComponentView']:
+
+        for row in range(self.size):
+            yield ComponentView(self, row)
+
+    @property
+    def capacity(self) -> int:
+        """
+        Number of rows allocated.
+        """
+        return len(self.type_codes)
+
+    def _grow(self, capacity: int):
+        """
+        Reallocates every column to hold at least the given number of rows.
+        """
+        for column in ("type_codes", "ports", "ids", "value_index", "kind_index", "initial_index", "revisions"):
+            old = getattr(self, column)
+            new = np.empty((capacity,) + old.shape[1:], dtype = old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, column, new)
+
+    @staticmethod
+    def code(component_type: type) -> int:
+        """
+        Gets the type code of a component class.
+
+        Raises
+        ------
+
+        ValueError
+            If the table cannot store components of the class, such as instances of sub-sheets.
+        """
+        code = ComponentTable.CODES.get(component_type.TYPE)
+        if code is None:
+            raise ValueError(
+                f"{component_type.NAME} components cannot be stored in a component table, "
+                "flatten sheets holding them with lgui.hierarchy.flatten first"
+            )
+        return code
+
+    def intern(self, value: Union[str, int, float]) -> int:
+        """
+        Gets the index of a value in the value pool, adding it if new.
+        """
+        if value is None:
+            return -1
+        key = (type(value), value)
+        code = self._value_codes.get(key)
+        if code is None:
+            code = len(self.values)
+            self.values.append(value)
+            self._value_codes[key] = code
+        return code
+
+    def value_of(self, index: int) -> Union[str, int, float]:
+        """
+        Looks up an index into the value pool.
+        """
+        return None if index < 0 else self.values[index]
+
+    def append(
+        self,
+        component_type: type,
+        start: tuple[float, float],
+        end: tuple[float, float],
+        value: Union[str, int, float] = None,
+        kind: str = None,
+        initial_value: Union[str, int, float] = None,
+        id: int = None
+    ) -> 'ComponentView':
+        """
+        Adds a component as a new row.
+
+        Parameters
+        ----------
+
+        component_type: type
+            The component class, e.g. Resistor.
+        start: tuple[float, float]
+            Position of the first port.
+        end: tuple[float, float]
+            Position of the second port.
+        value: Union[str, int, float] = None
+            The value of the component.
+        kind: str = None
+            The kind of source, e.g. dc.
+        initial_value: Union[str, int, float] = None
+            The initial value of the component.
+        id: int = None
+            The component id, taken from the component class counter if none specified.
+        """
+        if self.size == self.capacity:
+            self._grow(max(2 * self.capacity, 16))
+
+        if id is None:
+            id = component_type.next_id
+            component_type.next_id += 1
+
+        row = self.size
+        self.type_codes[row] = ComponentTable.code(component_type)
+        self.ports[row, 0] = start
+        self.ports[row, 1] = end
+        self.ids[row] = id
+        self.value_index[row] = self.intern(value)
+        self.kind_index[row] = self.intern(kind)
+        self.initial_index[row] = self.intern(initial_value)
+        self.revisions[row] = (next(Node._revisions), next(Node._revisions))
+        self.size += 1
+
+        return ComponentView(self, row)
+
+    def extend(self, component_type: type, starts: np.ndarray, ends: np.ndarray) -> range:
+        """
+        Adds many components of one type without values as new rows in one go, e.g. wires.
+
+        Parameters
+        ----------
+
+        component_type: type
+            The component class, e.g. Wire.
+        starts: np.ndarray
+            Positions of the first ports as an (n, 2) array.
+        ends: np.ndarray
+            Positions of the second ports as an (n, 2) array.
+
+        Returns
+        -------
+
+        range
+            The rows added.
+        """
+        count = len(starts)
+        if self.size + count > self.capacity:
+            self._grow(max(2 * self.capacity, self.size + count, 16))
+
+        rows = slice(self.size, self.size + count)
+        self.type_codes[rows] = ComponentTable.code(component_type)
+        self.ports[rows, 0] = starts
+        self.ports[rows, 1] = ends
+        self.ids[rows] = np.arange(component_type.next_id, component_type.next_id + count)
+        component_type.next_id += count
+        self.value_index[rows] = -1
+        self.kind_index[rows] = -1
+        self.initial_index[rows] = -1
+        self.revisions[rows] = np.array([next(Node._revisions) for _ in range(2 * count)]).reshape(-1, 2)
+        self.size += count
+
+        return range(rows.start, rows.stop)
+
+    def append_component(self, component: Component) -> 'ComponentView':
+        """
+        Copies a component into a new row.
+        """
+        return self.append(
+            type(component) if isinstance(component, Component) else component.component_type,
+            component.ports[0].position, component.ports[1].position,
+            component.value, component.kind, component.initial_value, component.id
+        )
+
+    @classmethod
+    def from_components(cls, components: Iterable[Component]) -> 'ComponentTable':
+        """
+        Builds a table holding copies of components.
+        """
+        components = list(components)
+        table = cls(max(len(components), 16))
+        for component in components:
+            table.append_component(component)
+        return table
+
+    @classmethod
+    def from_arrays(
+        cls,
+        type_codes: np.ndarray,
+        ports: np.ndarray,
+        ids: np.ndarray,
+        value_index: np.ndarray,
+        kind_index: np.ndarray,
+        initial_index: np.ndarray,
+        values: list[Union[str, int, float]]
+    ) -> 'ComponentTable':
+        """
+        Builds a table over existing column arrays without copying them,
+        e.g. arrays memory-mapped from a file.
+        The table copies the arrays only if it has to grow.
+        """
+        table = cls(0)
+        table.size = len(type_codes)
+        table.type_codes = type_codes
+        table.ports = ports
+        table.ids = ids
+        table.value_index = value_index
+        table.kind_index = kind_index
+        table.initial_index = initial_index
+        table.revisions = np.zeros((table.size, 2), dtype = np.int64)
+        # the indices in the columns must keep pointing at the same values
+        table.values = list(values)
+        table._value_codes = {(type(value), value): code for code, value in enumerate(table.values)}
+        return table
+
+    def types(self, rows: np.ndarray) -> np.ndarray:
+        """
+        Gets the TYPE of each of some rows, e.g. W for wires.
+        """
+        return np.array([component.TYPE for component in ComponentTable.TYPES])[self.type_codes[rows]]
+
+    def views(self) -> list['ComponentView']:
+        """
+        Gets a view of every row.
+        """
+        return [ComponentView(self, row) for row in range(self.size)]
+
+
+class NodeView:
+
+    """
+    Lightweight stand-in for a Node, reading and writing a port of a ComponentTable row.
+    """
+
+    __slots__ = ("table", "row", "port")
+
+    def __init__(self, table: ComponentTable, row: int, port: int):
+
+        self.table: ComponentTable = table
+        self.row: int = row
+        self.port: int = port
+
+    @property
+    def position(self) -> tuple[float, float]:
+        """
+        Position of the node.
+        """
+        return tuple(self.table.ports[self.row, self.port].tolist())
+
+    @position.setter
+    def position(self, position: tuple[float, float]):
+        self.table.ports[self.row, self.port] = position
+        self.table.revisions[self.row, self.port] = next(Node._revisions)
+
+    @property
+    def revision(self) -> int:
+        """
+        Changes whenever the position is set.
+        """
+        return int(self.table.revisions[self.row, self.port])
+
+    def __eq__(self, other: Node) -> bool:
+
+        return self.position == other.position
+
+
+class ComponentView:
+
+    """
+    Lightweight stand-in for a Component, reading and writing a ComponentTable row.
+    Provides the Component attributes and drawing methods used by the sheet and editor.
+    Views of the same row compare and hash equal.
+    """
+
+    __slots__ = ("table", "row")
+
+    def __init__(self, table: ComponentTable, row: int):
+
+        self.table: ComponentTable = table
+        self.row: int = row
+
+    def __eq__(self, other: object) -> bool:
+
+        return isinstance(other, ComponentView) and self.table is other.table and self.row == other.row
+
+    def __hash__(self) -> int:
+
+        return hash((id(self.table), self.row))
+
+    def __str__(self) -> str:
+
+        return Component.__str__(self)
+
+    @property
+    def component_type(self) -> type:
+        """
+        The class of the component, e.g. Resistor.
+        """
+        return ComponentTable.TYPES[self.table.type_codes[self.row]]
+
+    @property
+    def TYPE(self) -> str:
+
+        return self.component_type.TYPE
+
+    @property
+    def NAME(self) -> str:
+
+        return self.component_type.NAME
+
+    @property
+    def kinds(self) -> dict[str, str]:
+
+        return self.component_type.kinds
+
+    @property
+    def id(self) -> int:
+
+        return int(self.table.ids[self.row])
+
+    @property
+    def value(self) -> Union[str, int, float]:
+
+        return self.table.value_of(self.table.value_index[self.row])
+
+    @value.setter
+    def value(self, value: Union[str, int, float]):
+        self.table.value_index[self.row] = self.table.intern(value)
+
+    @property
+    def kind(self) -> str:
+
+        return self.table.value_of(self.table.kind_index[self.row])
+
+    @kind.setter
+    def kind(self, kind: str):
+        self.table.kind_index[self.row] = self.table.intern(kind)
+
+    @property
+    def initial_value(self) -> Union[str, int, float]:
+
+        return self.table.value_of(self.table.initial_index[self.row])
+
+    @initial_value.setter
+    def initial_value(self, initial_value: Union[str, int, float]):
+        self.table.initial_index[self.row] = self.table.intern(initial_value)
+
+    @property
+    def ports(self) -> tuple[NodeView, NodeView]:
+
+        return (NodeView(self.table, self.row, 0), NodeView(self.table, self.row, 1))
+
+    def length(self) -> float:
+        """
+        Computes the length of the component.
+        """
+        delta = self.table.ports[self.row, 1] - self.table.ports[self.row, 0]
+        return float(np.hypot(delta[0], delta[1]))
+
+    def along(self) -> np.ndarray:
+        """
+        Computes a unit vector pointing along the line of the component.
+        If the length of the component is zero, this will return the zero vector.
+        """
+        length = self.length()
+        if length == 0:
+            return np.zeros(2)
+        return (self.table.ports[self.row, 1] - self.table.ports[self.row, 0]) / length
+
+    def orthog(self) -> np.ndarray:
+        """
+        Computes a unit vector pointing anti-clockwise to the line of the component.
+        """
+        along = self.along()
+        return np.array((-along[1], along[0]))
+
+    def bounds(self, editor) -> tuple[float, float, float, float]:
+        """
+        Computes the bounding box that the component is drawn within.
+        """
+        return Component.bounds(self, editor)
+
+    def draw_on(self, editor, layer):
+        """
+        Draws the component on a canvas.
+        """
+        ComponentView.draw_many(editor, layer, [self])
+
+    @staticmethod
+    def draw_many(editor, layer, views: list['ComponentView']):
+        """
+        Draws many views with bulk canvas calls, reading geometry straight from their tables.
+
+        Parameters
+        ----------
+
+        editor: Editor
+            The editor object to draw on
+        layer: Canvas
+            Layer to draw the components on
+        views: list[ComponentView]
+            Views to draw, of any type
+        """
+        tables: dict[int, tuple[ComponentTable, list[int]]] = {}
+        for view in views:
+            tables.setdefault(id(view.table), (view.table, []))[1].append(view.row)
+
+        for table, rows in tables.values():
+            rows = np.array(rows)
+            codes = table.type_codes[rows]
+            for code in np.unique(codes):
+                component_type = ComponentTable.TYPES[code]
+                if component_type.TYPE == Ground.TYPE:
+                    # no graphical representation
+                    continue
+                ports = table.ports[rows[codes == code]]
+                component_type.draw_symbols(editor, layer, ports[:, 0], ports[:, 1])
+                # node dots
+                nodes = ports.reshape(-1, 2)
+                layer.fill_circles(nodes[:, 0], nodes[:, 1], editor.STEP // 5)
@@ -28,9 +28,14 @@ setup(
     install_requires=[
         "lcapy",
         "numpy",
+        "scipy",
         "ipywidgets",
         "IPython",
         "ipycanvas"
     ],
-    python_requires=">=3.7" # matched with lcapy
+    extras_require={
+        "render": ["Pillow"], # raster rendering backend
+        "test": ["pytest"]
+    },
+    python_requires=">=3.9" # annotations use built-in generics such as dict[str, str]
 )
\ No newline at end of file
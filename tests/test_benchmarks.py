@@ -0,0 +1,24 @@
+import json
+import pytest
+
+pytest.importorskip("ipycanvas")
+
+from benchmarks import rendering
+
+
+def test_benchmarks_write_results(tmp_path):
+
+    path = tmp_path / "results.json"
+    rendering.main(["--sizes", "10", "200", "--repeat", "1", "--json", str(path)])
+    with open(path, encoding = "utf-8") as file:
+        results = json.load(file)["results"]
+
+    assert sorted((result["benchmark"], result["components"]) for result in results) == sorted(
+        (name, size) for name in rendering.BENCHMARKS for size in (10, 200)
+    )
+    assert all(result["seconds"] >= 0 and result["commands"] > 0 for result in results)
+
+    # drawing is batched, so more components send more bytes but not more commands
+    redraws = {result["components"]: result for result in results if result["benchmark"] == "redraw_all"}
+    assert redraws[200]["commands"] == redraws[10]["commands"]
+    assert redraws[200]["bytes"] > redraws[10]["bytes"]
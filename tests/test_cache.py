@@ -0,0 +1,86 @@
+import pytest
+
+from lgui.analysis import solve, ResultCache, canonical_netlist, circuit_hash
+
+
+def test_renumbered_circuits_share_a_hash():
+
+    a = ["V1 1 0 dc 10", "R1 1 2 1000", "R2 2 0 2000", "C1 2 3 1e-6", "R3 3 0 50"]
+    b = ["R7 5 0 2000", "V3 9 0 dc 10", "C4 5 8 1e-6", "R9 9 5 1000", "R2 0 8 50"]
+    assert circuit_hash(canonical_netlist(a)[0]) == circuit_hash(canonical_netlist(b)[0])
+
+
+def test_valueless_components_keep_their_names():
+
+    netlist, _ = canonical_netlist(["V1 1 0", "Ra 1 2", "Rb 2 0"])
+    names = sorted(line.split()[0] for line in netlist.splitlines())
+    assert names == ["Ra", "Rb", "V1"]
+
+
+def test_cached_result_matches_fresh_solve():
+
+    pytest.importorskip("lcapy")
+    lines = ["V1 1 0", "Ra 1 2", "Rb 2 0"]
+    fresh = solve("\n" + "\n".join(lines))
+
+    netlist, names = canonical_netlist(lines)
+    cache = ResultCache()
+    cache.put(circuit_hash(netlist), solve("\n" + netlist))
+    cached = cache.get(circuit_hash(canonical_netlist(lines)[0]))
+    nodes = {canonical: node for node, canonical in names.items()}
+    assert {nodes[name]: value for name, value in cached.items()} == fresh
+    assert "Ra" in fresh["2"] and "Rb" in fresh["2"]
+
+
+def test_disk_tier_evicts_least_recently_used(tmp_path):
+
+    cache = ResultCache(str(tmp_path), memory_items = 1, disk_bytes = 300)
+    for i in range(10):
+        cache.put(f"k{i}", {"1": "x" * 50})
+    assert sum(1 for path in tmp_path.iterdir() if path.suffix == ".json") <= 5
+    assert ResultCache(str(tmp_path)).get("k9") == {"1": "x" * 50}
+
+
+def test_worker_cache_hit_matches_fresh_solve():
+
+    import threading
+
+    from lgui.importer import read_lcapy
+    from lgui.analysis import AnalysisWorker
+
+    sheet = read_lcapy(["V1 1 0 dc 10", "R1 1 2 1000", "R2 2 0 2000", "Rc 2 3", "C1 3 0 1e-6"])
+    worker = AnalysisWorker(cache = ResultCache())
+    results = []
+    try:
+        for _ in range(2):
+            done = threading.Event()
+            worker.submit(sheet, lambda result: (results.append(result), done.set()), lambda error: done.set())
+            assert done.wait(120)
+    finally:
+        worker.close()
+
+    assert worker.cache.hits == 1
+    assert results[0] == results[1] == solve(sheet.to_lcapy())
+
+
+def test_relabelled_ladders_share_a_canonical_netlist():
+
+    import random
+
+    lines = ["V1 1 0 dc 1"]
+    for i in range(1, 301):
+        lines += [f"R{i} {i} {i + 1} 1000", f"C{i} {i + 1} 0 1e-6"]
+    nodes = [str(i) for i in range(1, 302)]
+    shuffled = random.Random(1).sample(nodes, len(nodes))
+    renamed = dict(zip(nodes, shuffled), **{"0": "0"})
+    relabelled = [" ".join([name, renamed[a], renamed[b], *rest]) for name, a, b, *rest in map(str.split, lines)]
+    random.Random(2).shuffle(relabelled)
+    assert canonical_netlist(relabelled)[0] == canonical_netlist(lines)[0]
+
+
+def test_symmetric_nodes_get_distinct_names():
+
+    # the two branches cannot be told apart, so their nodes are numbered in line order
+    netlist, names = canonical_netlist(["V1 1 0 dc 1", "R1 1 2 10", "C1 2 0 1e-6", "R2 1 3 10", "C2 3 0 1e-6"])
+    assert sorted(names.values()) == ["0", "1", "2", "3"]
+    assert netlist == canonical_netlist(["V1 5 0 dc 1", "R2 5 7 10", "C2 7 0 1e-6", "R1 5 6 10", "C1 6 0 1e-6"])[0]
@@ -0,0 +1,138 @@
+import pytest
+
+pytest.importorskip("ipycanvas")
+
+from lgui.editor import Editor
+from lgui.sheet import Sheet
+from lgui.history import History
+import numpy as np
+
+from lgui.components import Resistor, Capacitor, Inductor, VoltageSource, CurrentSource, Wire
+from benchmarks.recording import RecordingCanvas
+
+
+@pytest.fixture
+def editor():
+
+    editor = Editor()
+    editor.scheduler.close()
+    editor.sheet = Sheet("Test", None)
+    editor.history = History(editor.sheet, Editor.HISTORY_DEPTH)
+    layers = [RecordingCanvas() for _ in range(Editor.LAYERS)]
+    editor.cursor_layer, editor.active_layer, editor.component_layer, editor.grid_layer = layers
+    yield editor
+    editor.close()
+
+
+def place(component, start, end):
+
+    component.ports[0].position = start
+    component.ports[1].position = end
+    return component
+
+
+def test_grid_is_one_batched_command(editor):
+
+    editor._draw_grid()
+    histogram = editor.grid_layer.histogram()
+    assert histogram["fill_rects"] == 1
+    assert "fill_rect" not in histogram
+
+
+
+def test_edits_only_draw_what_changed(editor):
+
+    for i in range(20):
+        editor.sheet.add_component(place(Resistor(i), (0, 2 * i * Editor.STEP), (4 * Editor.STEP, 2 * i * Editor.STEP)))
+    editor.redraw()
+    layer = editor.component_layer
+    layer.reset()
+
+    # placing a resistor draws it without clearing the layer or redrawing the others
+    editor.component_selector.value = Resistor
+    editor._handle_mouse_down(Editor.STEP, 50 * Editor.STEP)
+    editor._handle_mouse_move(5 * Editor.STEP, 50 * Editor.STEP)
+    editor._refresh()
+    editor._handle_mouse_down(5 * Editor.STEP, 50 * Editor.STEP)
+    histogram = layer.histogram()
+    assert "clear" not in histogram
+    # the end node dots of one component
+    assert histogram["fill_arc"] == 2 and "fill_circles" not in histogram
+
+    # undoing clears and repaints only the region the resistor was in
+    layer.reset()
+    editor._handle_key("z", False, True, False)
+    assert len(editor.sheet.components) == 20
+    histogram = layer.histogram()
+    assert "clear" not in histogram and histogram["clear_rect"] == 1
+    assert "fill_circles" not in histogram
+
+
+@pytest.mark.parametrize("component_type", [Resistor, Capacitor, Inductor, VoltageSource, CurrentSource, Wire])
+def test_symbols_are_drawn_in_bulk(editor, component_type):
+
+    def make(i):
+        component = component_type() if component_type is Wire else component_type(i)
+        return place(component, (0, i * Editor.STEP), (4 * Editor.STEP, (i + 1) * Editor.STEP))
+
+    layer = editor.component_layer
+    component_type.draw_many(editor, layer, [make(0)])
+    one = layer.count
+    layer.reset()
+    components = [make(i) for i in range(50)]
+    component_type.draw_many(editor, layer, components)
+    assert layer.count == one
+
+    # the templates are placed along each component, so a vertical symbol is a horizontal one turned
+    length = 4 * Editor.STEP
+    flat_segments, flat_arcs = component_type.symbol_geometry(editor, np.zeros((1, 2)), np.array([[length, 0.0]]))
+    segments, arcs = component_type.symbol_geometry(editor, np.zeros((1, 2)), np.array([[0.0, length]]))
+    turn = np.array([[0, 1], [-1, 0]])
+    assert np.allclose(segments, flat_segments @ turn)
+    assert np.allclose(arcs[:, :2], flat_arcs[:, :2] @ turn)
+    assert np.allclose(arcs[:, 2:], flat_arcs[:, 2:] + [0, np.pi / 2, np.pi / 2])
+
+
+def test_geometry_is_cached_until_a_port_moves(editor):
+
+    resistor = place(Resistor(1), (0, 0), (4 * Editor.STEP, 0))
+    segments, arcs = resistor.symbol(editor)
+    assert resistor.symbol(editor)[0] is segments
+    along = resistor.along()
+    assert resistor.along() is along and not along.flags.writeable
+
+    resistor.ports[1].position = (0, 4 * Editor.STEP)
+    assert resistor.symbol(editor)[0] is not segments
+    assert np.allclose(resistor.along(), (0, 1))
+    assert resistor.length() == 4 * Editor.STEP
+
+
+def test_viewport_zooms_about_anchor_and_draws_what_is_visible(editor):
+
+    editor.zoom_by(2, (100, 50))
+    assert editor.zoom == 2
+    # the anchor stays at the same canvas pixel
+    assert editor.to_sheet(100, 50) == (100, 50)
+    # panning moves by canvas pixels, so half as far on the sheet at double zoom
+    editor.pan_by(200, 0)
+    assert editor.to_sheet(100, 50) == (200, 50)
+    editor.set_view(zoom = 10 * Editor.MAX_ZOOM)
+    assert editor.zoom == Editor.MAX_ZOOM
+
+    editor.set_view((0, 0), 1)
+    for i in range(10):
+        x = 2 * i * Editor.WIDTH
+        editor.sheet.add_component(place(Resistor(i), (x, 0), (x + 4 * Editor.STEP, 0)))
+    assert len(editor.visible_components()) == 1
+    editor.redraw()
+    # the end node dots of the one visible resistor, as two coordinate arrays
+    assert editor.component_layer.histogram()["fill_circles"] == 1
+
+    # zoomed out the grid only shows every so many steps, keeping dots GRID_SPACING pixels apart
+    editor.set_view(zoom = Editor.MIN_ZOOM)
+    assert len(editor.visible_components()) == 10
+    editor.grid_layer.reset()
+    editor._draw_grid()
+    dots = (Editor.WIDTH // Editor.GRID_SPACING + 1) * (Editor.HEIGHT // Editor.GRID_SPACING + 1)
+    # each dot is sent as two float64 coordinates
+    assert editor.grid_layer.bytes <= 16 * dots + 100
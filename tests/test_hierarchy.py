@@ -0,0 +1,153 @@
+import pytest
+
+from lgui.sheet import Sheet
+from lgui.components import Resistor, VoltageSource, Ground
+from lgui.hierarchy import Definition, Instance, flatten
+from lgui.storage import save_sheet, load_sheet
+from lgui.analysis import NumericCircuit, canonical_netlist
+
+STEP = 24
+
+
+def place(component, start, end):
+
+    component.ports[0].position = start
+    component.ports[1].position = end
+    return component
+
+
+def ground(position):
+
+    flag = Ground()
+    flag.ports[0].position = position
+    return flag
+
+
+def divider(value = 1000) -> Definition:
+    """
+    Divider stage from in at (0, 0) to out at (4, 0) steps, with the lower leg to ground.
+    """
+    sheet = Sheet("Stage", None)
+    sheet.add_component(place(Resistor(value), (0, 0), (4 * STEP, 0)))
+    sheet.add_component(place(Resistor(value), (4 * STEP, 0), (4 * STEP, 4 * STEP)))
+    sheet.add_component(ground((4 * STEP, 4 * STEP)))
+    return Definition("stage", sheet, {"in": (0, 0), "out": (4 * STEP, 0)})
+
+
+def ladder(stage: Definition) -> tuple[Sheet, list[Instance]]:
+
+    sheet = Sheet("Ladder", None)
+    sheet.add_component(place(VoltageSource(8), (0, 4 * STEP), (0, 0)))
+    sheet.add_component(ground((0, 4 * STEP)))
+    instances = [Instance(stage, (0, 0)), Instance(stage, (4 * STEP, 0))]
+    sheet.add_components(instances)
+    return sheet, instances
+
+
+def test_instances_solve_as_flat_sheet():
+
+    sheet, _ = ladder(divider())
+    voltages = sorted(NumericCircuit.from_sheet(sheet).dc().values())
+    flat = sorted(NumericCircuit.from_sheet(flatten(sheet)).dc().values())
+    assert voltages == pytest.approx(flat)
+    assert voltages == pytest.approx([-8, -3.2, -1.6])
+
+
+def test_instance_hit_testing():
+
+    sheet, instances = ladder(divider())
+    assert sheet.component_at((6 * STEP, 2 * STEP)) == [instances[1]]
+    assert sheet.component_at((6 * STEP, 6 * STEP), STEP) == []
+
+    # instances may have any number of ports
+    stage = divider()
+    for ports in ({"in": (0, 0)}, {"a": (0, 0), "b": (4 * STEP, 0), "c": (4 * STEP, 4 * STEP)}):
+        definition = Definition("block", stage.sheet, ports)
+        instance = Instance(definition, (0, 20 * STEP))
+        sheet.add_component(instance)
+        assert instance in sheet.component_at((2 * STEP, 22 * STEP))
+        assert sheet.wires_through((2 * STEP, 22 * STEP)) == []
+        assert str(instance).count("(") == len(ports)
+        sheet.remove_component(instance)
+
+
+def test_saving_needs_flattening(tmp_path):
+
+    sheet, _ = ladder(divider())
+    with pytest.raises(ValueError, match = "flatten"):
+        save_sheet(sheet, str(tmp_path / "ladder.lgui"))
+
+    flat = flatten(sheet)
+    save_sheet(flat, str(tmp_path / "ladder.lgui"))
+    assert load_sheet(str(tmp_path / "ladder.lgui")).to_lcapy() == flat.to_lcapy()
+
+
+def test_expanded_names_survive_canonical_form():
+
+    sheet, _ = ladder(divider(None))
+    netlist, _ = canonical_netlist(sheet.to_lcapy().splitlines())
+    names = sorted(line.split()[0] for line in netlist.splitlines() if line.startswith("R"))
+    assert len(set(names)) == 4
+    assert all("X" in name for name in names)
+
+
+def test_instances_render_and_bound_by_their_span():
+
+    from lgui.render import SVGBackend, render_sheet, sheet_bounds
+
+    stage = divider()
+    for ports in ({"in": (0, 0)}, {"a": (0, 0), "b": (4 * STEP, 0), "c": (4 * STEP, 2 * STEP)}):
+        sheet = Sheet("Block", None)
+        sheet.add_component(Instance(Definition("block", stage.sheet, ports), (STEP, STEP)))
+        backend = SVGBackend(200, 100)
+        render_sheet(sheet, backend)
+        assert "<path" in backend.to_string()
+        left, top, right, bottom = sheet_bounds(sheet, backend)
+        assert left < STEP and top < STEP and right > 5 * STEP and bottom > 5 * STEP
+
+
+def test_moving_an_instance_moves_its_origin():
+
+    from lgui.history import History, MoveComponent
+
+    sheet, instances = ladder(divider())
+    history = History(sheet)
+    moved = instances[1]
+    history.do(MoveComponent(moved, *((x, y + 10 * STEP) for x, y in (port.position for port in moved.ports))))
+    assert moved.position == (4 * STEP, 10 * STEP)
+    assert sheet.component_at((6 * STEP, 12 * STEP)) == [moved]
+    history.undo()
+    assert moved.position == (4 * STEP, 0)
+    assert sheet.component_at((6 * STEP, 2 * STEP)) == [moved]
+
+    with pytest.raises(ValueError):
+        MoveComponent(moved, (0, 0), (STEP, STEP))
+
+
+def test_ports_on_ground_or_one_net_are_rejected():
+
+    stage = divider()
+    for ports, message in (
+        ({"in": (0, 0), "gnd": (4 * STEP, 4 * STEP)}, "ground"),
+        ({"in": (0, 0), "again": (0, 0)}, "each other")
+    ):
+        with pytest.raises(ValueError, match = message):
+            Definition("block", stage.sheet, ports).template()
+
+
+def test_instances_follow_edits_to_their_definition():
+
+    stage = divider()
+    sheet, _ = ladder(stage)
+    before = sheet.to_lcapy()
+    sheet.to_circuit()
+
+    stage.sheet.components[0].value = 2000
+    stage.sheet.update_component(stage.sheet.components[0])
+    after = sheet.to_lcapy()
+    assert after != before and after.count(" 2000") == 2
+    assert sorted(NumericCircuit.from_sheet(sheet).dc().values()) == pytest.approx(
+        sorted(NumericCircuit.from_sheet(flatten(sheet)).dc().values())
+    )
+    # the cached lcapy circuit is patched too
+    assert str(sheet.to_circuit()).count(" 2000") == 2
@@ -0,0 +1,55 @@
+from lgui.sheet import Sheet
+from lgui.components import Resistor, Wire
+from lgui.history import History, AddComponents, RemoveComponents, MoveComponent
+
+
+def place(component, start, end):
+
+    component.ports[0].position = start
+    component.ports[1].position = end
+    return component
+
+
+def test_undo_redo_add_and_remove():
+
+    sheet = Sheet("Test", None)
+    history = History(sheet)
+    resistor = place(Resistor(1), (0, 0), (48, 0))
+    history.do(AddComponents([resistor]))
+    history.do(RemoveComponents([resistor]))
+    assert sheet.components == []
+    history.undo()
+    assert sheet.components == [resistor]
+    history.undo()
+    assert sheet.components == []
+    history.redo()
+    assert sheet.components == [resistor]
+    assert sheet.to_lcapy().split() == ["R" + str(resistor.id), "1", "2", "1"]
+
+
+def test_move_leaves_chained_wire_in_place():
+
+    sheet = Sheet("Test", None)
+    history = History(sheet)
+    first = place(Wire(), (0, 0), (48, 0))
+    second = Wire()
+    # chained wires share the node they meet at
+    second.ports[0] = first.ports[1]
+    second.ports[1].position = (48, 48)
+    resistor = place(Resistor(1), (48, 48), (96, 48))
+    history.do(AddComponents([first, second, resistor]))
+
+    history.do(MoveComponent(first, (0, 96), (48, 96)))
+    assert second.ports[0].position == (48, 0)
+    assert sheet.component_at((48, 24)) == [second]
+    assert sheet.net((0, 96)) != sheet.net((48, 48))
+
+    for _ in range(2):
+        history.undo()
+        assert first.ports[1].position == (48, 0)
+        assert second.ports[0].position == (48, 0)
+        assert sheet.net((0, 0)) == sheet.net((48, 0)) == sheet.net((48, 48))
+        assert sheet.net((48, 48)) != sheet.net((96, 48))
+        assert sheet.component_at((48, 24)) == [second]
+        history.redo()
+        assert second.ports[0].position == (48, 0)
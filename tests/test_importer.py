@@ -0,0 +1,32 @@
+from lgui.importer import read_lcapy
+from lgui.analysis import canonical_netlist
+
+NETLIST = ["V1 1 0 dc 10", "R1 1 2 {2 * R}", "C1 2 0 1e-6", "L1 2 3 5", "R2 3 0 50", "I1 3 1 ac 2"]
+
+
+def test_import_keeps_connectivity():
+
+    sheet = read_lcapy(NETLIST)
+    exported = [line for line in sheet.to_lcapy().splitlines() if line]
+    assert canonical_netlist(exported)[0] == canonical_netlist(NETLIST)[0]
+
+
+def test_import_places_components_apart():
+
+    sheet = read_lcapy(NETLIST)
+    listed = [component for component in sheet.components if component.TYPE not in ("W", "G")]
+    for component in listed:
+        start, end = component.ports[0].position, component.ports[1].position
+        assert start != end and (start[0] == end[0] or start[1] == end[1])
+
+
+def test_named_components_do_not_take_later_ids():
+
+    from lgui.components import Resistor
+
+    # numbered names the next new resistor would otherwise be given
+    n = Resistor.next_id
+    sheet = read_lcapy(["V1 1 0 dc 1", "Rload 1 2 10", f"R{n} 2 0 20", f"R{n + 1} 2 0 30"])
+    ids = [component.id for component in sheet.components if component.TYPE == "R"]
+    assert len(set(ids)) == len(ids) == 3
+    assert len([line for line in sheet.to_lcapy().splitlines() if line.startswith("R")]) == 3
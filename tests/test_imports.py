@@ -0,0 +1,32 @@
+import sys
+import subprocess
+
+import pytest
+
+
+def imported_after(code: str) -> set[str]:
+    """
+    Runs code in a fresh interpreter and lists the top-level modules it imported.
+    """
+    script = f"import sys\n{code}\nprint(' '.join(sorted({{name.split('.')[0] for name in sys.modules}})))"
+    output = subprocess.run([sys.executable, "-c", script], capture_output = True, text = True, check = True).stdout
+    return set(output.split())
+
+
+def test_sheets_do_not_import_widgets_or_lcapy():
+
+    modules = imported_after("import lgui\nfrom lgui import Sheet, read_lcapy\nread_lcapy(['R1 1 0 10']).to_lcapy()")
+    assert not modules & {"ipywidgets", "ipycanvas", "IPython", "lcapy", "sympy"}
+
+
+def test_exports_resolve_on_first_use():
+
+    import lgui
+    import lgui.components
+
+    assert set(lgui.__all__) <= set(dir(lgui))
+    for name in lgui.__all__ + lgui.components.__all__:
+        module = lgui if name in lgui.__all__ else lgui.components
+        assert getattr(module, name).__name__ == name
+    with pytest.raises(AttributeError):
+        lgui.Missing
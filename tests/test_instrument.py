@@ -0,0 +1,66 @@
+import pytest
+
+canvas = pytest.importorskip("ipycanvas")
+
+from lgui.instrument import Instrumentation
+
+
+class Manager:
+    """
+    Stands in for the ipycanvas canvas manager, which needs a front end to send to.
+    """
+
+    def __init__(self):
+
+        self.sent = []
+
+    def send_command(self, command, canvas = None, buffers = None):
+
+        self.send({"command": command})
+
+    def send(self, content, buffers = None):
+
+        self.sent.append(content)
+
+
+@pytest.fixture
+def manager(monkeypatch):
+
+    manager = Manager()
+    monkeypatch.setattr(canvas.canvas, "_CANVAS_MANAGER", manager)
+    return manager
+
+
+def test_events_count_commands(manager):
+
+    instrumentation = Instrumentation()
+    instrumentation.install()
+    with instrumentation.event("outer"):
+        manager.send_command("a")
+        with instrumentation.event("inner"):
+            manager.send_command("b")
+    instrumentation.uninstall()
+
+    summary = instrumentation.summary()
+    assert summary["outer"]["commands"] == 2
+    assert summary["inner"]["commands"] == 1
+    assert summary["outer"]["messages"] == 2
+
+
+def test_instrumentations_install_independently(manager):
+
+    first, second = Instrumentation(), Instrumentation()
+    first.install()
+    second.install()
+
+    first.uninstall()
+    assert second.installed and not first.installed
+    with second.event("draw"):
+        manager.send_command("a")
+    assert second.summary()["draw"]["commands"] == 1
+
+    second.uninstall()
+    second.uninstall()
+    assert "send_command" not in vars(manager) and "send" not in vars(manager)
+    manager.send_command("b")
+    assert len(manager.sent) == 2
@@ -0,0 +1,26 @@
+from lgui.layout import layout
+from lgui.importer import read_lcapy
+from lgui.analysis.cache import canonical_netlist
+
+# R3 has both ends on one net, so needs a wire loop back to its bus
+NETLIST = ["V1 1 0 dc 10", "R1 1 2 5", "C1 2 0 1e-6", "L1 2 3 5", "R2 3 0 50", "R3 3 3 1", "R4 4 5 2"]
+
+
+def test_layout_keeps_connectivity_on_the_grid():
+
+    sheet = read_lcapy(NETLIST)
+    placed = layout(sheet)
+    assert canonical_netlist(placed.to_lcapy().splitlines()[1:])[0] == canonical_netlist(NETLIST)[0]
+
+    spans = {}
+    for component in placed.components:
+        (x0, y0), (x1, y1) = component.ports[0].position, component.ports[1].position
+        assert x0 % 24 == y0 % 24 == x1 % 24 == y1 % 24 == 0
+        assert x0 == x1 or y0 == y1
+        if component.TYPE not in ("W", "G"):
+            spans.setdefault(y0, []).append(sorted((x0, x1)))
+
+    # components sharing a row only meet end to end
+    for row in spans.values():
+        row.sort()
+        assert all(a[1] <= b[0] for a, b in zip(row, row[1:]))
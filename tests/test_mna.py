@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+
+from lgui.analysis import NumericCircuit, SymbolicValueError, solve_numeric
+
+DIVIDER = ["V1 1 0 dc 15", "R1 1 2 1000", "R2 2 0 2000", "I1 0 2 dc 0.001", "L1 2 3 1e-3", "R3 3 0 4000", "C1 3 0 1e-6"]
+
+
+def test_dc_matches_lcapy():
+
+    lcapy = pytest.importorskip("lcapy")
+    circuit = lcapy.Circuit("\n" + "\n".join(DIVIDER))
+    expected = {str(node): float(circuit[node].V(lcapy.t).sympy) for node in circuit.node_list if str(node) != "0"}
+    numeric = {node: float(voltage) for node, voltage in solve_numeric("\n".join(DIVIDER)).items()}
+    assert numeric == pytest.approx(expected)
+
+
+def test_ac_matches_lcapy():
+
+    lcapy = pytest.importorskip("lcapy")
+    lines = ["V1 1 0 ac 1", "R1 1 2 1000", "C1 2 0 1e-6", "L1 2 3 1e-2", "R2 3 0 100"]
+    frequency = 1000
+    circuit = lcapy.Circuit("\n" + "\n".join(lines))
+    numeric = NumericCircuit.from_netlist(lines)
+    voltages = numeric.ac(frequency)[0]
+    for node, voltage in zip(numeric.nodes, voltages):
+        # lcapy gives the phasor as an expression of the angular frequency of the ac sources
+        superposition = circuit[node].V
+        phasor = superposition[next(iter(superposition.keys()))].sympy
+        phasor = phasor.subs({symbol: 2 * np.pi * frequency for symbol in phasor.free_symbols})
+        assert voltage == pytest.approx(complex(phasor))
+
+
+def test_symbolic_values_are_left_to_lcapy():
+
+    with pytest.raises(SymbolicValueError):
+        solve_numeric("V1 1 0 dc 10\nR1 1 2 R\nR2 2 0 1000")
+    with pytest.raises(SymbolicValueError):
+        solve_numeric("V1 1 0 step 10\nR1 1 2 1000\nR2 2 0 1000")
@@ -0,0 +1,51 @@
+import pytest
+
+from lgui.sheet import Sheet
+from lgui.components import Resistor, VoltageSource, Ground
+
+
+def place(component, start, end):
+
+    component.ports[0].position = start
+    component.ports[1].position = end
+    return component
+
+
+def test_single_component_circuit():
+
+    pytest.importorskip("lcapy")
+    sheet = Sheet("Test", None)
+    sheet.add_component(place(Resistor(5), (0, 0), (48, 0)))
+    assert len(sheet.to_circuit().elements) == 1
+
+
+def test_circuit_follows_edits():
+
+    pytest.importorskip("lcapy")
+    sheet = Sheet("Test", None)
+    source = place(VoltageSource(10), (0, 48), (0, 0))
+    resistor = place(Resistor(5), (0, 0), (48, 0))
+    ground = Ground()
+    ground.ports[0].position = (0, 48)
+    sheet.add_components([source, resistor, ground])
+    assert len(sheet.to_circuit().elements) == 2
+
+    sheet.remove_component(resistor)
+    assert len(sheet.to_circuit().elements) == 1
+
+
+def test_netlist_is_streamed_line_by_line():
+
+    import io
+    from lgui.importer import read_lcapy
+
+    sheet = read_lcapy(["V1 1 0 dc 10", "R1 1 2 {2 * R}", "C1 2 0 1e-6"])
+    lines = sheet.iter_lcapy()
+    first = next(lines)
+    assert first.endswith("\n") and first.count("\n") == 1
+    assert [first, *lines] == sheet.to_lcapy().splitlines(keepends = True)[1:]
+
+    file = io.StringIO()
+    sheet.write_lcapy(file)
+    assert "\n" + file.getvalue() == sheet.to_lcapy()
+    assert file.getvalue().count("\n") == 3 and " {2 * R}\n" in file.getvalue()
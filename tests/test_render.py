@@ -0,0 +1,56 @@
+import sys
+import subprocess
+import pytest
+
+from lgui.importer import read_lcapy
+from lgui.render import SVGBackend, render_sheet
+
+NETLIST = ["V1 1 0 dc 10", "R1 1 2 5", "C1 2 0 1e-6", "L1 2 0 3"]
+
+
+def test_svg_backend_draws_sheet():
+
+    backend = SVGBackend(400, 300)
+    render_sheet(read_lcapy(NETLIST), backend)
+    svg = backend.to_string()
+    assert svg.startswith("<svg") and svg.rstrip().endswith("</svg>")
+    assert "<path" in svg
+
+
+def test_raster_backend_draws_sheet(tmp_path):
+
+    Image = pytest.importorskip("PIL.Image")
+    from lgui.render import RasterBackend
+
+    backend = RasterBackend(400, 300)
+    render_sheet(read_lcapy(NETLIST), backend)
+    path = tmp_path / "sheet.png"
+    backend.save_to(str(path))
+
+    with Image.open(path) as image:
+        assert image.size == (400, 300)
+        # something other than the white background was drawn
+        assert len(image.convert("L").getcolors()) > 1
+
+
+def run(source, output):
+
+    return subprocess.run(
+        [sys.executable, "-m", "lgui.render", str(source), str(output), "--processes", "1"],
+        capture_output = True, text = True, timeout = 120
+    )
+
+
+def test_batch_render_exit_status(tmp_path):
+
+    source = tmp_path / "sheets"
+    source.mkdir()
+    (source / "good.net").write_text("\n".join(NETLIST) + "\n")
+    result = run(source, tmp_path / "good")
+    assert result.returncode == 0, result.stderr
+    assert (tmp_path / "good" / "good.svg").exists()
+
+    (source / "bad.lgui").write_bytes(b"not a sheet")
+    result = run(source, tmp_path / "bad")
+    assert result.returncode == 1
+    assert "bad.lgui" in result.stderr
@@ -0,0 +1,39 @@
+import threading
+
+from lgui.scheduler import RenderScheduler
+
+
+def test_frames_continue_after_render_error(caplog):
+
+    frames = []
+    drawn = threading.Event()
+
+    def render():
+        frames.append(len(frames))
+        if len(frames) == 1:
+            raise RuntimeError("broken frame")
+        drawn.set()
+
+    scheduler = RenderScheduler(render, 0)
+    try:
+        scheduler.request()
+        while len(frames) == 0:
+            threading.Event().wait(0.01)
+        scheduler.request()
+        assert drawn.wait(5)
+    finally:
+        scheduler.close()
+    assert "rendering a frame failed" in caplog.text
+
+
+def test_requests_coalesce_into_one_frame():
+
+    frames = []
+    scheduler = RenderScheduler(lambda: frames.append(1), 0.05)
+    for _ in range(10):
+        scheduler.request()
+    threading.Event().wait(0.3)
+    scheduler.close()
+    assert frames == [1]
+    scheduler.request()
+    assert scheduler.closed
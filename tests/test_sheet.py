@@ -0,0 +1,135 @@
+import numpy as np
+
+from lgui.sheet import Sheet
+from lgui.spatial import segment_distance
+from lgui.components import Resistor, Capacitor, Wire, Ground
+
+
+def grid(size):
+
+    sheet = Sheet("Grid", None)
+    types = (Resistor, Capacitor, Wire, Ground)
+    for i in range(size):
+        component_type = types[i % len(types)]
+        component = component_type() if component_type in (Wire, Ground) else component_type(i + 1)
+        x, y = (i % 5) * 48, (i // 5) * 48
+        component.ports[0].position = (x, y)
+        if component_type is not Ground:
+            component.ports[1].position = (x + 48, y) if (i // 5) % 2 == 0 else (x, y + 48)
+        sheet.add_component(component)
+    return sheet
+
+
+def place_resistor(value, start, end):
+
+    resistor = Resistor(value)
+    resistor.ports[0].position = start
+    resistor.ports[1].position = end
+    return resistor
+
+
+def names(components):
+
+    return sorted((component.TYPE, component.id) for component in components)
+
+
+def test_compact_sheet_keeps_rows_as_numbers():
+
+    sheet = grid(40)
+    compact = sheet.compact()
+    assert len(compact.components.rows) == len(sheet.components)
+    assert compact.components.objects == []
+    assert compact.to_lcapy() == sheet.to_lcapy()
+    assert compact.nodes == sheet.nodes
+
+    box = (0, 0, 100, 100)
+    assert names(compact.components_in(box)) == names(sheet.components_in(box))
+    assert names(compact.component_at((24, 0))) == names(sheet.component_at((24, 0))) != []
+
+
+def test_compact_sheet_follows_edits():
+
+    sheet = grid(40)
+    compact = sheet.compact()
+    compact.to_lcapy()
+
+    for edited in (sheet, compact):
+        # remove a resistor and add it back moved, then remove a wire so the nets are rebuilt
+        resistor = next(component for component in edited.components if component.TYPE == "R")
+        edited.remove_component(resistor)
+        resistor.ports[0].position = (0, 480)
+        resistor.ports[1].position = (48, 480)
+        edited.add_component(resistor)
+        edited.remove_component(next(component for component in edited.components if component.TYPE == "W"))
+
+    assert compact.to_lcapy() == sheet.to_lcapy()
+    assert names(compact.components_in((0, 470, 60, 490))) == names(sheet.components_in((0, 470, 60, 490)))
+    assert names(compact.components) == names(sheet.components)
+
+
+def overlaps(component, box, contained):
+
+    (x0, y0), (x1, y1) = component.ports[0].position, component.ports[1].position
+    left, top, right, bottom = box
+    if contained:
+        return all(left <= x <= right and top <= y <= bottom for x, y in ((x0, y0), (x1, y1)))
+    return min(x0, x1) <= right and left <= max(x0, x1) and min(y0, y1) <= bottom and top <= max(y0, y1)
+
+
+def test_index_matches_a_full_scan():
+
+    rng = np.random.default_rng(0)
+    sheet = Sheet("Random", None)
+    for i in range(300):
+        start = rng.integers(0, 2000, 2)
+        # mostly short components, with some spanning much of the sheet
+        end = start + rng.integers(-1000, 1000, 2) if i % 20 == 0 else start + rng.integers(-60, 60, 2)
+        sheet.add_component(place_resistor(i, tuple(start.tolist()), tuple(end.tolist())))
+    for component in sheet.components[::3]:
+        sheet.remove_component(component)
+
+    # the compacted copy is filed in packed arrays rather than per component
+    for checked in (sheet, sheet.compact()):
+        for _ in range(50):
+            left, top = rng.integers(-100, 2000, 2).tolist()
+            box = (left, top, left + int(rng.integers(0, 400)), top + int(rng.integers(0, 400)))
+            for contained in (False, True):
+                expected = [component for component in checked.components if overlaps(component, box, contained)]
+                assert names(checked.components_in(box, contained)) == names(expected)
+
+            position = tuple(rng.integers(0, 2000, 2).tolist())
+            hits = checked.component_at(position, 30)
+            distances = [segment_distance(position, *(port.position for port in component.ports)) for component in hits]
+            assert distances == sorted(distances)
+            expected = [
+                component for component in checked.components
+                if segment_distance(position, component.ports[0].position, component.ports[1].position) <= 30
+            ]
+            assert names(hits) == names(expected)
+
+
+def test_wires_and_ground_merge_nets():
+
+    sheet = Sheet("Nets", None)
+    sheet.add_component(place_resistor(1, (0, 0), (48, 0)))
+    sheet.add_component(place_resistor(2, (96, 0), (144, 0)))
+    assert [sheet.net(position) for position in ((0, 0), (48, 0), (96, 0), (144, 0))] == [1, 2, 3, 4]
+
+    # a chain of wires joins the resistors into one net, keeping the lower number
+    wires = []
+    for x in range(48, 96, 12):
+        wire = Wire()
+        wire.ports[0].position, wire.ports[1].position = (x, 0), (x + 12, 0)
+        sheet.add_component(wire)
+        wires.append(wire)
+    assert sheet.net((48, 0)) == sheet.net((96, 0)) == 2
+
+    ground = Ground()
+    ground.ports[0].position = (144, 0)
+    sheet.add_component(ground)
+    assert sheet.net((144, 0)) == 0
+
+    # removing a wire splits the net again
+    sheet.remove_component(wires[1])
+    assert sheet.net((48, 0)) != sheet.net((96, 0))
+    assert sheet.net((144, 0)) == 0
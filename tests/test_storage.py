@@ -0,0 +1,49 @@
+from lgui.storage import save_sheet, load_sheet
+from lgui.importer import read_lcapy
+
+NETLIST = ["V1 1 0 dc 10", "R1 1 2 {2 * R}", "C1 2 0 1e-6", "L1 2 3 5", "R2 3 0 50", "I1 3 1 ac 2"]
+
+
+def test_save_and_load_round_trip(tmp_path):
+
+    sheet = read_lcapy(NETLIST, name = "Round trip", author = "Tester")
+    path = str(tmp_path / "sheet.lgui")
+    save_sheet(sheet, path)
+
+    loaded = load_sheet(path)
+    assert (loaded.name, loaded.author) == ("Round trip", "Tester")
+    assert loaded.to_lcapy() == sheet.to_lcapy()
+    assert [str(component) for component in loaded.components] == [str(component) for component in sheet.components]
+
+
+def test_load_viewport(tmp_path):
+
+    sheet = read_lcapy(NETLIST)
+    path = str(tmp_path / "sheet.lgui")
+    save_sheet(sheet, path)
+
+    # a box around the first component, which misses components placed further along
+    x, y = sheet.components[0].ports[0].position
+    left, top, right, bottom = (x - 1, y - 1, x + 1, y + 1)
+    part = load_sheet(path, (left, top, right, bottom))
+    expected = sheet.components_in((left, top, right, bottom))
+    assert 0 < len(part.components) < len(sheet.components)
+    assert sorted(map(str, part.components)) == sorted(map(str, expected))
+
+
+def test_save_numpy_values(tmp_path):
+
+    import numpy as np
+
+    from lgui.sheet import Sheet
+    from lgui.components import Resistor, Capacitor
+
+    sheet = Sheet("NumPy", None)
+    for component, end in ((Resistor(np.int64(1000)), (48, 0)), (Capacitor(np.float64(1e-6)), (0, 48))):
+        component.ports[1].position = end
+        sheet.add_component(component)
+    path = str(tmp_path / "sheet.lgui")
+    save_sheet(sheet, path)
+
+    values = [component.value for component in load_sheet(path).components]
+    assert values == [1000, 1e-6] and [type(value) for value in values] == [int, float]
@@ -0,0 +1,20 @@
+import numpy as np
+import pytest
+
+from lgui.analysis import NumericCircuit, sweep, frequency_sweep
+
+DIVIDER = ["V1 1 0 dc 15", "R1 1 2 1000", "R2 2 0 2000", "I1 0 2 dc 0.001", "L1 2 3 1e-3", "R3 3 0 4000", "C1 3 0 1e-6"]
+
+
+def test_sweep_matches_point_solves():
+
+    lines = ["V1 1 0 ac 1", "R1 1 2 1000", "C1 2 0 1e-6"]
+    circuit = NumericCircuit.from_netlist(lines)
+    frequencies = np.logspace(1, 5, 50)
+    assert np.allclose(frequency_sweep(circuit, frequencies), circuit.ac(frequencies))
+
+    resistances = np.linspace(100, 1000, 10)
+    voltages = sweep(NumericCircuit.from_netlist(DIVIDER), values = {"R2": resistances})
+    for resistance, row in zip(resistances, voltages):
+        point = NumericCircuit.from_netlist([line.replace("R2 2 0 2000", f"R2 2 0 {resistance}") for line in DIVIDER])
+        assert row == pytest.approx(list(point.dc().values()))
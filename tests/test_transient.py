@@ -0,0 +1,56 @@
+import numpy as np
+
+from lgui.analysis import NumericCircuit, TransientSolver, simulate, simulate_into
+
+
+def run(circuit: NumericCircuit, stop: float, step: float, **kwargs) -> tuple[np.ndarray, np.ndarray]:
+
+    times, voltages = zip(*simulate(circuit, stop, step, chunk = 128, **kwargs))
+    return np.concatenate(times), np.concatenate(voltages)
+
+
+def test_rc_step_response():
+
+    circuit = NumericCircuit.from_netlist(["V1 1 0 step 5", "R1 1 2 1000", "C1 2 0 1e-6"])
+    t, v = run(circuit, 5e-3, 1e-5)
+    assert np.allclose(v[:, 1], 5 * (1 - np.exp(-t / 1e-3)), atol = 1e-3)
+
+
+def test_adaptive_step_meets_tolerance():
+
+    circuit = NumericCircuit.from_netlist(["V1 1 0 step 5", "R1 1 2 1000", "C1 2 0 1e-6"])
+    t, v = run(circuit, 5e-3, 1e-6, adaptive = True, tolerance = 1e-6)
+    assert np.isclose(t[-1], 5e-3)
+    assert np.allclose(v[:, 1], 5 * (1 - np.exp(-t / 1e-3)), atol = 1e-4)
+
+
+def test_capacitor_initial_value():
+
+    circuit = NumericCircuit(["R", "C"], ["R1", "C1"], [("1", "0"), ("1", "0")], [None, None], [1000, 1e-6], [None, 2])
+    t, v = run(circuit, 3e-3, 1e-6)
+    assert np.allclose(v[:, 0], 2 * np.exp(-t / 1e-3), atol = 1e-5)
+
+
+def test_inductor_initial_state():
+
+    # 1 A flows from node 1 to node 2 through L1, returning through the resistors to ground
+    circuit = NumericCircuit(
+        ["L", "R", "R"], ["L1", "R1", "R2"], [("1", "2"), ("1", "0"), ("2", "0")],
+        [None] * 3, [1, 1, 1], [1, None, None]
+    )
+    solver = TransientSolver(circuit)
+    assert np.allclose(solver.x0, [-1, 1, 1])
+
+    t, v = run(circuit, 1, 1e-4)
+    current = np.exp(-2 * t)
+    assert np.allclose(v[:, 0], -current, atol = 1e-4)
+    assert np.allclose(v[:, 1], current, atol = 1e-4)
+
+
+def test_simulate_into_fills_buffers():
+
+    circuit = NumericCircuit.from_netlist(["V1 1 0 step 5", "R1 1 2 1000", "C1 2 0 1e-6"])
+    times, voltages = np.empty(101), np.empty((101, 2))
+    assert simulate_into(circuit, times, voltages, 1e-5) == 101
+    assert np.isclose(times[-1], 1e-3)
+    assert np.allclose(voltages[:, 0], np.where(times > 0, 5, 0))
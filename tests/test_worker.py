@@ -0,0 +1,58 @@
+import time
+import threading
+
+from lgui.importer import read_lcapy
+from lgui.analysis import AnalysisWorker
+
+NETLIST = ["V1 1 0 dc 10", "R1 1 2 1000", "R2 2 0 1000"]
+
+
+def slow(netlist):
+
+    time.sleep(30)
+    return {"slow": netlist}
+
+
+def delayed(netlist):
+
+    time.sleep(1)
+    return {"delayed": netlist}
+
+
+def fast(netlist):
+
+    return {"fast": netlist}
+
+
+def test_latest_request_supersedes_earlier_ones():
+
+    sheet = read_lcapy(NETLIST)
+    results, done = [], threading.Event()
+    worker = AnalysisWorker(solver = slow)
+    try:
+        worker.submit(sheet, results.append)
+        # forking a Jupyter kernel would copy its threads into the worker
+        assert worker.busy and worker._pool._ctx.get_start_method() == "spawn"
+        worker.solver = fast
+        worker.submit(sheet, lambda result: (results.append(result), done.set()))
+        assert done.wait(60)
+    finally:
+        worker.close()
+    assert results == [{"fast": sheet.to_lcapy()}]
+
+
+def test_results_of_edited_sheets_are_dropped():
+
+    sheet = read_lcapy(NETLIST)
+    results = []
+    worker = AnalysisWorker(solver = delayed)
+    try:
+        worker.submit(sheet, results.append)
+        job = worker._job
+        sheet.revision += 1
+        job.wait(60)
+        # the callback runs on the pool's result thread just after the job is ready
+        time.sleep(0.5)
+    finally:
+        worker.close()
+    assert job.ready() and results == []